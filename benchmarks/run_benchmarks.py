@@ -0,0 +1,401 @@
+"""Time node_table operations headless on synthetic scripts.
+
+Runs outside of Nuke with the stand-in nuke module in ``benchmarks/stub``
+and an offscreen Qt platform. Requires PySide6 or PySide2.
+
+Examples:
+    Run the default sizes and write the results::
+
+        python benchmarks/run_benchmarks.py --output bench.json
+
+    Compare against results of a previous version::
+
+        python benchmarks/run_benchmarks.py --sizes 100,1000 \\
+            --compare bench.json
+
+    Count calls into the nuke module and fail if an operation makes more
+    calls per node than allowed in budgets.json::
+
+        python benchmarks/run_benchmarks.py --budgets benchmarks/budgets.json
+
+"""
+
+# Import built-in modules
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'stub'))
+sys.path.insert(0, os.path.dirname(HERE))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# pylint: disable=wrong-import-position
+import nuke  # noqa: E402 pylint: disable=import-error
+
+from benchmarks import synthetic  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+def get_qt():
+    """Import the Qt binding node_table uses with the stand-in nuke module.
+
+    Returns:
+        tuple: QtCore and QtWidgets modules.
+
+    """
+    if nuke.NUKE_VERSION_MAJOR >= 16:
+        from PySide6 import QtCore, QtWidgets  # pylint: disable=import-error
+    else:
+        from PySide2 import QtCore, QtWidgets  # pylint: disable=import-error
+    return QtCore, QtWidgets
+
+
+class Benchmark(object):
+    """Collect timings of named operations."""
+
+    def __init__(self, repeat=3, count_calls=False):
+        self.repeat = repeat
+        self.count_calls = count_calls
+        self.results = []
+
+    def measure(self, operation, num_nodes, func, setup=None):
+        """Time func `repeat` times, calling setup before each run.
+
+        Args:
+            operation (str): Name of the operation.
+            num_nodes (int): Size of the script.
+            func (callable): Operation to time.
+            setup (callable, optional): Called untimed before each run.
+
+        Returns:
+            dict: The result.
+
+        """
+        from node_table import instrumentation  # pylint: disable=import-outside-toplevel
+
+        timings = []
+        calls = None
+        for _ in range(self.repeat):
+            if setup:
+                setup()
+            instrumentation.reset()
+            start = timer()
+            func()
+            timings.append(timer() - start)
+            if self.count_calls:
+                calls = sum(entry['calls'] for entry
+                            in instrumentation.stats().values())
+
+        timings.sort()
+        result = {
+            'operation': operation,
+            'nodes': num_nodes,
+            'repeat': self.repeat,
+            'min': timings[0],
+            'median': timings[len(timings) // 2],
+            'max': timings[-1],
+        }
+        if calls is not None:
+            result['calls'] = calls
+            result['calls_per_node'] = float(calls) / max(num_nodes, 1)
+        self.results.append(result)
+        sys.stderr.write('{operation:<28} {nodes:>6} nodes  '
+                         'median {median:.4f}s\n'.format(**result))
+        return result
+
+
+def measure_memory(bench, num_nodes, nodes):
+    """Measure the memory the table core allocates to hold all nodes.
+
+    Args:
+        bench (Benchmark): Collects the results.
+        num_nodes (int): Size of the script.
+        nodes (list): Nodes to load.
+
+    Returns:
+        dict: The result.
+
+    """
+    import tracemalloc  # pylint: disable=import-outside-toplevel
+    from node_table import core  # pylint: disable=import-outside-toplevel
+    from node_table import nuke_adapter  # pylint: disable=import-outside-toplevel
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = core.TableCore(nuke_adapter.NukeNodeAdapter())
+    table.insert_rows(0, list(table.read(nodes)))
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    result = {
+        'operation': 'memory',
+        'nodes': num_nodes,
+        'bytes': allocated,
+        'bytes_per_node': float(allocated) / max(len(table.nodes), 1),
+    }
+    bench.results.append(result)
+    sys.stderr.write('{operation:<28} {nodes:>6} nodes  '
+                     '{bytes_per_node:.0f} bytes per node\n'.format(**result))
+    return result
+
+
+def process_events(qt_widgets):
+    """Flush pending events, including deferred proxy updates."""
+    qt_widgets.QApplication.processEvents()
+
+
+# pylint: disable=too-many-locals
+def run_size(bench, num_nodes, args):
+    """Run all benchmarks for one script size.
+
+    Args:
+        bench (Benchmark): Collects the results.
+        num_nodes (int): Number of nodes in the synthetic script.
+        args (argparse.Namespace): Command line arguments.
+
+    """
+    qt_core, qt_widgets = get_qt()
+    from node_table import view  # pylint: disable=import-outside-toplevel
+
+    synthetic.generate_script(num_nodes, seed=args.seed)
+    nodes = nuke.selectedNodes()
+
+    measure_memory(bench, num_nodes, nodes)
+
+    widget = view.NodeTableWidget()
+    widget.resize(1600, 900)
+    widget.show()
+    process_events(qt_widgets)
+
+    def load():
+        widget.node_list = nodes
+        process_events(qt_widgets)
+
+    def unload():
+        widget.node_list = []
+        process_events(qt_widgets)
+
+    bench.measure('load', num_nodes, load, setup=unload)
+    load()
+
+    filters = [
+        ('filter_node_class', 'node_class_filter', 'Blur'),
+        ('filter_node_class_multi', 'node_class_filter', 'Grade, Merge2'),
+        ('filter_node_name', 'node_name_filter', 'Transform1'),
+        ('filter_knob_name', 'knob_name_filter', 'mix'),
+        ('filter_knob_name_multi', 'knob_name_filter', 'size, file, white'),
+    ]
+    for operation, attribute, value in filters:
+        def apply_filter(attribute=attribute, value=value):
+            setattr(widget, attribute, value)
+            process_events(qt_widgets)
+
+        def clear_filter(attribute=attribute):
+            setattr(widget, attribute, '')
+            process_events(qt_widgets)
+
+        bench.measure(operation, num_nodes, apply_filter, setup=clear_filter)
+        clear_filter()
+
+    def toggle_hidden_knobs():
+        widget.hidden_knobs = not widget.hidden_knobs
+        process_events(qt_widgets)
+
+    bench.measure('filter_hidden_knobs', num_nodes, toggle_hidden_knobs)
+
+    table_view = widget.table_view
+    bench.measure('resize_columns_to_contents', num_nodes,
+                  table_view.resizeColumnsToContents)
+
+    scroll_bar = table_view.verticalScrollBar()
+
+    def scroll_paint():
+        steps = args.scroll_steps
+        for step in range(steps):
+            scroll_bar.setValue(scroll_bar.maximum() * step // max(steps - 1, 1))
+            table_view.viewport().repaint()
+
+    bench.measure('scroll_paint', num_nodes, scroll_paint)
+
+    # Commit one value to the `mix` column of all rows.
+    proxy = table_view.model()
+    mix_column = None
+    for column in range(proxy.columnCount()):
+        if proxy.headerData(column, qt_core.Qt.Horizontal,
+                            qt_core.Qt.DisplayRole) == 'mix':
+            mix_column = column
+            break
+
+    if mix_column is not None:
+        selection_model = table_view.selectionModel()
+
+        def select_column():
+            rows = proxy.rowCount()
+            top_left = proxy.index(0, mix_column)
+            selection = qt_core.QItemSelection(
+                top_left, proxy.index(rows - 1, mix_column))
+            selection_model.select(selection,
+                                   qt_core.QItemSelectionModel.ClearAndSelect)
+            selection_model.setCurrentIndex(
+                top_left, qt_core.QItemSelectionModel.NoUpdate)
+
+        def commit():
+            proxy.setData(proxy.index(0, mix_column), 0.5,
+                          qt_core.Qt.EditRole)
+            table_view.commitData(None)
+            process_events(qt_widgets)
+
+        bench.measure('multi_cell_commit', num_nodes, commit,
+                      setup=select_column)
+
+    widget.close()
+    widget.deleteLater()
+    process_events(qt_widgets)
+
+
+def compare(results, baseline_path):
+    """Print the ratio of median timings against previous results.
+
+    Args:
+        results (list): Current results.
+        baseline_path (str): Path to a results file.
+
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    def value(result):
+        # Memory is compared in bytes per node, everything else by time.
+        return result.get('median', result.get('bytes_per_node'))
+
+    previous = dict(((r['operation'], r['nodes']), value(r))
+                    for r in baseline['results'])
+    sys.stdout.write('{:<28} {:>6} {:>10} {:>10} {:>7}\n'.format(
+        'operation', 'nodes', 'before', 'after', 'ratio'))
+    for result in results:
+        before = previous.get((result['operation'], result['nodes']))
+        if before is None:
+            continue
+        after = value(result)
+        ratio = after / before if before else float('inf')
+        sys.stdout.write('{:<28} {:>6} {:>10.4f} {:>10.4f} {:>7.2f}\n'.format(
+            result['operation'], result['nodes'], before, after, ratio))
+
+
+def check_budgets(results, budgets_path):
+    """Return operations exceeding their budget of calls per node.
+
+    Args:
+        results (list): Results measured with counted calls.
+        budgets_path (str): JSON file mapping operations to the maximum
+            number of calls per node.
+
+    Returns:
+        :obj:`list` of :obj:`str`: Violations.
+
+    """
+    with open(budgets_path) as budgets_file:
+        budgets = json.load(budgets_file)
+
+    violations = []
+    for result in results:
+        budget = budgets.get(result['operation'])
+        if budget is not None and result.get('calls_per_node', 0) > budget:
+            violations.append('{operation} at {nodes} nodes: '
+                              '{calls_per_node:.1f} calls per node'.format(
+                                  **result) +
+                              ' exceed budget of {}'.format(budget))
+    return violations
+
+
+def get_revision():
+    """Return the current git revision or None."""
+    head = os.path.join(os.path.dirname(HERE), '.git', 'HEAD')
+    try:
+        with open(head) as head_file:
+            ref = head_file.read().strip()
+        if ref.startswith('ref: '):
+            with open(os.path.join(os.path.dirname(head), ref[5:])) as ref_file:
+                return ref_file.read().strip()
+        return ref
+    except (IOError, OSError):
+        return None
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma separated numbers of nodes.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per operation, the median is reported.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scroll-steps', type=int, default=20)
+    parser.add_argument('--output', help='Write results as JSON to this file '
+                                         'instead of stdout.')
+    parser.add_argument('--compare', help='Results file to compare against.')
+    parser.add_argument('--count-calls', action='store_true',
+                        help='Count calls into the nuke module.')
+    parser.add_argument('--budgets', help='JSON file of maximum calls per '
+                                          'node per operation. Implies '
+                                          '--count-calls.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmarks."""
+    args = parse_args(argv)
+    _, qt_widgets = get_qt()
+    app = qt_widgets.QApplication.instance() or qt_widgets.QApplication([])
+
+    count_calls = args.count_calls or bool(args.budgets)
+    if count_calls:
+        from node_table import instrumentation  # pylint: disable=import-outside-toplevel
+        instrumentation.enable()
+
+    bench = Benchmark(repeat=args.repeat, count_calls=count_calls)
+    for size in args.sizes.split(','):
+        run_size(bench, int(size), args)
+
+    report = {
+        'meta': {
+            'revision': get_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'nuke_stub_version': nuke.NUKE_VERSION_STRING,
+            'qt_platform': os.environ.get('QT_QPA_PLATFORM'),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': bench.results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        compare(bench.results, args.compare)
+
+    exit_code = 0
+    if args.budgets:
+        violations = check_budgets(bench.results, args.budgets)
+        for violation in violations:
+            sys.stderr.write('Budget exceeded: {}\n'.format(violation))
+        exit_code = 1 if violations else 0
+
+    app.quit()
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,722 @@
+"""Pure-Python stand-in for the parts of the nuke module node_table uses.
+
+This is not Nuke. It mimics the API well enough to load node_table headless
+(ie. with ``QT_QPA_PLATFORM=offscreen``) for benchmarking. Nodes are plain
+Python objects living in a module level node graph that can be filled with
+:mod:`synthetic` scripts of arbitrary size.
+"""
+
+# Import built-in modules
+import fnmatch
+
+# Pick the version matching the installed Qt binding so node_table imports
+# the binding that is available.
+try:
+    import PySide6  # noqa: F401 pylint: disable=unused-import
+    NUKE_VERSION_MAJOR = 16
+except ImportError:
+    try:
+        import PySide2  # noqa: F401 pylint: disable=unused-import
+        NUKE_VERSION_MAJOR = 15
+    except ImportError:
+        NUKE_VERSION_MAJOR = 16
+
+NUKE_VERSION_MINOR = 0
+NUKE_VERSION_STRING = '{}.0v1-stub'.format(NUKE_VERSION_MAJOR)
+
+ALL = 1
+NODIR = 2
+PLUGIN_EXT = 'so'
+
+env = {'nc': False, 'gui': False}
+
+# pylint: disable=invalid-name, missing-docstring, too-few-public-methods
+
+
+class Format(object):
+
+    def __init__(self, width, height, name, pixel_aspect=1.0):
+        self._width = width
+        self._height = height
+        self._name = name
+        self._pixel_aspect = pixel_aspect
+
+    def name(self):
+        return self._name
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def pixelAspect(self):
+        return self._pixel_aspect
+
+    def __str__(self):
+        return '{} {} {} {}'.format(self._width, self._height,
+                                    self._pixel_aspect, self._name)
+
+
+class Knob(object):
+    """Base of all knobs. Holds a single value."""
+
+    def __init__(self, name, value=None, visible=True, enabled=True):
+        self._name = name
+        self._value = value
+        self._visible = visible
+        self._enabled = enabled
+        self._expression = None
+        self._node = None
+
+    def name(self):
+        return self._name
+
+    def Class(self):
+        return type(self).__name__
+
+    def node(self):
+        return self._node
+
+    def value(self, *args):
+        return self._value
+
+    def getValue(self, *args):
+        return self.value(*args)
+
+    def setValue(self, value, *args):
+        self._value = value
+        _knob_changed(self)
+        return True
+
+    def visible(self):
+        return self._visible
+
+    def setVisible(self, visible):
+        self._visible = visible
+
+    def enabled(self):
+        return self._enabled
+
+    def setEnabled(self, enabled):
+        self._enabled = enabled
+
+    def hasExpression(self, *args):
+        return self._expression is not None
+
+    def setExpression(self, expression, *args):
+        self._expression = expression
+        return True
+
+    def isAnimated(self, *args):
+        return False
+
+    def isKeyAt(self, frame, *args):
+        return False
+
+    def toScript(self):
+        return str(self.value())
+
+
+class String_Knob(Knob):
+
+    def __init__(self, name, value='', **kwargs):
+        super(String_Knob, self).__init__(name, value, **kwargs)
+
+
+class EvalString_Knob(String_Knob):
+    pass
+
+
+class File_Knob(EvalString_Knob):
+    pass
+
+
+class Multiline_Eval_String_Knob(EvalString_Knob):
+    pass
+
+
+class PyScript_Knob(String_Knob):
+    pass
+
+
+class Tab_Knob(Knob):
+    pass
+
+
+class Text_Knob(Knob):
+    pass
+
+
+class Obsolete_Knob(Knob):
+    pass
+
+
+class Format_Knob(Knob):
+
+    def __init__(self, name, value=None, **kwargs):
+        super(Format_Knob, self).__init__(name, value or _FORMATS[0],
+                                          **kwargs)
+
+    def setValue(self, value, *args):
+        if not isinstance(value, Format):
+            for format_ in _FORMATS:
+                if format_.name() == value:
+                    value = format_
+                    break
+            else:
+                return False
+        return super(Format_Knob, self).setValue(value)
+
+
+class Axis_Knob(Knob):
+    """Read only matrix knob."""
+
+    def __init__(self, name, value=None, **kwargs):
+        value = value or [float(i % 5 == 0) for i in range(16)]
+        super(Axis_Knob, self).__init__(name, value, **kwargs)
+
+    def value(self, *args):
+        return list(self._value)
+
+
+class Transform2d_Knob(Axis_Knob):
+    pass
+
+
+class Array_Knob(Knob):
+    """Knob holding `width * height` floats, optionally animated."""
+
+    default = 0.0
+
+    def __init__(self, name, value=None, width=1, height=1, **kwargs):
+        self._width = width
+        self._height = height
+        if value is None:
+            value = [self.default] * (width * height)
+        elif not isinstance(value, (list, tuple)):
+            value = [value] * (width * height)
+        super(Array_Knob, self).__init__(name, list(value), **kwargs)
+        # Frame -> list of values.
+        self._keys = {}
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def arraySize(self):
+        return self._width * self._height
+
+    def _values_at(self, frame_):
+        if not self._keys:
+            return self._value
+        if frame_ in self._keys:
+            return self._keys[frame_]
+        # Hold the closest previous key.
+        previous = [f for f in self._keys if f <= frame_]
+        return self._keys[max(previous) if previous else min(self._keys)]
+
+    def _current_values(self):
+        if not self._keys:
+            return self._value
+        return self._values_at(frame())
+
+    def value(self, index=None, *args):
+        values = self._current_values()
+        if index is not None:
+            return values[int(index)]
+        if len(values) == 1:
+            return values[0]
+        return list(values)
+
+    def valueAt(self, frame_, index=0, *args):
+        return self._values_at(frame_)[int(index)]
+
+    def setValue(self, value, index=None, *args):
+        if index is not None:
+            self._value[int(index)] = value
+        elif isinstance(value, (list, tuple)):
+            self._value = list(value)
+        else:
+            self._value = [value] * len(self._value)
+        if self._keys:
+            self._keys[frame()] = list(self._value)
+        _knob_changed(self)
+        return True
+
+    def setValueAt(self, value, frame_, index=0, *args):
+        if not self._keys:
+            self._value[int(index)] = value
+        else:
+            keys = self._keys.setdefault(frame_, list(self._values_at(frame_)))
+            keys[int(index)] = value
+        _knob_changed(self)
+        return True
+
+    def setAnimated(self, *args):
+        if not self._keys:
+            self._keys[frame()] = list(self._value)
+        return True
+
+    def setKeyAt(self, frame_):
+        self._keys[frame_] = list(self._values_at(frame_))
+
+    def isAnimated(self, *args):
+        return bool(self._keys)
+
+    def isKeyAt(self, frame_, *args):
+        return frame_ in self._keys
+
+    def toScript(self):
+        values = self._current_values()
+        if len(values) == 1:
+            return str(values[0])
+        return '{' + ' '.join(str(v) for v in values) + '}'
+
+
+class Double_Knob(Array_Knob):
+    pass
+
+
+class WH_Knob(Array_Knob):
+    pass
+
+
+class Int_Knob(Array_Knob):
+    default = 0
+
+
+class Unsigned_Knob(Array_Knob):
+    default = 0
+
+
+class ColorChip_Knob(Unsigned_Knob):
+    pass
+
+
+class Boolean_Knob(Array_Knob):
+    default = False
+
+    def value(self, *args):
+        return bool(super(Boolean_Knob, self).value(*args))
+
+
+class Disable_Knob(Boolean_Knob):
+    pass
+
+
+class Enumeration_Knob(Array_Knob):
+
+    def __init__(self, name, values=(), value=None, **kwargs):
+        self._values = list(values)
+        super(Enumeration_Knob, self).__init__(name, 0, **kwargs)
+        if value is not None:
+            self.setValue(value)
+
+    def values(self):
+        return list(self._values)
+
+    def value(self, *args):
+        index = int(super(Enumeration_Knob, self).value())
+        return self._values[index] if self._values else ''
+
+    def setValue(self, value, *args):
+        if not isinstance(value, int):
+            if value not in self._values:
+                return False
+            value = self._values.index(value)
+        return super(Enumeration_Knob, self).setValue(value)
+
+
+class XY_Knob(Array_Knob):
+
+    def __init__(self, name, value=None, **kwargs):
+        super(XY_Knob, self).__init__(name, value, width=2, **kwargs)
+
+
+class XYZ_Knob(Array_Knob):
+
+    def __init__(self, name, value=None, **kwargs):
+        super(XYZ_Knob, self).__init__(name, value, width=3, **kwargs)
+
+
+class Color_Knob(Array_Knob):
+
+    def __init__(self, name, value=None, **kwargs):
+        super(Color_Knob, self).__init__(name, value, width=3, **kwargs)
+
+
+class AColor_Knob(Color_Knob):
+
+    def __init__(self, name, value=None, **kwargs):
+        Array_Knob.__init__(self, name, value, width=4, **kwargs)
+
+
+class IArray_Knob(Array_Knob):
+
+    def rows(self):
+        return self._height
+
+    def columns(self):
+        return self._width
+
+    def dimensions(self):
+        return 2
+
+    def value(self, row=None, column=None, *args):
+        values = self._current_values()
+        if row is None:
+            return list(values)
+        if column is None:
+            return values[int(row)]
+        return values[int(row) * self._width + int(column)]
+
+
+class Link_Knob(Knob):
+    pass
+
+
+class Node(object):
+    """A node with knobs. Group nodes hold child nodes."""
+
+    def __init__(self, node_class, name, knobs=(), xpos=0, ypos=0,
+                 parent=None):
+        self._class = node_class
+        self._knobs = {}
+        self._parent = parent
+        self._children = []
+        self._deleted = False
+        self._selected = False
+        self._xpos = xpos
+        self._ypos = ypos
+
+        self.addKnob(String_Knob('name', name))
+        for knob in knobs:
+            self.addKnob(knob)
+
+    def _check(self):
+        if self._deleted:
+            raise ValueError('A PythonObject is not attached to a node')
+
+    def addKnob(self, knob):
+        knob._node = self  # pylint: disable=protected-access
+        self._knobs[knob.name()] = knob
+
+    def removeKnob(self, knob):
+        self._knobs.pop(knob.name(), None)
+
+    def name(self):
+        self._check()
+        return self._knobs['name'].value()
+
+    def setName(self, name):
+        self._check()
+        self._knobs['name'].setValue(name)
+
+    def fullName(self):
+        self._check()
+        if self._parent is None or self._parent is _ROOT:
+            return self.name()
+        return self._parent.fullName() + '.' + self.name()
+
+    def Class(self):
+        self._check()
+        return self._class
+
+    def knobs(self):
+        self._check()
+        return dict(self._knobs)
+
+    def knob(self, name):
+        self._check()
+        if isinstance(name, int):
+            return list(self._knobs.values())[name]
+        return self._knobs.get(name)
+
+    def __getitem__(self, name):
+        knob = self.knob(name)
+        if knob is None:
+            raise NameError('unknown knob {}'.format(name))
+        return knob
+
+    def numKnobs(self):
+        return len(self._knobs)
+
+    def xpos(self):
+        self._check()
+        return self._xpos
+
+    def ypos(self):
+        self._check()
+        return self._ypos
+
+    def setXYpos(self, x, y):
+        self._xpos, self._ypos = x, y
+
+    def isSelected(self):
+        return self._selected
+
+    def setSelected(self, selected):
+        self._selected = selected
+
+    def selectOnly(self):
+        for node in allNodes(recurseGroups=True):
+            node.setSelected(False)
+        self.setSelected(True)
+
+    def nodes(self):
+        return [n for n in self._children if not n._deleted]  # pylint: disable=protected-access
+
+    def parent(self):
+        return self._parent
+
+    def __enter__(self):
+        _CONTEXT.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _CONTEXT.pop()
+
+    def __repr__(self):
+        state = 'deleted' if self._deleted else self._knobs['name'].value()
+        return '<Node {} {}>'.format(self._class, state)
+
+
+class Group(Node):
+    pass
+
+
+class Root(Group):
+    pass
+
+
+class Undo(object):
+    """Records undo groups without undoing anything."""
+
+    groups = []
+    _disabled = 0
+
+    def __init__(self, name=None):
+        self._name = name
+
+    def begin(self, name=None):
+        Undo.groups.append(name or self._name)
+
+    def end(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def name(self, name=None):
+        self._name = name
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *args):
+        self.end()
+
+    @staticmethod
+    def disable():
+        Undo._disabled += 1
+
+    @staticmethod
+    def enable():
+        Undo._disabled -= 1
+
+    @staticmethod
+    def disabled():
+        return Undo._disabled > 0
+
+
+# The node graph.
+_FORMATS = [Format(1920, 1080, 'HD_1080'), Format(2048, 1556, '2K_Super_35(full-ap)'),
+            Format(3840, 2160, 'UHD_4K'), Format(640, 480, 'PC_Video')]
+_ROOT = Root('Root', 'root', knobs=[
+    Double_Knob('frame', 1001),
+    Int_Knob('first_frame', 1001),
+    Int_Knob('last_frame', 1100),
+    Format_Knob('format'),
+])
+_PREFERENCES = Node('Preferences', 'preferences',
+                    knobs=[Boolean_Knob('ShadeDAGNodes', True)])
+_CONTEXT = [_ROOT]
+_CALLBACKS = {'knobChanged': []}
+_THIS = {'node': None, 'knob': None}
+_SCRIPT = {'name': ''}
+
+
+def _knob_changed(knob):
+    node = knob.node()
+    if not _CALLBACKS['knobChanged'] or node is None:
+        return
+    _THIS['node'], _THIS['knob'] = node, knob
+    try:
+        for callback, args, kwargs, node_class in _CALLBACKS['knobChanged']:
+            if node_class == '*' or node_class == node._class:  # pylint: disable=protected-access
+                callback(*args, **kwargs)
+    finally:
+        _THIS['node'], _THIS['knob'] = None, None
+
+
+def reset():
+    """Remove all nodes, callbacks and extra formats."""
+    for node in list(_ROOT._children):  # pylint: disable=protected-access
+        delete(node)
+    _ROOT._children = []  # pylint: disable=protected-access
+    del _FORMATS[4:]
+    del _CONTEXT[1:]
+    del Undo.groups[:]
+    _CALLBACKS['knobChanged'] = []
+    _ROOT['frame'].setValue(1001)
+    _SCRIPT['name'] = ''
+
+
+def add_node(node, parent=None):
+    """Add a node to the node graph, inside parent or the current context."""
+    parent = parent or thisGroup()
+    node._parent = parent  # pylint: disable=protected-access
+    parent._children.append(node)  # pylint: disable=protected-access
+    return node
+
+
+def thisGroup():
+    return _CONTEXT[-1]
+
+
+def thisNode():
+    return _THIS['node'] or thisGroup()
+
+
+def thisKnob():
+    return _THIS['knob']
+
+
+def root():
+    return _ROOT
+
+
+def frame(new_frame=None):
+    knob = _ROOT['frame']
+    if new_frame is not None:
+        knob.setValue(new_frame)
+    return knob._value[0]  # pylint: disable=protected-access
+
+
+def allNodes(filter=None, group=None, recurseGroups=False):  # pylint: disable=redefined-builtin
+    group = group or thisGroup()
+    result = []
+    for node in group.nodes():
+        if filter is None or node.Class() == filter:
+            result.append(node)
+        if recurseGroups and isinstance(node, Group):
+            result.extend(allNodes(filter, node, recurseGroups))
+    return result
+
+
+def selectedNodes(filter=None):
+    return [node for node in allNodes(filter) if node.isSelected()]
+
+
+def selectedNode():
+    selection = selectedNodes()
+    if not selection:
+        raise ValueError('no node selected')
+    return selection[-1]
+
+
+def toNode(name):
+    if name == 'preferences':
+        return _PREFERENCES
+    if name == 'root':
+        return _ROOT
+    group = _ROOT if '.' in name else thisGroup()
+    node = None
+    for part in name.split('.'):
+        node = None
+        for child in group.nodes():
+            if child.name() == part:
+                node = group = child
+                break
+        if node is None:
+            return None
+    return node
+
+
+def delete(node):
+    for child in list(node._children):  # pylint: disable=protected-access
+        delete(child)
+    if node._parent is not None:  # pylint: disable=protected-access
+        try:
+            node._parent._children.remove(node)  # pylint: disable=protected-access
+        except ValueError:
+            pass
+    node._deleted = True  # pylint: disable=protected-access
+
+
+def formats():
+    return list(_FORMATS)
+
+
+def addFormat(description):
+    width, height, name = description.split()[0], description.split()[1], \
+        description.split()[-1]
+    format_ = Format(int(width), int(height), name)
+    _FORMATS.append(format_)
+    return format_
+
+
+def defaultNodeColor(node_class):
+    return 0x7f7f7fff if node_class != 'Read' else 0xcccccc01
+
+
+def plugins(*args):
+    classes = set()
+    for node in allNodes(recurseGroups=True):
+        classes.add(node.Class() + '.' + PLUGIN_EXT)
+    return sorted(classes) or ['Blur.so', 'Grade.so', 'Merge2.so']
+
+
+def addKnobChanged(callback, args=(), kwargs=None, nodeClass='*'):
+    _CALLBACKS['knobChanged'].append((callback, args, kwargs or {},
+                                      nodeClass))
+
+
+def removeKnobChanged(callback, args=(), kwargs=None, nodeClass='*'):
+    entry = (callback, args, kwargs or {}, nodeClass)
+    if entry in _CALLBACKS['knobChanged']:
+        _CALLBACKS['knobChanged'].remove(entry)
+
+
+def scriptName():
+    if not _SCRIPT['name']:
+        raise RuntimeError('no script name')
+    return _SCRIPT['name']
+
+
+def ask(prompt):
+    return True
+
+
+def message(prompt):
+    pass
+
+
+def show(node, *args):
+    pass
+
+
+def zoom(*args):
+    pass
+
+
+def getColor(initial=0):
+    return initial
+
+
+def filename_match(pattern, name):
+    return fnmatch.fnmatch(name, pattern)
@@ -0,0 +1,216 @@
+"""Generate synthetic node graphs in the stand-in nuke module.
+
+Examples:
+    >>> import nuke
+    >>> from benchmarks import synthetic
+    >>> nodes = synthetic.generate_script(1000, seed=1)
+    >>> len(nuke.allNodes(recurseGroups=True))
+    1000
+
+"""
+
+# Import built-in modules
+import random
+
+# Import third-party modules
+import nuke  # pylint: disable=import-error
+
+COLORSPACES = ['linear', 'sRGB', 'rec709', 'ACES - ACEScg', 'Output - Rec.709']
+FILTERS = ['Impulse', 'Cubic', 'Keys', 'Simon', 'Rifman', 'Mitchell']
+OPERATIONS = ['over', 'plus', 'multiply', 'screen', 'max', 'min', 'from']
+
+
+def _common_knobs(rng, options):
+    """Knobs every node has."""
+    knobs = [
+        nuke.Disable_Knob('disable', rng.random() < 0.1),
+        nuke.Multiline_Eval_String_Knob(
+            'label', 'v{:03d}'.format(rng.randint(1, 20))
+            if rng.random() < 0.3 else ''),
+        nuke.ColorChip_Knob('tile_color',
+                            rng.choice([0, 0, 0, 0xff0000ff, 0x00ff00ff])),
+        nuke.ColorChip_Knob('note_font_color', 0),
+        nuke.PyScript_Knob('knobChanged',
+                           'print(nuke.thisKnob().name())'
+                           if rng.random() < 0.05 else '', visible=False),
+        nuke.Tab_Knob('Node'),
+    ]
+    return knobs
+
+
+def _blur(rng):
+    return [nuke.WH_Knob('size', rng.choice([0.0, 2.0, 10.0, 50.0, 150.0]),
+                         width=2),
+            nuke.Enumeration_Knob('filter', ['box', 'triangle', 'quadratic',
+                                             'gaussian'], 'gaussian'),
+            nuke.Double_Knob('mix', 1.0)]
+
+
+def _grade(rng):
+    return [nuke.AColor_Knob('blackpoint', 0.0),
+            nuke.AColor_Knob('whitepoint', 1.0),
+            nuke.AColor_Knob('black', 0.0),
+            nuke.AColor_Knob('white', rng.choice([1.0, 1.0, 1.0, 1.2])),
+            nuke.AColor_Knob('multiply', 1.0),
+            nuke.AColor_Knob('add', 0.0),
+            nuke.AColor_Knob('gamma', 1.0),
+            nuke.Boolean_Knob('white_clamp', False),
+            nuke.Boolean_Knob('black_clamp', True),
+            nuke.Double_Knob('mix', 1.0)]
+
+
+def _transform(rng):
+    return [nuke.XY_Knob('translate', [rng.uniform(-100, 100),
+                                       rng.uniform(-100, 100)]),
+            nuke.Double_Knob('rotate', rng.uniform(-180, 180)),
+            nuke.WH_Knob('scale', 1.0, width=2),
+            nuke.XY_Knob('center', [960.0, 540.0]),
+            nuke.Enumeration_Knob('filter', FILTERS, 'Cubic'),
+            nuke.Transform2d_Knob('matrix')]
+
+
+def _read(rng):
+    return [nuke.File_Knob('file', '/shows/abc/sh{:04d}/plate_v{:03d}.####.exr'
+                           .format(rng.randint(1, 999), rng.randint(1, 20))),
+            nuke.Format_Knob('format'),
+            nuke.Int_Knob('first', 1001),
+            nuke.Int_Knob('last', 1100),
+            nuke.Enumeration_Knob('colorspace', COLORSPACES,
+                                  rng.choice(COLORSPACES))]
+
+
+def _write(rng):
+    return [nuke.File_Knob('file', '/shows/abc/renders/comp_v{:03d}.####.exr'
+                           .format(rng.randint(1, 20))),
+            nuke.Enumeration_Knob('colorspace', COLORSPACES,
+                                  rng.choice(COLORSPACES)),
+            nuke.Enumeration_Knob('file_type', ['exr', 'dpx', 'jpeg', 'mov'],
+                                  'exr')]
+
+
+def _merge(rng):
+    return [nuke.Enumeration_Knob('operation', OPERATIONS,
+                                  rng.choice(OPERATIONS)),
+            nuke.Double_Knob('mix', rng.choice([1.0, 1.0, 0.5]))]
+
+
+def _color_matrix(rng):
+    return [nuke.IArray_Knob('matrix', [1.0, 0, 0, 0, 1.0, 0, 0, 0, 1.0],
+                             width=3, height=3)]
+
+
+def _camera(rng):
+    return [nuke.XYZ_Knob('translate', [rng.uniform(-10, 10)] * 3),
+            nuke.XYZ_Knob('rotate', 0.0),
+            nuke.Double_Knob('focal', rng.choice([35.0, 50.0])),
+            nuke.Axis_Knob('world_matrix')]
+
+
+def _reformat(rng):
+    return [nuke.Format_Knob('format'),
+            nuke.Enumeration_Knob('filter', FILTERS, 'Cubic')]
+
+
+# Node class -> (relative frequency, knob factory)
+NODE_CLASSES = {
+    'Blur': (5, _blur),
+    'Grade': (5, _grade),
+    'Transform': (4, _transform),
+    'Read': (3, _read),
+    'Write': (1, _write),
+    'Merge2': (4, _merge),
+    'ColorMatrix': (1, _color_matrix),
+    'Camera2': (1, _camera),
+    'Reformat': (2, _reformat),
+}
+
+
+def add_formats(count):
+    """Add studio formats.
+
+    Args:
+        count (int): Number of formats to add.
+
+    """
+    for i in range(count):
+        nuke.addFormat('{} {} studio_format_{:04d}'.format(1920 + i,
+                                                           1080 + i, i))
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def generate_script(num_nodes, seed=0, animated=0.1, groups=0.02,
+                    expressions=0.05, formats=100, select=True):
+    """Replace the stand-in node graph with a synthetic script.
+
+    Args:
+        num_nodes (int): Number of nodes to create, including groups and
+            the nodes inside of groups.
+        seed (int, optional): Seed of the random generator.
+        animated (float, optional): Ratio of array knobs to animate.
+        groups (float, optional): Ratio of groups. Each group holds up to 20
+            nodes.
+        expressions (float, optional): Ratio of array knobs with an
+            expression.
+        formats (int, optional): Number of additional formats.
+        select (bool, optional): Select all created top level nodes.
+
+    Returns:
+        :obj:`list` of :obj:`nuke.Node`: All created nodes.
+
+    """
+    nuke.reset()
+    add_formats(formats)
+
+    rng = random.Random(seed)
+    classes = []
+    for node_class, (frequency, _) in sorted(NODE_CLASSES.items()):
+        classes.extend([node_class] * frequency)
+
+    counters = {}
+    created = []
+    parent = nuke.root()
+    group_left = 0
+
+    while len(created) < num_nodes:
+        if group_left <= 0:
+            parent = nuke.root()
+            if rng.random() < groups and num_nodes - len(created) > 1:
+                counters['Group'] = counters.get('Group', 0) + 1
+                group = nuke.Group('Group', 'Group{}'.format(counters['Group']),
+                                   _common_knobs(rng, None),
+                                   xpos=len(created) % 100 * 110,
+                                   ypos=len(created) // 100 * 60)
+                nuke.add_node(group, parent)
+                group.setSelected(select)
+                created.append(group)
+                parent = group
+                group_left = rng.randint(1, 20)
+                continue
+
+        node_class = rng.choice(classes)
+        counters[node_class] = counters.get(node_class, 0) + 1
+        knobs = _common_knobs(rng, None) + NODE_CLASSES[node_class][1](rng)
+        node = nuke.Node(node_class,
+                         '{}{}'.format(node_class, counters[node_class]),
+                         knobs,
+                         xpos=len(created) % 100 * 110,
+                         ypos=len(created) // 100 * 60)
+
+        for knob in knobs:
+            if isinstance(knob, nuke.Array_Knob) and \
+                    not isinstance(knob, (nuke.Boolean_Knob,
+                                          nuke.Enumeration_Knob,
+                                          nuke.ColorChip_Knob)):
+                if rng.random() < animated:
+                    knob.setAnimated()
+                    knob.setKeyAt(1001)
+                    knob.setKeyAt(1050)
+                elif rng.random() < expressions:
+                    knob.setExpression('frame / 10')
+
+        nuke.add_node(node, parent)
+        node.setSelected(select and parent is nuke.root())
+        created.append(node)
+        group_left -= 1
+
+    return created
@@ -0,0 +1,27 @@
+"""Run the command line interface, see :mod:`node_table.cli`.
+
+Examples:
+    Without Nuke::
+
+        python -m node_table comp_v012.nk --class Read --knob file
+
+    Inside Nuke::
+
+        nuke -t path/to/node_table/__main__.py comp_v012.nk --knob file
+
+"""
+
+# Import built-in modules
+import os
+import sys
+
+if not __package__:
+    # Run as script, ie. by nuke -t, make the package importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+
+# Import local modules
+# pylint: disable=wrong-import-position
+from node_table import cli
+
+sys.exit(cli.main())
@@ -0,0 +1,427 @@
+"""Per-column statistics of the visible rows, updated incrementally.
+
+An Aggregate counts the distinct values of a column and, for numeric
+columns, keeps the sum, minimum and maximum. Changing a cell replaces one
+value instead of recomputing the whole column.
+
+ColumnModes keeps an Aggregate of all rows per column to tell which cells
+differ from the majority value of their column.
+
+Examples:
+    >>> aggregate = aggregate_column(table, 'size', rows)
+    >>> aggregate.summary()
+    'min 1 max 50 mean 12.5 distinct 4'
+    >>> ColumnModes(table).is_outlier(row=3, column=7)
+    True
+
+"""
+
+# Import built-in modules
+import numbers
+
+# Import local modules
+from node_table import columnar
+
+
+def hashable(value):
+    """Return a hashable version of a knob value.
+
+    Args:
+        value (object): Value of a knob.
+
+    Returns:
+        object: Lists as tuples, everything else unchanged.
+
+    """
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def is_number(value):
+    """bool: True for numbers, but not for booleans."""
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def extreme_key(value):
+    """Return a key to compare numbers and lists of numbers.
+
+    Args:
+        value (object): Hashable knob value.
+
+    Returns:
+        tuple: Scalars sort before tuples, None for other values.
+
+    """
+    if is_number(value):
+        return False, value
+    if isinstance(value, tuple) and value and \
+            all(is_number(v) for v in value):
+        return True, value
+    return None
+
+
+def format_number(value):
+    """Format a number compactly.
+
+    Args:
+        value (float): Number to format.
+
+    Returns:
+        str: Number with up to 6 significant digits.
+
+    """
+    return '{:.6g}'.format(value)
+
+
+# pylint: disable=too-many-instance-attributes
+class Aggregate(object):
+    """Distinct values of one column and statistics of its numbers.
+
+    Mean only considers scalar numbers. Minimum and maximum compare lists
+    of numbers, ie. of XY knobs, lexicographically after all scalars.
+
+    """
+
+    __slots__ = ('knob_name', 'values', 'counts', 'count', 'total',
+                 'numbers', '_min', '_max', '_summary', '_mode', '_mode_count')
+
+    def __init__(self, knob_name):
+        self.knob_name = knob_name
+        # Value by node, to replace it when a cell changes.
+        self.values = {}  # type: dict
+        # Number of rows by value.
+        self.counts = {}  # type: dict
+        # Number of rows with the knob.
+        self.count = 0
+        # Sum and number of scalar numbers.
+        self.total = 0.0
+        self.numbers = 0
+        # Cached extremes, None if they need to be recomputed.
+        self._min = None
+        self._max = None
+        self._summary = None
+        # Cached most common value and its count, None if unknown.
+        self._mode = None
+        self._mode_count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def distinct(self):
+        """int: Number of distinct values."""
+        return len(self.counts)
+
+    @property
+    def mean(self):
+        """float: Mean of all scalar numbers or None."""
+        if not self.numbers:
+            return None
+        return self.total / self.numbers
+
+    @property
+    def minimum(self):
+        """Smallest number or list of numbers, None if there are none."""
+        if self._min is None:
+            self._update_extremes()
+        return self._min
+
+    @property
+    def maximum(self):
+        """Largest number or list of numbers, None if there are none."""
+        if self._max is None:
+            self._update_extremes()
+        return self._max
+
+    @property
+    def mode(self):
+        """Most common value, None if there are no values."""
+        if self._mode is None and self.counts:
+            self._mode, self._mode_count = max(self.counts.items(),
+                                               key=lambda item: item[1])
+        return self._mode
+
+    @property
+    def majority(self):
+        """Value of more than half of the rows, None if there is none."""
+        mode = self.mode
+        if mode is not None and self._mode_count * 2 > self.count:
+            return mode
+        return None
+
+    def _update_extremes(self):
+        keys = [key for key in (extreme_key(value) for value in self.counts)
+                if key is not None]
+        if keys:
+            self._min = min(keys)[1]
+            self._max = max(keys)[1]
+
+    def add(self, node, value):
+        """Add the value of a row.
+
+        Args:
+            node (object): Node of the row.
+            value (object): Value of the knob, None if the node lacks it.
+
+        """
+        if value is None:
+            return
+        value = hashable(value)
+        self._summary = None
+        self.values[node] = value
+        count = self.counts[value] = self.counts.get(value, 0) + 1
+        self.count += 1
+        if self._mode is not None and count > self._mode_count:
+            self._mode = value
+            self._mode_count = count
+        if is_number(value):
+            self.total += value
+            self.numbers += 1
+        key = extreme_key(value)
+        if key is not None:
+            if self._min is not None and extreme_key(self._min) > key:
+                self._min = value
+            if self._max is not None and extreme_key(self._max) < key:
+                self._max = value
+
+    def discard(self, node):
+        """Remove the value of a row.
+
+        Args:
+            node (object): Node of the row.
+
+        """
+        value = self.values.pop(node, None)
+        if value is None:
+            return
+        self._summary = None
+        count = self.counts[value] - 1
+        if count:
+            self.counts[value] = count
+        else:
+            del self.counts[value]
+            if value == self._min:
+                self._min = None
+            if value == self._max:
+                self._max = None
+        if value == self._mode:
+            # Another value may be as common now.
+            self._mode = None
+        self.count -= 1
+        if is_number(value):
+            self.total -= value
+            self.numbers -= 1
+
+    def replace(self, node, value):
+        """Replace the value of a row after its cell changed.
+
+        Args:
+            node (object): Node of the row.
+            value (object): New value of the knob.
+
+        """
+        self.discard(node)
+        self.add(node, value)
+
+    def summary(self):
+        """Return the statistics as text.
+
+        Returns:
+            str: Minimum, maximum and mean for numbers, always the number of
+                distinct values.
+
+        """
+        if self._summary is not None:
+            return self._summary
+
+        parts = []
+        if self.numbers or self.minimum is not None:
+            for label, value in (('min', self.minimum),
+                                 ('max', self.maximum)):
+                if isinstance(value, tuple):
+                    value = ' '.join(format_number(v) for v in value)
+                elif value is not None:
+                    value = format_number(value)
+                parts.append('{} {}'.format(label, value))
+            if self.numbers:
+                parts.append('mean {}'.format(format_number(self.mean)))
+        parts.append('distinct {}'.format(self.distinct))
+        self._summary = '  '.join(parts)
+        return self._summary
+
+
+class ColumnModes(object):
+    """Majority value of every column of a table, to highlight outliers.
+
+    A column is counted over all rows when it is first asked for. After
+    that, changed knobs replace their value through the table's knob
+    listeners, so asking whether a cell is an outlier takes constant time.
+    An edit that changes a column's majority can make any of its cells an
+    outlier, so majority listeners are told to update the whole column.
+
+    """
+
+    def __init__(self, table):
+        """
+
+        Args:
+            table (core.TableCore): Table to count the values of.
+
+        """
+        self.table = table
+        # Aggregate of all rows by knob name.
+        self._aggregates = {}  # type: dict
+        # Called with the knob name after the majority of a column changed.
+        self.majority_listeners = []  # type: list
+        table.knob_listeners.append(self.knob_changed)
+
+    def close(self):
+        """Stop listening to knob changes of the table."""
+        if self.knob_changed in self.table.knob_listeners:
+            self.table.knob_listeners.remove(self.knob_changed)
+
+    def reset(self):
+        """Count all columns again, ie. after rows were added or removed."""
+        self._aggregates.clear()
+
+    def aggregate(self, knob_name):
+        """Return the values of all rows of a column, counting them if needed.
+
+        Args:
+            knob_name (str): Name of the column's knob.
+
+        Returns:
+            Aggregate: Values and counts of the column.
+
+        """
+        aggregate = self._aggregates.get(knob_name)
+        if aggregate is None:
+            aggregate = aggregate_column(self.table, knob_name,
+                                         range(self.table.row_count))
+            self._aggregates[knob_name] = aggregate
+        return aggregate
+
+    def is_outlier(self, row, column):
+        """Return True if a cell differs from its column's majority value.
+
+        Args:
+            row (int): Row of the cell.
+            column (int): Column of the cell.
+
+        Returns:
+            bool: False for cells without knob and for columns without a
+                value in more than half of their rows.
+
+        """
+        table = self.table
+        aggregate = self.aggregate(table.column_name(column))
+        majority = aggregate.majority
+        if majority is None:
+            return False
+        value = aggregate.values.get(table.nodes[row])
+        return value is not None and value != majority
+
+    def knob_changed(self, node, knob_name, row=None):
+        """Replace the value of a changed knob in its column's counts.
+
+        Calls the majority listeners if the column's majority changed.
+
+        Args:
+            node (object): Node of the knob.
+            knob_name (str): Name of the changed knob.
+            row (int, optional): Row of the node, unused.
+
+        """
+        aggregate = self._aggregates.get(knob_name)
+        if aggregate is None:
+            return
+        majority = aggregate.majority
+        try:
+            aggregate.replace(node, self.table.node_value(node, knob_name))
+        except ValueError:
+            # Node was deleted.
+            aggregate.discard(node)
+        if aggregate.majority != majority:
+            for listener in self.majority_listeners:
+                listener(knob_name)
+
+
+def aggregate_column(table, knob_name, rows):
+    """Aggregate the values of a column for given rows.
+
+    Numeric columns are read from the table's columnar buffers, all other
+    columns through the cell cache.
+
+    Args:
+        table (core.TableCore): Table to aggregate.
+        knob_name (str): Column to aggregate.
+        rows (list): Rows of the table to include, ie. rows passing the
+            filters.
+
+    Returns:
+        Aggregate: The statistics.
+
+    """
+    aggregate = Aggregate(knob_name)
+    nodes = table.nodes
+    column = table.numeric_column(knob_name)
+
+    if column is not None and columnar.numpy is not None and rows:
+        _add_numeric_vectorized(aggregate, column, nodes, rows)
+        return aggregate
+
+    add = aggregate.add
+    if column is not None:
+        get = column.get
+        for row in rows:
+            add(nodes[row], get(row))
+        return aggregate
+
+    try:
+        table_column = table.columns.index(knob_name)
+    except ValueError:
+        return aggregate
+    for row in rows:
+        try:
+            add(nodes[row], table.value(row, table_column))
+        except ValueError:
+            # Node was deleted.
+            continue
+    return aggregate
+
+
+def _add_numeric_vectorized(aggregate, column, nodes, rows):
+    """Fill an aggregate of a numeric column using NumPy.
+
+    Columns that mix scalars and lists are added row by row.
+
+    Args:
+        aggregate (Aggregate): Empty aggregate to fill.
+        column (columnar.NumericColumn): Values of all rows.
+        nodes (list): Nodes of all rows.
+        rows (list): Rows to include.
+
+    """
+    numpy = columnar.numpy
+    values, has_knob = column.to_numpy()
+    rows = numpy.asarray(rows, dtype=numpy.intp)
+    rows = rows[has_knob[rows]]
+    if not len(rows):  # pylint: disable=len-as-condition
+        return
+
+    codes = numpy.frombuffer(column.mask, dtype=numpy.uint8)[rows]
+    if not (codes == columnar.SCALAR).all():
+        for row in rows.tolist():
+            aggregate.add(nodes[row], column.get(row))
+        return
+
+    selected = values[rows, 0]
+    unique, counts = numpy.unique(selected, return_counts=True)
+    aggregate.values = dict(zip([nodes[row] for row in rows.tolist()],
+                                selected.tolist()))
+    aggregate.counts = dict(zip(unique.tolist(), counts.tolist()))
+    aggregate.count = aggregate.numbers = int(len(selected))
+    aggregate.total = float(selected.sum())
+    aggregate._min = float(unique[0])  # pylint: disable=protected-access
+    aggregate._max = float(unique[-1])  # pylint: disable=protected-access
@@ -0,0 +1,173 @@
+"""Query knob values from the command line, without Qt.
+
+Matching cells are written to stdout as soon as they are read, one line
+per cell, so the output can be piped into other tools. The columns are
+``node``, ``class``, ``knob`` and ``value``. The same layout can be read
+back by :mod:`node_table.importer`.
+
+Scripts are read with nk_reader, without Nuke. Inside ``nuke -t``, the
+open script is queried if no script is given, and ``--nuke`` opens the
+given script in Nuke so expressions are evaluated.
+
+Examples:
+    List the files of all Read nodes::
+
+        python -m node_table comp_v012.nk --class Read --knob file
+
+    Large blurs as CSV::
+
+        python -m node_table comp_v012.nk --class Blur \\
+            --where "size > 100" --format csv > blurs.csv
+
+    Inside Nuke::
+
+        nuke -t path/to/node_table/__main__.py comp_v012.nk --nuke --knob file
+
+"""
+
+# Import built-in modules
+import argparse
+import csv
+import json
+import sys
+
+# Import local modules
+from node_table import constants
+from node_table import export
+from node_table import inventory
+from node_table import nk_reader
+
+# Columns of every output line.
+COLUMNS = (export.NODE_COLUMN, export.CLASS_COLUMN, 'knob', 'value')
+
+
+def iter_cells(nodes, adapter, query):
+    """Yield every matching cell.
+
+    Args:
+        nodes (iterable): Nodes to query.
+        adapter (core.NodeAdapter): Reads the nodes.
+        query (inventory.Query): Filters of nodes, knobs and rows.
+
+    Yields:
+        tuple: (full node name, node class, knob name, value)
+
+    """
+    for name, node_class, values in query.iter_rows(nodes, adapter):
+        for knob_name, value in values:
+            yield name, node_class, knob_name, value
+
+
+def write_cells(stream, cells, file_format='jsonl'):
+    """Write cells one line at a time.
+
+    Args:
+        stream (file): Stream to write to, ie. sys.stdout.
+        cells (iterable): Cells as yielded by iter_cells().
+        file_format (str, optional): 'jsonl' or 'csv'.
+
+    Returns:
+        int: Number of written cells.
+
+    """
+    count = 0
+    if file_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(COLUMNS)
+        for name, node_class, knob_name, value in cells:
+            writer.writerow([name, node_class, knob_name,
+                             export.to_text(value)])
+            count += 1
+    else:
+        for name, node_class, knob_name, value in cells:
+            stream.write(json.dumps(dict(zip(COLUMNS, (
+                name, node_class, knob_name, export.to_json_value(value))))))
+            stream.write('\n')
+            count += 1
+    return count
+
+
+def get_nodes(script=None, use_nuke=False):
+    """Return the nodes to query and the adapter reading them.
+
+    Args:
+        script (str, optional): Path of a .nk script. Defaults to the
+            script open in Nuke.
+        use_nuke (bool, optional): Open the script in Nuke instead of
+            reading it with nk_reader.
+
+    Returns:
+        tuple: (iterable of nodes, core.NodeAdapter)
+
+    Raises:
+        ValueError: If Nuke is needed but not available.
+
+    """
+    if script and not use_nuke:
+        nk_script = nk_reader.NkScript(script)
+        return nk_script.iter_nodes(), nk_reader.NkScriptAdapter(nk_script)
+
+    if constants.nuke is None:
+        raise ValueError('Nuke is not available, give a script to read it '
+                         'without Nuke.')
+    # Import local modules
+    # pylint: disable=import-outside-toplevel
+    from node_table import nuke_adapter
+    if script:
+        constants.nuke.scriptOpen(script)
+    adapter = nuke_adapter.NukeNodeAdapter()
+    return adapter.all_nodes(), adapter
+
+
+def main(argv=None):
+    """Query a script and write the matching cells to stdout.
+
+    Args:
+        argv (list, optional): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Exit code.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m node_table',
+        description='Write knob values of a Nuke script to stdout.')
+    parser.add_argument('script', nargs='?',
+                        help='The .nk script, defaults to the script open in '
+                             'Nuke.')
+    parser.add_argument('--class', dest='node_classes', default='',
+                        help='Node classes, separated by commas.')
+    parser.add_argument('--name', dest='node_names', default='',
+                        help='Node names, separated by commas.')
+    parser.add_argument('--knob', dest='knob_names', default='',
+                        help='Knob names, separated by commas.')
+    parser.add_argument('--where', default='',
+                        help='Expression nodes must match, ie. "size > 100".')
+    parser.add_argument('--format', dest='file_format', default='jsonl',
+                        choices=('jsonl', 'csv'), help='Output format.')
+    parser.add_argument('--nuke', dest='use_nuke', action='store_true',
+                        help='Open the script in Nuke instead of parsing it, '
+                             'only inside nuke -t.')
+    args = parser.parse_args(argv)
+
+    try:
+        query = inventory.Query(node_classes=args.node_classes,
+                                node_names=args.node_names,
+                                knob_names=args.knob_names,
+                                where=args.where)
+        nodes, adapter = get_nodes(args.script, args.use_nuke)
+    except (IOError, OSError, ValueError) as error:
+        # Includes predicate.PredicateError.
+        parser.error(str(error))
+
+    try:
+        write_cells(sys.stdout, iter_cells(nodes, adapter, query),
+                    args.file_format)
+        sys.stdout.flush()
+    except IOError:
+        # Output closed early, ie. piped into head.
+        try:
+            sys.stdout.close()
+        except IOError:
+            pass
+    return 0
@@ -0,0 +1,134 @@
+"""Copy and paste rectangular ranges of cells as tab separated values.
+
+Text uses the tab separated dialect of spreadsheets, so ranges can be
+copied between the table and ie. Excel or Google Sheets. Strings are copied
+as they are, all other values as JSON, like in exported CSV files. Pasted
+text is converted to the type of each target knob by
+importer.coerce_value().
+
+Examples:
+    >>> text = to_tsv([['Blur1', [10.0, 10.0]], ['Blur2', [5.0, 5.0]]])
+    >>> parse_tsv(text)
+    [['Blur1', '[10.0, 10.0]'], ['Blur2', '[5.0, 5.0]']]
+
+"""
+
+# Import built-in modules
+import csv
+import io
+import sys
+
+# Import local modules
+from node_table import core
+from node_table import export
+from node_table import importer
+
+
+def to_tsv(values):
+    """Return a block of values as tab separated text.
+
+    Args:
+        values (list): Rows of values. None is written as an empty cell.
+
+    Returns:
+        str: Text with one line per row.
+
+    """
+    if sys.version_info.major >= 3:
+        stream = io.StringIO()
+    else:
+        stream = io.BytesIO()
+    writer = csv.writer(stream, dialect='excel-tab', lineterminator='\n')
+    for row in values:
+        writer.writerow([export.to_text(value) for value in row])
+    return stream.getvalue()
+
+
+def parse_tsv(text):
+    """Split tab separated text into a block of cells.
+
+    Args:
+        text (str): Text copied from the table or a spreadsheet.
+
+    Returns:
+        :obj:`list` of :obj:`list` of :obj:`str`: Rows of cells. A trailing
+            line break does not add an empty row.
+
+    """
+    lines = text.splitlines()
+    while lines and not lines[-1]:
+        lines.pop()
+    return [row or [''] for row in csv.reader(lines, dialect='excel-tab')]
+
+
+def copy_values(table, rows, knob_names, selected=None):
+    """Return the values of a range of cells.
+
+    Args:
+        table (core.TableCore): Table to read.
+        rows (list): Rows of the range in order.
+        knob_names (list): Knob names of the range in order.
+        selected (set, optional): (row, knob name) of the cells to copy.
+            Other cells of the range are empty. Defaults to all cells.
+
+    Returns:
+        list: Rows of values, None for missing knobs and unselected cells.
+
+    """
+    values = []
+    for row in rows:
+        node = table.nodes[row]
+        knobs = table.records[node].knobs
+        row_values = []
+        for knob_name in knob_names:
+            value = None
+            if knob_name in knobs and (
+                    selected is None or (row, knob_name) in selected):
+                try:
+                    value = table.node_value(node, knob_name)
+                except ValueError:
+                    # Node was deleted.
+                    pass
+            row_values.append(value)
+        values.append(row_values)
+    return values
+
+
+def paste_changes(table, rows, knob_names, block):
+    """Return the changes of pasting a block of text into a range of cells.
+
+    The block is repeated to fill the range, so a single value fills all
+    cells. Cells without a knob and empty text are skipped.
+
+    Args:
+        table (core.TableCore): Table to paste into.
+        rows (list): Rows of the target range in order.
+        knob_names (list): Knob names of the target range in order.
+        block (list): Rows of text, ie. from parse_tsv().
+
+    Returns:
+        tuple: (list of core.Change, list of error messages)
+
+    """
+    changes = []
+    errors = []
+    if not block:
+        return changes, errors
+    for i, row in enumerate(rows):
+        node = table.nodes[row]
+        record = table.records[node]
+        texts = block[i % len(block)]
+        for j, knob_name in enumerate(knob_names):
+            text = texts[j % len(texts)]
+            if not text or knob_name not in record.knobs:
+                continue
+            try:
+                old = table.node_value(node, knob_name)
+                new = importer.coerce_value(text, old)
+            except ValueError as error:
+                errors.append('{}.{}: {}'.format(record.name, knob_name,
+                                                 error))
+                continue
+            if new != old:
+                changes.append(core.Change(node, knob_name, old, new))
+    return changes, errors
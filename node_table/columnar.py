@@ -0,0 +1,267 @@
+"""Numeric knob values of all rows in contiguous float buffers.
+
+Building a fresh Python list for every numeric cell is slow and memory
+hungry on large tables. A NumericSnapshot stores each numeric column in one
+``array('d')`` with a mask of the rows that have the knob. Sorting,
+aggregation and export read the buffers instead of asking Nuke.
+
+Columns are filled lazily, in one pass over all rows, the first time they
+are needed. Knobs whose value changes without an edit, ie. animated knobs,
+can not be kept, so their columns are not filled and are read live
+instead. NumPy is optional and only used by NumericColumn.to_numpy().
+
+Examples:
+    >>> snapshot = NumericSnapshot(adapter)
+    >>> column = snapshot.column('size', records)
+    >>> column.get(0)
+    3.0
+
+"""
+
+# Import built-in modules
+from array import array
+import numbers
+
+# Import third-party modules
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Mask codes besides the number of components of list values.
+MISSING = 0
+SCALAR = 255
+
+
+class NumericColumn(object):
+    """Values of one knob of all rows.
+
+    Every row takes ``width`` floats in ``values``. The mask stores for
+    every row MISSING, SCALAR or the number of components of a list value.
+
+    """
+
+    __slots__ = ('knob_name', 'width', 'values', 'mask')
+
+    def __init__(self, knob_name, width, num_rows):
+        self.knob_name = knob_name
+        self.width = width
+        self.values = array('d', [0.0]) * (width * num_rows)
+        self.mask = bytearray(num_rows)
+
+    def __len__(self):
+        return len(self.mask)
+
+    @classmethod
+    def from_values(cls, knob_name, values):
+        """Build a column from the values of all rows.
+
+        Args:
+            knob_name (str): Name of the knob.
+            values (list): Value of every row, None where the node lacks the
+                knob.
+
+        Returns:
+            NumericColumn: The column or None if a value is not numeric.
+
+        """
+        width = 1
+        for value in values:
+            if isinstance(value, (list, tuple)):
+                if len(value) >= SCALAR:
+                    return None
+                width = max(width, len(value))
+
+        column = cls(knob_name, width, len(values))
+        for row, value in enumerate(values):
+            if value is not None and not column.set(row, value):
+                return None
+        return column
+
+    def get(self, row, default=None):
+        """Return the value of a row.
+
+        Args:
+            row (int): Row.
+            default (object): Returned if the node lacks the knob.
+
+        Returns:
+            float|list: The value.
+
+        """
+        code = self.mask[row]
+        if code == MISSING:
+            return default
+        start = row * self.width
+        if code == SCALAR:
+            return self.values[start]
+        return self.values[start:start + code].tolist()
+
+    def set(self, row, value):
+        """Store the value of a row.
+
+        Args:
+            row (int): Row.
+            value (float|list): New value or None if the node lacks the knob.
+
+        Returns:
+            bool: False if the value does not fit into the column.
+
+        """
+        start = row * self.width
+        if value is None:
+            self.mask[row] = MISSING
+            return True
+        if isinstance(value, numbers.Number) and \
+                not isinstance(value, bool):
+            self.values[start] = value
+            self.mask[row] = SCALAR
+            return True
+        if isinstance(value, (list, tuple)) and len(value) <= self.width:
+            try:
+                self.values[start:start + len(value)] = array('d', value)
+            except TypeError:
+                return False
+            self.mask[row] = len(value)
+            return True
+        return False
+
+    def permute(self, permutation):
+        """Reorder the rows.
+
+        Args:
+            permutation (list): Old rows in new order.
+
+        """
+        width = self.width
+        values = self.values
+        new_values = array('d')
+        for old_row in permutation:
+            new_values.extend(values[old_row * width:(old_row + 1) * width])
+        self.values = new_values
+        mask = self.mask
+        self.mask = bytearray(mask[old_row] for old_row in permutation)
+
+    def to_numpy(self):
+        """Return the values as array of shape (rows, width) and the mask.
+
+        The values are a view on the buffer without copying.
+
+        Returns:
+            tuple: (numpy.ndarray of values, numpy.ndarray of bool, True
+                where the node has the knob)
+
+        Raises:
+            ImportError: If NumPy is not installed.
+
+        """
+        if numpy is None:
+            raise ImportError('NumPy is required for to_numpy().')
+        values = numpy.frombuffer(self.values, dtype=numpy.float64)
+        values = values.reshape((len(self.mask), self.width))
+        mask = numpy.frombuffer(self.mask, dtype=numpy.uint8) != MISSING
+        return values, mask
+
+
+class NumericSnapshot(object):
+    """Numeric columns of a table, filled on demand.
+
+    Columns are dropped when rows are added or removed and permuted when
+    rows are sorted, so they always match the row order of the table.
+
+    """
+
+    def __init__(self, adapter):
+        """
+
+        Args:
+            adapter (core.NodeAdapter): Reads the knob values.
+
+        """
+        self.adapter = adapter
+        self.columns = {}  # type: dict
+        # Knobs found not to be numeric.
+        self._skipped = set()  # type: set
+
+    def __contains__(self, knob_name):
+        return knob_name in self.columns
+
+    def column(self, knob_name, records):
+        """Return the column of a knob, filling it if necessary.
+
+        Args:
+            knob_name (str): Name of the knob.
+            records (list): Metadata of all rows in row order.
+
+        Returns:
+            NumericColumn: The column or None if the knob is not numeric or
+                volatile in any row.
+
+        """
+        column = self.columns.get(knob_name)
+        if column is not None or knob_name in self._skipped:
+            return column
+
+        is_numeric = self.adapter.is_numeric
+        is_volatile = self.adapter.is_volatile
+        values = []
+        for record in records:
+            knob = record.knobs.get(knob_name)
+            if knob is None:
+                values.append(None)
+                continue
+            if not is_numeric(knob) or is_volatile(knob):
+                self._skipped.add(knob_name)
+                return None
+            try:
+                values.append(self.adapter.get_value(knob))
+            except ValueError:
+                # Node was deleted.
+                values.append(None)
+
+        column = NumericColumn.from_values(knob_name, values)
+        if column is None:
+            self._skipped.add(knob_name)
+        else:
+            self.columns[knob_name] = column
+        return column
+
+    def update(self, row, knob_name, value):
+        """Store a new value of a cell if its column was filled.
+
+        Args:
+            row (int): Row of the cell.
+            knob_name (str): Knob of the cell.
+            value (object): New value.
+
+        """
+        column = self.columns.get(knob_name)
+        if column is not None and not column.set(row, value):
+            # The value does not fit, ie. has more components than before.
+            del self.columns[knob_name]
+
+    def discard(self, knob_name):
+        """Drop the column of a knob until the rows change, ie. after a knob
+            of it became volatile.
+
+        Args:
+            knob_name (str): Name of the knob.
+
+        """
+        self.columns.pop(knob_name, None)
+        self._skipped.add(knob_name)
+
+    def permute(self, permutation):
+        """Reorder the rows of all columns.
+
+        Args:
+            permutation (list): Old rows in new order.
+
+        """
+        for column in self.columns.values():
+            column.permute(permutation)
+
+    def clear(self):
+        """Drop all columns."""
+        self.columns.clear()
+        self._skipped.clear()
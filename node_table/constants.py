@@ -1,23 +1,78 @@
 """Define all constant variables here."""
 
 # pylint: disable=import-error
-import nuke
+try:
+    import nuke
+except ImportError:
+    # The table core and command line tools run without Nuke.
+    nuke = None
 
 PACKAGE_NICE_NAME = 'Node Spreadsheet'
 
 FILTER_DELIMITER = ','
 
+# Maximum number of completions offered for a filter term.
+COMPLETER_MAX_MATCHES = 100
+
 # Knob classes that can't be edited directly
 READ_ONLY_KNOBS = [
     nuke.Axis_Knob,
     nuke.Transform2d_Knob,
-]
+] if nuke else []
+
+# Knob classes whose values are kept in float buffers by columnar.py
+NUMERIC_KNOBS = [
+    nuke.Double_Knob,
+    nuke.WH_Knob,
+    nuke.XY_Knob,
+    nuke.XYZ_Knob,
+    nuke.Color_Knob,
+    nuke.IArray_Knob,
+] if nuke else []
+
+# Knob classes whose values are indexed for full text search by search.py,
+# including subclasses like File_Knob or Multiline_Eval_String_Knob
+TEXT_KNOBS = [
+    nuke.String_Knob,
+    nuke.Enumeration_Knob,
+] if nuke else []
+
+# Seconds to spend building the search index per event loop iteration
+SEARCH_INDEX_SLICE = 0.02
+
+# Number of values replaced per event loop iteration
+REPLACE_CHUNK_SIZE = 250
+# Maximum number of changes listed in the replace preview
+REPLACE_PREVIEW_MAX_ROWS = 1000
+
+# Nodes loaded into a table at a time when querying scripts without a view
+QUERY_CHUNK_SIZE = 1000
+
+# Snapshots of the last loads, shown while their cells are revalidated.
+# Directory of the cache files, overridden by $NODE_TABLE_CACHE_DIR.
+SNAPSHOT_CACHE_DIR = '~/.nuke/node_table_cache'
+# Number of cached snapshots kept, oldest are deleted first
+SNAPSHOT_CACHE_MAX_FILES = 20
+# Tables with more cells are not cached
+SNAPSHOT_CACHE_MAX_CELLS = 500000
+# Seconds to spend revalidating cached cells per event loop iteration
+SNAPSHOT_REVALIDATE_SLICE = 0.02
+# Milliseconds after hiding the table until its snapshot is cached
+SNAPSHOT_SAVE_DELAY = 2000
 
 # Colors
 # knob is animated
 KNOB_ANIMATED_COLOR = (0.312839, 0.430188, 0.544651)
 # knob has key at current frame
 KNOB_HAS_KEY_AT_COLOR = (0.165186, 0.385106, 0.723738)
+# cell matches the find bar's search
+SEARCH_MATCH_COLOR = (0.588, 0.49, 0.176)
+# cell differs from the compared snapshot
+DIFF_CHANGED_COLOR = (0.541, 0.388, 0.157)
+DIFF_ADDED_COLOR = (0.208, 0.447, 0.224)
+DIFF_REMOVED_COLOR = (0.51, 0.2, 0.2)
+# cell differs from the majority value of its column
+OUTLIER_COLOR = (0.557, 0.267, 0.514)
 
 # Mix background color with node color by this amount
 # if cell has no knob:
@@ -36,6 +91,13 @@ EDITOR_DECIMALS = 8
 # Ask for user confirmation before loading more than this many nodes.
 NUM_NODES_WARN_BEFORE_LOAD = 50
 
+# Seconds a cached knob value is shown before it is read again. Catches
+# changes made outside of the table.
+CELL_CACHE_MAX_AGE = 1.0
+
+# Maximum number of spans kept in memory while tracing.
+TRACE_BUFFER_SIZE = 100000
+
 # Shading mode follows preferences when not in non-commercial mode.
 # Skip checking the preferences node since that counts towards the
 # 10 nodes limit in non-commercial edition.
@@ -0,0 +1,1216 @@
+"""Qt-free table engine beneath the NodeTableModel.
+
+The core keeps the ordered rows and columns, a knob index, filter matching,
+sorting and a cell cache. Nodes are only read through a NodeAdapter, so the
+core can be tested, benchmarked and profiled without Qt or Nuke.
+
+The Qt models in :mod:`node_table.model` are thin wrappers that emit the
+model signals around the mutations of the core.
+
+Examples:
+    >>> table = TableCore(adapter)
+    >>> removed, added = table.diff(table.read(nodes))
+    >>> table.insert_rows(0, added)
+    >>> table.value(0, 0)
+
+"""
+
+# Import built-in modules
+import collections
+import numbers
+import time
+
+# Import local modules
+from node_table import columnar
+from node_table import constants
+from node_table import instrumentation
+from node_table import metadata
+
+# Keys to sort rows by, besides knob values.
+SORT_BY_NAME = 'name'
+SORT_BY_CLASS = 'class'
+SORT_BY_POSITION = 'position'
+# Sort key of cells without a knob.
+MISSING_SORT_KEY = (3, 0)
+
+# Knobs whose values are part of a node's metadata.
+METADATA_KNOBS = ('name', 'tile_color', 'note_font_color')
+
+# Marks a cached cell whose value must be read live, ie. animated knobs.
+VOLATILE = object()
+
+# A pending change of a knob's value, ie. from a replacement or an import.
+Change = collections.namedtuple('Change', 'node knob_name old new')
+
+
+def bisect_case_insensitive(sorted_list, new_item):
+    """Locate the insertion point for new_item to maintain sorted order.
+
+    Taken from https://stackoverflow.com/a/41903429
+
+    Args:
+        sorted_list (list): Sorted list.
+        new_item (str): Item to find sorted location for.
+
+    Returns:
+        int: Index at which point new_item must be inserted.
+
+    """
+    key = new_item.lower()
+    low, high = 0, len(sorted_list)
+    while low < high:
+        mid = (low + high) // 2
+        if key < sorted_list[mid].lower():
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def get_sort_key(value):
+    """Return a key to sort values of mixed types.
+
+    Numbers sort before arrays of numbers, before strings. Missing values
+    (None) sort last. Strings sort case insensitive.
+
+    Examples:
+        >>> sorted([None, 'b', 2, 'A', [1.0, 2.0]], key=get_sort_key)
+        [2, [1.0, 2.0], 'A', 'b', None]
+
+    Args:
+        value (object): Value of a knob.
+
+    Returns:
+        tuple: (rank of type, comparable value)
+
+    """
+    if value is None:
+        return MISSING_SORT_KEY
+    if isinstance(value, numbers.Number):
+        return 0, value
+    if isinstance(value, (list, tuple)):
+        try:
+            return 1, tuple(float(v) for v in value)
+        except (TypeError, ValueError):
+            pass
+    return 2, str(value).lower()
+
+
+class UndoGroup(object):
+    """Groups edits into one undo step. This default does nothing.
+
+    Use as context manager or call begin() and end(), ie. when edits are
+    applied over several iterations of the event loop.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def begin(self):
+        """Start recording edits."""
+
+    def end(self):
+        """Finish the undo step."""
+
+    def cancel(self):
+        """Finish without recording an undo step."""
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *args):
+        self.end()
+
+
+class NodeAdapter(object):
+    """Interface the core uses to read and write nodes.
+
+    Implement this to show nodes of another source than the running Nuke
+    session, ie. nodes parsed from a script file.
+
+    """
+
+    # True if set_value() is not supported.
+    read_only = False
+
+    def read(self, node, default_colors=None):
+        """Read the metadata of a node.
+
+        Args:
+            node (object): Node to read.
+            default_colors (dict, optional): Cache of default node colors
+                per node class, shared between calls of one load.
+
+        Returns:
+            metadata.NodeMetadata: Metadata or None if the node is gone.
+
+        """
+        raise NotImplementedError
+
+    def all_nodes(self):
+        """Return all nodes of the script, including nodes inside groups.
+
+        Returns:
+            list: The nodes.
+
+        """
+        raise NotImplementedError
+
+    def full_name(self, node):
+        """Return the name of a node including its parent groups.
+
+        Args:
+            node (object): Node to get the name of.
+
+        Returns:
+            str: Full name or None if unknown, then the name is used.
+
+        Raises:
+            ValueError: If the node was deleted.
+
+        """
+        return None
+
+    def exists(self, node):
+        """Return True if the node still exists.
+
+        Args:
+            node (object): Node to check.
+
+        Returns:
+            bool: True if node exists.
+
+        """
+        raise NotImplementedError
+
+    def get_value(self, knob):
+        """Return the value of a knob as displayed and edited in the table.
+
+        Args:
+            knob (object): Knob to read.
+
+        Returns:
+            object: Value of the knob.
+
+        Raises:
+            ValueError: If the knob's node was deleted.
+
+        """
+        raise NotImplementedError
+
+    def is_volatile(self, knob):
+        """Return True if the value of a knob must not be cached.
+
+        Args:
+            knob (object): Knob to check.
+
+        Returns:
+            bool: True if the value changes without editing the knob, ie.
+                when animated or driven by an expression.
+
+        """
+        return False
+
+    def is_numeric(self, knob):
+        """Return True if the values of a knob are floats or lists of floats.
+
+        Args:
+            knob (object): Knob to check.
+
+        Returns:
+            bool: True if the values can be kept in a columnar buffer.
+
+        """
+        return False
+
+    def is_text(self, knob):
+        """Return True if the values of a knob are strings.
+
+        Args:
+            knob (object): Knob to check.
+
+        Returns:
+            bool: True if the values are indexed for full text search.
+
+        """
+        return False
+
+    def accepts_value(self, knob, value):
+        """Return True if a knob can be set to a value.
+
+        Args:
+            knob (object): Knob to check.
+            value (object): New value as returned by get_value().
+
+        Returns:
+            bool: False if set_value() would reject the value.
+
+        """
+        return True
+
+    def set_value(self, knob, value):
+        """Set the value of a knob.
+
+        Args:
+            knob (object): Knob to edit.
+            value (object): New value as returned by get_value().
+
+        Returns:
+            bool: True if the value was set.
+
+        """
+        raise NotImplementedError
+
+    def undo_group(self, name):
+        """Return a group to record many edits as one undo step.
+
+        Args:
+            name (str): Name of the step shown in the undo history.
+
+        Returns:
+            UndoGroup: The group, not begun yet.
+
+        """
+        return UndoGroup(name)
+
+    def position(self, node):
+        """Return the position of a node in the DAG.
+
+        Args:
+            node (object): Node to get the position of.
+
+        Returns:
+            tuple: (y, x) position to sort nodes from top to bottom.
+
+        Raises:
+            ValueError: If the node was deleted.
+
+        """
+        raise NotImplementedError
+
+    def script_state(self):
+        """Return what identifies the script and its contents.
+
+        Used to key snapshots of a table in the warm start cache.
+
+        Returns:
+            list: JSON serializable state, ie. path and modification time,
+                or None if unknown, which disables the cache.
+
+        """
+        return None
+
+
+class ListFilter(object):
+    """Match strings against a list of terms separated by a delimiter.
+
+    A single term matches as substring, several terms must match exactly.
+    Matching is case insensitive.
+
+    Examples:
+        >>> list_filter = ListFilter('blur')
+        >>> list_filter.match('Blur1')
+        True
+        >>> list_filter.filter_str = 'blur, grade'
+        >>> list_filter.match('Blur1')
+        False
+
+    """
+
+    def __init__(self, filter_str='', delimiter=constants.FILTER_DELIMITER):
+        self.delimiter = delimiter
+        self.terms = []  # type: list
+        self.filter_str = filter_str
+
+    @property
+    def filter_str(self):
+        """str: Terms separated by the delimiter."""
+        return self.delimiter.join(self.terms)
+
+    @filter_str.setter
+    def filter_str(self, filter_str):
+        self.terms = [term.strip().lower() for term
+                      in (filter_str or '').split(self.delimiter)]
+        if self.terms == ['']:
+            self.terms = []
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    __nonzero__ = __bool__
+
+    def match(self, string):
+        """Check if string matches the filter.
+
+        Args:
+            string (str): Match this string against the filter.
+
+        Returns:
+            bool: True if string matches or the filter is empty.
+
+        """
+        if not self.terms:
+            return True
+
+        # Case sensitive filtering is confusing and unnecessary.
+        string = string.lower()
+
+        # Check for full name in case filter list is more than one item.
+        if len(self.terms) > 1:
+            return string in self.terms
+        # Check for substring.
+        return self.terms[0] in string
+
+
+def accepts_knob_states(records, knob_name, hidden, disabled):
+    """Return True if any node shows a knob with the allowed states.
+
+    Args:
+        records (iterable): Metadata of the nodes.
+        knob_name (str): Name of the knob.
+        hidden (bool): Accept hidden knobs.
+        disabled (bool): Accept disabled knobs.
+
+    Returns:
+        bool: True if the knob's column should be shown.
+
+    """
+    if hidden and disabled:
+        return True
+
+    for record in records:
+        if not record:
+            continue
+        # Metadata knobs include linked knobs.
+        knob = record.knobs.get(knob_name)
+        if knob:
+            if ((hidden or knob.visible()) and
+                    (disabled or knob.enabled())):
+                return True
+    return False
+
+
+def any_has_knob(records, knob_name):
+    """Return True if any node has a knob.
+
+    Args:
+        records (iterable): Metadata of the nodes.
+        knob_name (str): Name of the knob.
+
+    Returns:
+        bool: True if at least one node has the knob.
+
+    """
+    for record in records:
+        if record and knob_name in record.knobs:
+            return True
+    return False
+
+
+class CellCache(object):
+    """Knob values by node and knob name, valid for a limited time.
+
+    Values of knobs edited outside of the table are refreshed after at most
+    ``max_age`` seconds. Volatile knobs are remembered as such so the adapter
+    is not asked again whether they are volatile.
+
+    """
+
+    def __init__(self, counters, max_age=constants.CELL_CACHE_MAX_AGE):
+        self.counters = counters
+        self.max_age = max_age
+        # node -> knob name -> (value, time), so all cells of a removed node
+        # are dropped at once.
+        self._cells = {}  # type: dict
+        # Incremented on every change, ie. to tell if a snapshot is stale.
+        self.generation = 0
+
+    def __len__(self):
+        return sum(len(cells) for cells in self._cells.values())
+
+    def _cell(self, node, knob_name):
+        cells = self._cells.get(node)
+        return cells.get(knob_name) if cells else None
+
+    def get(self, node, knob_name, default=None):
+        """Return a cached value.
+
+        Args:
+            node (object): Node of the cell.
+            knob_name (str): Knob of the cell.
+            default (object): Returned on a cache miss.
+
+        Returns:
+            object: The value, VOLATILE or default.
+
+        """
+        cell = self._cell(node, knob_name)
+        if cell is not None and time.time() - cell[1] <= self.max_age:
+            self.counters.cache_hits += 1
+            return cell[0]
+        self.counters.cache_misses += 1
+        return default
+
+    def peek(self, node, knob_name, default=None):
+        """Return a cached value without counting a hit or miss.
+
+        Args:
+            node (object): Node of the cell.
+            knob_name (str): Knob of the cell.
+            default (object): Returned if the value is not cached.
+
+        Returns:
+            object: The value, VOLATILE or default.
+
+        """
+        cell = self._cell(node, knob_name)
+        if cell is not None and time.time() - cell[1] <= self.max_age:
+            return cell[0]
+        return default
+
+    def last(self, node, knob_name, default=None):
+        """Return the last stored value, no matter how old it is.
+
+        Args:
+            node (object): Node of the cell.
+            knob_name (str): Knob of the cell.
+            default (object): Returned if no value was stored.
+
+        Returns:
+            object: The value, VOLATILE or default.
+
+        """
+        cell = self._cell(node, knob_name)
+        if cell is None:
+            return default
+        return cell[0]
+
+    def put(self, node, knob_name, value):
+        """Store a value.
+
+        Args:
+            node (object): Node of the cell.
+            knob_name (str): Knob of the cell.
+            value (object): Value or VOLATILE.
+
+        """
+        cells = self._cells.get(node)
+        if cells is None:
+            cells = self._cells[node] = {}
+        cells[knob_name] = (value, time.time())
+        self.generation += 1
+
+    def seed(self, node, knob_name, value):
+        """Store a value that stays valid until it is put or invalidated.
+
+        Used for values of a snapshot that are revalidated later.
+
+        Args:
+            node (object): Node of the cell.
+            knob_name (str): Knob of the cell.
+            value (object): Value of the cell.
+
+        """
+        cells = self._cells.get(node)
+        if cells is None:
+            cells = self._cells[node] = {}
+        cells[knob_name] = (value, float('inf'))
+        self.generation += 1
+
+    def invalidate(self, node, knob_name=None):
+        """Drop the cached value of a cell or of all cells of a node.
+
+        Args:
+            node (object): Node of the cells.
+            knob_name (str, optional): Knob of the cell. Drop all cells of
+                the node if not given.
+
+        """
+        self.generation += 1
+        if knob_name is None:
+            self._cells.pop(node, None)
+            return
+        cells = self._cells.get(node)
+        if cells:
+            cells.pop(knob_name, None)
+
+    def clear(self):
+        """Drop all cached values."""
+        self._cells.clear()
+        self.generation += 1
+
+
+# pylint: disable=too-many-instance-attributes, too-many-public-methods
+class TableCore(object):
+    """Ordered rows of nodes and columns of knob names.
+
+    Rows stay sorted by name on insertion, columns by knob name. All reads
+    from nodes go through the adapter.
+
+    """
+
+    def __init__(self, adapter, counters=None, knob_table=None):
+        """
+
+        Args:
+            adapter (NodeAdapter): Reads and writes the nodes.
+            counters (instrumentation.PerformanceCounters, optional): Cache
+                hits and misses are counted here.
+            knob_table (metadata.KnobNameTable, optional): Interned knob
+                names. Defaults to the table shared by all tables.
+
+        """
+        self.adapter = adapter
+        self.counters = counters or instrumentation.PerformanceCounters()
+        self.cache = CellCache(self.counters)
+        self.numeric = columnar.NumericSnapshot(adapter)
+        self.knob_table = knob_table or metadata.KNOB_NAMES
+
+        self.nodes = []  # type: list
+        # Columns as IDs of the knob name table.
+        self.column_ids = []  # type: list
+        # Metadata by node.
+        self.records = {}  # type: dict
+        # Number of rows having a knob by knob ID.
+        self.knob_index = {}  # type: dict
+        # Sort keys per knob name or row sort key, in order of the rows.
+        self._sort_keys = {}  # type: dict
+        # Key and reverse flag of the last sort, applied again to new rows.
+        self.sort_order = (SORT_BY_NAME, False)
+        # Called with (node, knob_name, row) after a knob changed.
+        self.knob_listeners = []  # type: list
+        # Called with (old record, new record) after a node's metadata was
+        # read again, ie. after it was renamed.
+        self.record_listeners = []  # type: list
+
+    @property
+    def row_count(self):
+        """int: Number of rows."""
+        return len(self.nodes)
+
+    @property
+    def column_count(self):
+        """int: Number of columns."""
+        return len(self.column_ids)
+
+    @property
+    def columns(self):
+        """:obj:`list` of :obj:`str`: Knob names of the columns."""
+        names = self.knob_table.names
+        return [names[knob_id] for knob_id in self.column_ids]
+
+    def column_name(self, column):
+        """Return the knob name of a column.
+
+        Args:
+            column (int): Column.
+
+        Returns:
+            str: Knob name.
+
+        """
+        return self.knob_table.names[self.column_ids[column]]
+
+    @property
+    def knob_names(self):
+        """:obj:`list` of :obj:`str`: Knob names of all rows, unsorted."""
+        names = self.knob_table.names
+        return [names[knob_id] for knob_id in self.knob_index]
+
+    @property
+    def node_names(self):
+        """:obj:`list` of :obj:`str`: Names of the nodes in row order."""
+        records = self.records
+        return [records[node].name for node in self.nodes]
+
+    @property
+    def metadata(self):
+        """:obj:`list` of :obj:`metadata.NodeMetadata`: Metadata in row
+            order."""
+        records = self.records
+        return [records[node] for node in self.nodes]
+
+    def record(self, row):
+        """Return the metadata of the node in given row.
+
+        Args:
+            row (int): Row of the node.
+
+        Returns:
+            metadata.NodeMetadata: The node's metadata.
+
+        """
+        return self.records.get(self.nodes[row])
+
+    def row_of(self, node):
+        """Return the row of a node.
+
+        Args:
+            node (object): Node in the table.
+
+        Returns:
+            int: Row of the node or -1.
+
+        """
+        try:
+            return self.nodes.index(node)
+        except ValueError:
+            return -1
+
+    def read(self, nodes):
+        """Read the metadata of nodes through the adapter.
+
+        Args:
+            nodes (list): Nodes to read.
+
+        Returns:
+            metadata.MetadataSnapshot: Metadata of all existing nodes.
+
+        """
+        return metadata.MetadataSnapshot(nodes, self.adapter)
+
+    def update_record(self, node):
+        """Read the metadata of a node again, ie. after its color changed.
+
+        Args:
+            node (object): Node in the table.
+
+        Returns:
+            metadata.NodeMetadata: New metadata or None if node is gone.
+
+        """
+        record = self.adapter.read(node)
+        old_record = self.records.get(node)
+        if record and old_record:
+            self._replace_record(old_record, record)
+        return record
+
+    def update_records(self, snapshot):
+        """Replace the metadata of shown nodes that changed since their load.
+
+        Args:
+            snapshot (metadata.MetadataSnapshot): Nodes read again.
+
+        Returns:
+            list: Nodes whose metadata changed.
+
+        """
+        changed = []
+        records = self.records
+        for record in snapshot:
+            old_record = records.get(record.node)
+            if old_record is None or (
+                    old_record.name == record.name and
+                    old_record.knob_ids == record.knob_ids and
+                    old_record.tile_color == record.tile_color and
+                    old_record.font_color == record.font_color):
+                continue
+            self._replace_record(old_record, record)
+            changed.append(record.node)
+        return changed
+
+    def _replace_record(self, old_record, record):
+        self.records[record.node] = record
+        self._unindex(old_record)
+        self._index(record)
+        if old_record.name != record.name:
+            self._sort_keys.pop(SORT_BY_NAME, None)
+            self._sort_keys.pop(SORT_BY_CLASS, None)
+        for listener in self.record_listeners:
+            listener(old_record, record)
+
+    def diff(self, snapshot):
+        """Compare the rows with a snapshot.
+
+        Args:
+            snapshot (metadata.MetadataSnapshot): Nodes that should be shown.
+
+        Returns:
+            tuple: (nodes to remove, records to add in snapshot order)
+
+        """
+        remove = set(self.nodes)
+        remove.difference_update(snapshot.nodes)
+        add = [record for record in snapshot
+               if record.node not in self.records]
+        return remove, add
+
+    def load(self, nodes):
+        """Replace all rows and columns with nodes in given order.
+
+        Used by tables without a view, ie. to export nodes.
+
+        Args:
+            nodes (list): Nodes to show.
+
+        """
+        self.remove_rows(0, self.row_count)
+        self.remove_columns(0, self.column_count)
+        _, records = self.diff(self.read(nodes))
+        self.insert_rows(0, records)
+        self.insert_columns(0, self.column_diff()[1])
+
+    def insert_rows(self, row, records):
+        """Insert nodes.
+
+        Args:
+            row (int): Row of the first record.
+            records (list): Metadata of the nodes to insert.
+
+        """
+        for i, record in enumerate(records):
+            self.nodes.insert(row + i, record.node)
+            self.records[record.node] = record
+            self._index(record)
+        self._sort_keys.clear()
+        self.numeric.clear()
+
+    def remove_rows(self, row, count):
+        """Remove consecutive rows.
+
+        Args:
+            row (int): First row to remove.
+            count (int): Number of rows to remove.
+
+        Returns:
+            list: Metadata of the removed nodes.
+
+        """
+        removed = []
+        nodes = self.nodes[row:row + count]
+        del self.nodes[row:row + count]
+        for node in reversed(nodes):
+            record = self.records.pop(node, None)
+            if record:
+                self._unindex(record)
+                removed.append(record)
+            self.cache.invalidate(node)
+        self._sort_keys.clear()
+        self.numeric.clear()
+        return removed
+
+    def _index(self, record):
+        knob_index = self.knob_index
+        for knob_id in record.knob_ids:
+            knob_index[knob_id] = knob_index.get(knob_id, 0) + 1
+
+    def _unindex(self, record):
+        knob_index = self.knob_index
+        for knob_id in record.knob_ids:
+            count = knob_index.get(knob_id, 0) - 1
+            if count > 0:
+                knob_index[knob_id] = count
+            else:
+                knob_index.pop(knob_id, None)
+
+    def column_diff(self):
+        """Compare the columns with the knobs of all rows.
+
+        Returns:
+            tuple: (knob names to remove, sorted knob names to add)
+
+        """
+        knob_index = self.knob_index
+        names = self.knob_table.names
+        remove = [names[knob_id] for knob_id in self.column_ids
+                  if knob_id not in knob_index]
+        current = set(self.column_ids)
+        add = sorted((names[knob_id] for knob_id in knob_index
+                      if knob_id not in current),
+                     key=lambda name: name.lower())
+        return remove, add
+
+    def column_position(self, knob_name):
+        """Return the column that keeps the columns sorted.
+
+        Args:
+            knob_name (str): Name of the new knob.
+
+        Returns:
+            int: Column to insert the knob at.
+
+        """
+        return bisect_case_insensitive(self.columns, knob_name)
+
+    def column_of(self, knob_name):
+        """Return the column of a knob.
+
+        Args:
+            knob_name (str): Name of the knob.
+
+        Returns:
+            int: Column of the knob or -1.
+
+        """
+        try:
+            return self.column_ids.index(self.knob_table.ids.get(knob_name))
+        except ValueError:
+            return -1
+
+    def insert_columns(self, column, knob_names):
+        """Insert columns.
+
+        Args:
+            column (int): Column of the first knob.
+            knob_names (list): Names of the knobs.
+
+        """
+        intern = self.knob_table.intern
+        self.column_ids[column:column] = [intern(knob_name)
+                                          for knob_name in knob_names]
+
+    def remove_columns(self, column, count):
+        """Remove consecutive columns.
+
+        Args:
+            column (int): First column to remove.
+            count (int): Number of columns to remove.
+
+        """
+        del self.column_ids[column:column + count]
+
+    def knob(self, row, column):
+        """Return the knob of a cell.
+
+        Args:
+            row (int): Row of the cell.
+            column (int): Column of the cell.
+
+        Returns:
+            object: The knob or None if the node has no such knob.
+
+        """
+        record = self.records.get(self.nodes[row])
+        if record is None:
+            return None
+        return record.knobs.get(self.column_name(column))
+
+    def value(self, row, column):
+        """Return the value of a cell, from the cache if possible.
+
+        Args:
+            row (int): Row of the cell.
+            column (int): Column of the cell.
+
+        Returns:
+            object: Value of the knob or None if there is no knob.
+
+        Raises:
+            ValueError: If the node was deleted.
+
+        """
+        knob_name = self.column_name(column)
+        value = self.node_value(self.nodes[row], knob_name)
+        if value is not None and knob_name in self.numeric:
+            self.numeric.update(row, knob_name, value)
+        return value
+
+    def node_value(self, node, knob_name):
+        """Return the value of a node's knob, from the cache if possible.
+
+        Args:
+            node (object): Node in the table.
+            knob_name (str): Name of the knob.
+
+        Returns:
+            object: Value of the knob or None if there is no knob.
+
+        Raises:
+            ValueError: If the node was deleted.
+
+        """
+        record = self.records.get(node)
+        if record is None:
+            return None
+        knob = record.knobs.get(knob_name)
+        if knob is None:
+            return None
+
+        value = self.cache.get(node, knob_name, self.cache)
+        if value is VOLATILE:
+            return self.adapter.get_value(knob)
+        if value is not self.cache:
+            return value
+
+        value = self.adapter.get_value(knob)
+        if self.adapter.is_volatile(knob):
+            self.cache.put(node, knob_name, VOLATILE)
+        else:
+            self.cache.put(node, knob_name, value)
+        return value
+
+    def peek_value(self, node, knob_name):
+        """Return the value of a node's knob without filling the cache.
+
+        Used to read many cells once, ie. to export them.
+
+        Args:
+            node (object): Node in the table.
+            knob_name (str): Name of the knob.
+
+        Returns:
+            object: Cached value if available, else the value read from the
+                node. None if there is no knob.
+
+        Raises:
+            ValueError: If the node was deleted.
+
+        """
+        value = self.cache.peek(node, knob_name, self.cache)
+        if value is not self.cache and value is not VOLATILE:
+            return value
+        record = self.records.get(node)
+        knob = record and record.knobs.get(knob_name)
+        if knob is None:
+            return None
+        return self.adapter.get_value(knob)
+
+    def is_volatile(self, row, column):
+        """Return whether a cell is known to be volatile.
+
+        Args:
+            row (int): Row of the cell.
+            column (int): Column of the cell.
+
+        Returns:
+            bool: True or False if known from the cache, else None.
+
+        """
+        value = self.cache.peek(self.nodes[row], self.column_name(column),
+                                self.cache)
+        if value is self.cache:
+            return None
+        return value is VOLATILE
+
+    def set_value(self, row, column, value):
+        """Set the value of a cell.
+
+        Args:
+            row (int): Row of the cell.
+            column (int): Column of the cell.
+            value (object): New value.
+
+        Returns:
+            bool: True if the node has the knob. Nuke does not reliably
+                report whether setting a value succeeded.
+
+        """
+        if self.adapter.read_only:
+            return False
+
+        knob = self.knob(row, column)
+        if knob is None:
+            return False
+
+        self.adapter.set_value(knob, value)
+        self.knob_changed(self.nodes[row], self.column_name(column), row)
+        return True
+
+    def set_values(self, changes, errors=None):
+        """Set the values of many knobs.
+
+        A value a knob rejects does not stop the others from being set.
+
+        Args:
+            changes (iterable): (node, knob name, value) of every knob.
+            errors (list, optional): Collects (node, knob name, message) of
+                values the knobs rejected.
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: (node, knob name) of every knob
+                that was set. Missing nodes and knobs are skipped.
+
+        """
+        if self.adapter.read_only:
+            return []
+
+        records = self.records
+        set_value = self.adapter.set_value
+        # Rows of the nodes, only needed to update numeric columns.
+        rows = None
+        applied = []
+        for node, knob_name, value in changes:
+            record = records.get(node)
+            knob = record and record.knobs.get(knob_name)
+            if knob is None:
+                continue
+            try:
+                set_value(knob, value)
+            except (TypeError, ValueError, RuntimeError) as error:
+                # Invalid value or deleted node.
+                if errors is not None:
+                    errors.append((node, knob_name, str(error)))
+                continue
+            row = None
+            if knob_name in self.numeric:
+                if rows is None:
+                    rows = dict(zip(self.nodes, range(len(self.nodes))))
+                row = rows[node]
+            self.knob_changed(node, knob_name, row)
+            applied.append((node, knob_name))
+        return applied
+
+    def knob_changed(self, node, knob_name, row=None):
+        """Forget everything derived from a knob's value.
+
+        Args:
+            node (object): Node of the knob.
+            knob_name (str): Name of the changed knob.
+            row (int, optional): Row of the node, if known.
+
+        """
+        record = self.records.get(node)
+        if record is None:
+            return
+        self.cache.invalidate(node, knob_name)
+        self._sort_keys.pop(knob_name, None)
+        if knob_name in METADATA_KNOBS:
+            self.update_record(node)
+
+        if knob_name in self.numeric:
+            knob = record.knobs.get(knob_name)
+            if knob is not None and self.adapter.is_volatile(knob):
+                # Animated now, its values depend on the frame.
+                self.numeric.discard(knob_name)
+            else:
+                if row is None:
+                    row = self.row_of(node)
+                try:
+                    value = None if knob is None else \
+                        self.adapter.get_value(knob)
+                except ValueError:
+                    value = None
+                self.numeric.update(row, knob_name, value)
+
+        for listener in self.knob_listeners:
+            listener(node, knob_name, row)
+
+    def numeric_column(self, knob_name):
+        """Return the values of a numeric knob of all rows.
+
+        Args:
+            knob_name (str): Name of the knob.
+
+        Returns:
+            columnar.NumericColumn: The column or None if not numeric.
+
+        """
+        return self.numeric.column(knob_name, self.metadata)
+
+    def sort_keys(self, key):
+        """Return the sort keys of all rows, extracting them if necessary.
+
+        Keys are cached until the rows or the knob values of the column
+        change.
+
+        Args:
+            key (str): Knob name or one of SORT_BY_NAME, SORT_BY_CLASS or
+                SORT_BY_POSITION.
+
+        Returns:
+            list: Sort keys in row order.
+
+        """
+        keys = self._sort_keys.get(key)
+        if keys is not None:
+            self.counters.cache_hits += 1
+            return keys
+        self.counters.cache_misses += 1
+
+        records = self.metadata
+        if key == SORT_BY_NAME:
+            keys = [record.name_lower for record in records]
+        elif key == SORT_BY_CLASS:
+            keys = [(record.node_class.lower(), record.name_lower)
+                    for record in records]
+        elif key == SORT_BY_POSITION:
+            keys = []
+            for record in records:
+                try:
+                    keys.append(self.adapter.position(record.node))
+                except ValueError:
+                    # Node was deleted.
+                    keys.append((float('inf'), float('inf')))
+        elif self.numeric_column(key) is not None:
+            column = self.numeric.columns[key]
+            keys = [get_sort_key(column.get(row))
+                    for row in range(len(column))]
+        else:
+            keys = []
+            # Keys of animated knobs change with the frame, so keys of
+            # columns with any volatile cell are not kept.
+            volatile = False
+            knob_id = self.knob_table.ids.get(key)
+            try:
+                column = self.column_ids.index(knob_id)
+            except ValueError:
+                column = -1
+            for row, record in enumerate(records):
+                try:
+                    if column < 0:
+                        knob = record.knobs.get(key)
+                        value = self.adapter.get_value(knob) if knob else None
+                        volatile = volatile or bool(
+                            knob and self.adapter.is_volatile(knob))
+                    else:
+                        value = self.value(row, column)
+                        volatile = volatile or self.cache.peek(
+                            record.node, key) is VOLATILE
+                except ValueError:
+                    # Node was deleted.
+                    value = None
+                keys.append(get_sort_key(value))
+            if volatile:
+                return keys
+
+        self._sort_keys[key] = keys
+        return keys
+
+    def sort_permutation(self, key, reverse=False):
+        """Return the order of rows sorted by a key.
+
+        Args:
+            key (str): Knob name or one of SORT_BY_NAME, SORT_BY_CLASS or
+                SORT_BY_POSITION.
+            reverse (bool): Sort descending. Rows without the knob stay at
+                the bottom.
+
+        Returns:
+            list: Old rows in new order or None if the order is unchanged.
+
+        """
+        keys = self.sort_keys(key)
+        permutation = sorted(range(len(keys)), key=keys.__getitem__,
+                             reverse=reverse)
+        if reverse:
+            # Keep rows without the knob at the bottom.
+            permutation = ([i for i in permutation
+                            if keys[i] != MISSING_SORT_KEY] +
+                           [i for i in permutation
+                            if keys[i] == MISSING_SORT_KEY])
+        if permutation == list(range(len(keys))):
+            return None
+        return permutation
+
+    def apply_permutation(self, permutation):
+        """Reorder the rows and all cached sort keys alike.
+
+        Args:
+            permutation (list): Old rows in new order.
+
+        Returns:
+            list: New row of every old row.
+
+        """
+        self.nodes = [self.nodes[i] for i in permutation]
+        self.numeric.permute(permutation)
+        for cached_key, cached_keys in list(self._sort_keys.items()):
+            self._sort_keys[cached_key] = [cached_keys[i]
+                                           for i in permutation]
+
+        new_rows = [0] * len(permutation)
+        for new_row, old_row in enumerate(permutation):
+            new_rows[old_row] = new_row
+        return new_rows
@@ -25,6 +25,7 @@ else:
 from node_table import constants
 from node_table import knob_editors
 from node_table import nuke_utils
+from node_table import tracing
 
 
 class CheckBoxDelegate(QtWidgets.QStyledItemDelegate):
@@ -202,7 +203,11 @@ class KnobsItemDelegate(CheckBoxDelegate):
     def __init__(self, parent):
         super(KnobsItemDelegate, self).__init__(parent)
 
+        # Editors are opened on every click, so reuse them.
+        self.editor_pool = knob_editors.EditorPool()
+
     # pylint: disable=invalid-name
+    @tracing.traced('create editor', 'delegate')
     def createEditor(self, parent, option, index):
         """Create an editor depending on the current node class.
 
@@ -223,13 +228,18 @@ class KnobsItemDelegate(CheckBoxDelegate):
         if isinstance(knob, (nuke.Array_Knob, nuke.Transform2d_Knob)):
             rows = 1
             if isinstance(knob, nuke.AColor_Knob):
-                return knob_editors.ColorEditor(parent)
+                return self.editor_pool.acquire(parent,
+                                                knob_editors.ColorEditor,
+                                                length=4)
 
             elif isinstance(knob, nuke.ColorChip_Knob):
                 # Allow enough precision to properly convert from hex to rgb
                 # and back to the same value. This avoids saving default
                 # `tile_color` values into nodes.
-                return knob_editors.ColorEditor(parent, decimals=20)
+                return self.editor_pool.acquire(parent,
+                                                knob_editors.ColorEditor,
+                                                length=4,
+                                                decimals=20)
 
             elif isinstance(knob, nuke.Boolean_Knob):
                 return super(KnobsItemDelegate, self).createEditor(parent,
@@ -238,10 +248,8 @@ class KnobsItemDelegate(CheckBoxDelegate):
 
             elif isinstance(knob, nuke.Enumeration_Knob):
 
-                combobox = QtWidgets.QComboBox(parent)
-                for value in knob.values():
-                    combobox.addItem(value)
-                return combobox
+                return knob_editors.create_combo_box(
+                    parent, knob_editors.get_enumeration_model(knob))
 
             elif isinstance(knob, nuke.IArray_Knob):
                 rows = knob.height()  # type: int
@@ -255,20 +263,36 @@ class KnobsItemDelegate(CheckBoxDelegate):
             except TypeError:
                 items = 1
 
-            return knob_editors.ArrayEditor(parent,
+            return self.editor_pool.acquire(parent,
+                                            knob_editors.ArrayEditor,
                                             items,
                                             rows)
 
         if isinstance(knob, nuke.Format_Knob):
-            combobox = QtWidgets.QComboBox(parent)
-            for format in nuke.formats():
-                combobox.addItem(format.name())
-            return combobox
+            return knob_editors.create_combo_box(
+                parent, knob_editors.get_formats_model())
 
         return super(KnobsItemDelegate, self).createEditor(parent,
                                                            option,
                                                            index)
 
+    # pylint: disable=invalid-name
+    def destroyEditor(self, editor, index):
+        """Return pooled editors to the pool instead of deleting them.
+
+        Note:
+            Only called by Qt5 and newer. With PySide, editors are always
+            deleted by the view.
+
+        Args:
+            editor (QtWidgets.QWidget): The editor the view is done with.
+            index (QtCore.QModelIndex): Index the editor was editing.
+
+        """
+        if self.editor_pool.release(editor):
+            return
+        super(KnobsItemDelegate, self).destroyEditor(editor, index)
+
     # pylint: disable=invalid-name
     def setEditorData(self, editor, index):
         """Set the editor to the current value of the knob.
@@ -0,0 +1,338 @@
+"""Stream the rows of a table to CSV, JSON Lines or columnar JSON files.
+
+Rows are read one at a time through a generator, so memory stays flat no
+matter how many rows are exported. Values come from the table's filled
+columnar buffers and its cell cache if possible, without adding to them.
+
+Formats, chosen by file extension:
+
+- ``.csv``: One row per node. Strings are written as they are, all other
+  values as JSON, ie. ``[1.0, 2.0]`` or ``true``.
+- ``.jsonl``: One JSON object per node, without the knobs it lacks.
+- ``.json``: One array per column, ``{"node": [...], "size": [...]}``,
+  written column by column.
+
+Examples:
+    >>> export(table, '/tmp/nodes.csv')
+    >>> export_nodes(nuke.allNodes('Read'), '/tmp/reads.jsonl',
+    ...          knob_names=['file', 'first', 'last'])
+
+"""
+
+# Import built-in modules
+import csv
+import json
+import sys
+
+try:
+    # Python 2
+    string_types = basestring
+except NameError:
+    # Python 3
+    string_types = str
+
+# Columns written before the knobs.
+NODE_COLUMN = 'node'
+CLASS_COLUMN = 'class'
+
+FORMATS = ('csv', 'jsonl', 'json')
+
+# Value of cells without a knob.
+_MISSING = object()
+
+
+def get_format(path):
+    """Return the export format of a file path.
+
+    Args:
+        path (str): Path with one of the extensions of FORMATS.
+
+    Returns:
+        str: One of FORMATS.
+
+    Raises:
+        ValueError: For unsupported extensions.
+
+    """
+    extension = path.rsplit('.', 1)[-1].lower()
+    if extension not in FORMATS:
+        raise ValueError('Unsupported export format: {}'.format(path))
+    return extension
+
+
+def to_json_value(value):
+    """Return a value that can be serialized to JSON.
+
+    Args:
+        value (object): Knob value.
+
+    Returns:
+        object: Strings, numbers, booleans, None and lists as they are,
+            everything else as string.
+
+    """
+    if value is None or isinstance(value, (string_types, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(v) for v in value]
+    return str(value)
+
+
+def to_text(value):
+    """Return the text of a value in a CSV cell.
+
+    Args:
+        value (object): Knob value.
+
+    Returns:
+        str: Strings unchanged, an empty string for missing knobs and JSON
+            for all other values.
+
+    """
+    if value is _MISSING or value is None:
+        return ''
+    if isinstance(value, string_types):
+        return value
+    return json.dumps(to_json_value(value))
+
+
+class _ColumnReader(object):
+    """Reads the values of one knob of many rows."""
+
+    def __init__(self, table, knob_name):
+        self.table = table
+        self.knob_name = knob_name
+        # Only use buffers that were filled already, to keep memory flat.
+        self.column = table.numeric.columns.get(knob_name)
+
+    def read(self, row):
+        """Return the value of a row or _MISSING if the node lacks the knob.
+
+        Args:
+            row (int): Row of the table.
+
+        Returns:
+            object: The value.
+
+        """
+        if self.column is not None:
+            return self.column.get(row, _MISSING)
+        node = self.table.nodes[row]
+        if self.knob_name not in self.table.records[node].knobs:
+            return _MISSING
+        try:
+            return self.table.peek_value(node, self.knob_name)
+        except ValueError:
+            # Node was deleted.
+            return _MISSING
+
+
+def get_node_name(table, row):
+    """Return the full name of a row's node.
+
+    Args:
+        table (core.TableCore): Table of the node.
+        row (int): Row of the node.
+
+    Returns:
+        str: The node's full name, or its name if the adapter doesn't know
+            full names.
+
+    """
+    node = table.nodes[row]
+    try:
+        full_name = table.adapter.full_name(node)
+    except ValueError:
+        # Node was deleted.
+        full_name = None
+    return full_name or table.records[node].name
+
+
+def iter_rows(table, rows=None, knob_names=None):
+    """Yield the node name, class and knob values of rows.
+
+    Args:
+        table (core.TableCore): Table to read.
+        rows (iterable, optional): Rows to read, defaults to all rows.
+        knob_names (list, optional): Knobs to read, defaults to all columns.
+
+    Yields:
+        tuple: (node name, node class, list of values). Knobs the node lacks
+            are _MISSING.
+
+    """
+    if rows is None:
+        rows = range(table.row_count)
+    if knob_names is None:
+        knob_names = table.columns
+    # Only visit the knobs a node has, as most nodes lack most columns.
+    readers = dict((knob_name, (i, _ColumnReader(table, knob_name)))
+                   for i, knob_name in enumerate(knob_names))
+    empty = [_MISSING] * len(knob_names)
+    for row in rows:
+        record = table.record(row)
+        values = list(empty)
+        for knob_name in record.knobs:
+            column = readers.get(knob_name)
+            if column is not None:
+                values[column[0]] = column[1].read(row)
+        yield get_node_name(table, row), record.node_class, values
+
+
+def _open(path):
+    """Open a file to write text or CSV to."""
+    if sys.version_info.major >= 3:
+        # pylint: disable=unexpected-keyword-arg
+        return open(path, 'w', newline='', encoding='utf-8')
+    return open(path, 'wb')
+
+
+def write_csv(stream, table, rows=None, knob_names=None):
+    """Write rows as CSV.
+
+    Args:
+        stream (file): File opened for writing.
+        table (core.TableCore): Table to read.
+        rows (iterable, optional): Rows to write, defaults to all rows.
+        knob_names (list, optional): Knobs to write, defaults to all columns.
+
+    Returns:
+        int: Number of written rows.
+
+    """
+    if knob_names is None:
+        knob_names = table.columns
+    writer = csv.writer(stream)
+    writer.writerow([NODE_COLUMN, CLASS_COLUMN] + list(knob_names))
+    count = 0
+    for name, node_class, values in iter_rows(table, rows, knob_names):
+        writer.writerow([name, node_class] + [to_text(v) for v in values])
+        count += 1
+    return count
+
+
+def write_jsonl(stream, table, rows=None, knob_names=None):
+    """Write rows as JSON Lines, one object per node.
+
+    Args:
+        stream (file): File opened for writing.
+        table (core.TableCore): Table to read.
+        rows (iterable, optional): Rows to write, defaults to all rows.
+        knob_names (list, optional): Knobs to write, defaults to all columns.
+
+    Returns:
+        int: Number of written rows.
+
+    """
+    if knob_names is None:
+        knob_names = table.columns
+    count = 0
+    for name, node_class, values in iter_rows(table, rows, knob_names):
+        item = {NODE_COLUMN: name, CLASS_COLUMN: node_class}
+        for knob_name, value in zip(knob_names, values):
+            if value is not _MISSING:
+                item[knob_name] = to_json_value(value)
+        stream.write(json.dumps(item))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def write_columnar_json(stream, table, rows=None, knob_names=None):
+    """Write one JSON array per column, like a Parquet file's layout.
+
+    Columns are written one after another, so only one value is held in
+    memory at a time. Missing knobs are null.
+
+    Args:
+        stream (file): File opened for writing.
+        table (core.TableCore): Table to read.
+        rows (iterable, optional): Rows to write, defaults to all rows.
+        knob_names (list, optional): Knobs to write, defaults to all columns.
+
+    Returns:
+        int: Number of written rows.
+
+    """
+    rows = range(table.row_count) if rows is None else list(rows)
+    if knob_names is None:
+        knob_names = table.columns
+
+    def write_column(name, values):
+        stream.write('{}: ['.format(json.dumps(name)))
+        for i, value in enumerate(values):
+            if i:
+                stream.write(', ')
+            stream.write(json.dumps(
+                None if value is _MISSING else to_json_value(value)))
+        stream.write(']')
+
+    stream.write('{')
+    write_column(NODE_COLUMN, (get_node_name(table, row) for row in rows))
+    stream.write(',\n')
+    write_column(CLASS_COLUMN,
+                 (table.record(row).node_class for row in rows))
+    for knob_name in knob_names:
+        stream.write(',\n')
+        reader = _ColumnReader(table, knob_name)
+        write_column(knob_name, (reader.read(row) for row in rows))
+    stream.write('}\n')
+    return len(rows)
+
+
+_WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+    'json': write_columnar_json,
+}
+
+
+def export(table, path, rows=None, knob_names=None, file_format=None):
+    """Write rows of a table to a file.
+
+    Args:
+        table (core.TableCore): Table to read.
+        path (str): File to write.
+        rows (iterable, optional): Rows to write, defaults to all rows, ie.
+            only the rows passing the filters of a view.
+        knob_names (list, optional): Knobs to write, defaults to all columns.
+        file_format (str, optional): One of FORMATS. Defaults to the format
+            of the path's extension.
+
+    Returns:
+        int: Number of written rows.
+
+    """
+    writer = _WRITERS[file_format or get_format(path)]
+    with _open(path) as stream:
+        return writer(stream, table, rows, knob_names)
+
+
+def export_nodes(nodes, path, knob_names=None, adapter=None,
+                 file_format=None):
+    """Write nodes to a file without showing them in a table.
+
+    Args:
+        nodes (list): Nodes to export.
+        path (str): File to write.
+        knob_names (list, optional): Knobs to write, defaults to all knobs
+            of all nodes.
+        adapter (core.NodeAdapter, optional): Reads the nodes. Defaults to
+            the nodes of the running Nuke session.
+        file_format (str, optional): One of FORMATS.
+
+    Returns:
+        int: Number of written rows.
+
+    """
+    # Import local modules
+    # pylint: disable=import-outside-toplevel
+    from node_table import core
+    if adapter is None:
+        from node_table import nuke_adapter
+        adapter = nuke_adapter.NukeNodeAdapter()
+
+    table = core.TableCore(adapter)
+    table.load(nodes)
+    return export(table, path, knob_names=knob_names,
+                  file_format=file_format)
@@ -0,0 +1,379 @@
+"""Apply knob values from CSV, JSON Lines or JSON files to nodes.
+
+Two layouts are read:
+
+- Long: one value per row, with the columns ``node``, ``knob`` and
+  ``value``.
+- Wide: one node per row, keyed by ``node`` with one column per knob, as
+  written by :mod:`node_table.export`. Empty cells and a ``class`` column
+  are ignored.
+
+Nodes are resolved by full name through an index built once for all nodes
+of the script. Importing first creates an ImportPlan, a dry run listing
+every change and every problem, which is then applied as one undo step.
+
+Examples:
+    >>> plan = plan_import(read_file('/tmp/nodes.csv'), adapter)
+    >>> plan.summary()
+    '120 changes, 3880 unchanged, 0 errors'
+    >>> apply_plan(plan, adapter)
+
+"""
+
+# Import built-in modules
+import csv
+import json
+import numbers
+import sys
+
+try:
+    # Python 2
+    string_types = basestring
+except NameError:
+    # Python 3
+    string_types = str
+
+# Import local modules
+from node_table import core
+from node_table import export
+
+# Columns of the long layout.
+KNOB_COLUMN = 'knob'
+VALUE_COLUMN = 'value'
+
+_TRUE = ('true', '1', 'yes', 'on')
+_FALSE = ('false', '0', 'no', 'off', '')
+
+
+def _to_number(value, current):
+    """Convert a value to a number of the type of the current value."""
+    if isinstance(value, string_types):
+        value = float(value.strip())
+    elif isinstance(value, bool) or not isinstance(value, numbers.Number):
+        raise ValueError('Expected a number, got {!r}'.format(value))
+    if isinstance(current, int) and not isinstance(current, bool):
+        if value != int(value):
+            raise ValueError('Expected an integer, got {!r}'.format(value))
+        return int(value)
+    return float(value)
+
+
+def coerce_value(value, current):
+    """Convert an imported or pasted value to the type of a knob's value.
+
+    Args:
+        value (object): Text, ie. from a CSV cell or the clipboard, or a
+            value parsed from JSON.
+        current (object): Current value of the knob.
+
+    Returns:
+        object: The value as bool, int, float, list of numbers or string,
+            matching the current value. Scalars are repeated for lists.
+
+    Raises:
+        ValueError: If the value can't be converted.
+
+    """
+    if isinstance(current, bool):
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+        raise ValueError('Expected a boolean, got {!r}'.format(value))
+
+    if isinstance(current, numbers.Number):
+        return _to_number(value, current)
+
+    if isinstance(current, (list, tuple)):
+        if isinstance(value, string_types):
+            text = value.strip()
+            if text.startswith('['):
+                value = json.loads(text)
+            else:
+                value = text.replace(',', ' ').split()
+                if len(value) == 1:
+                    value = value[0]
+        if not isinstance(value, (list, tuple)):
+            value = [value] * len(current)
+        if len(value) != len(current):
+            raise ValueError('Expected {} values, got {}'.format(
+                len(current), len(value)))
+        return [_to_number(v, c) for v, c in zip(value, current)]
+
+    if isinstance(value, string_types):
+        return value
+    if value is None:
+        return ''
+    return export.to_text(value)
+
+
+def _open(path):
+    """Open a file to read text or CSV from."""
+    if sys.version_info.major >= 3:
+        # pylint: disable=unexpected-keyword-arg
+        return open(path, 'r', newline='', encoding='utf-8')
+    return open(path, 'rb')
+
+
+def _wide_items(line, item):
+    """Yield the values of a row of the wide layout."""
+    name = item.get(export.NODE_COLUMN)
+    for knob_name, value in item.items():
+        if knob_name in (export.NODE_COLUMN, export.CLASS_COLUMN):
+            continue
+        if value is None or value == '':
+            continue
+        yield line, name, knob_name, value
+
+
+def _items(line, item):
+    """Yield the values of a row of either layout."""
+    if KNOB_COLUMN in item and VALUE_COLUMN in item:
+        yield (line, item.get(export.NODE_COLUMN), item[KNOB_COLUMN],
+               item[VALUE_COLUMN])
+    else:
+        for value in _wide_items(line, item):
+            yield value
+
+
+def read_csv(stream):
+    """Yield the values of a CSV file.
+
+    Args:
+        stream (file): File opened for reading.
+
+    Yields:
+        tuple: (line, node name, knob name, value as text)
+
+    """
+    reader = csv.DictReader(stream)
+    for item in reader:
+        for value in _items(reader.line_num, item):
+            yield value
+
+
+def read_jsonl(stream):
+    """Yield the values of a JSON Lines file.
+
+    Args:
+        stream (file): File opened for reading.
+
+    Yields:
+        tuple: (line, node name, knob name, value)
+
+    """
+    for line, text in enumerate(stream, 1):
+        if text.strip():
+            for value in _items(line, json.loads(text)):
+                yield value
+
+
+def read_json(stream):
+    """Yield the values of a columnar JSON file or a JSON list of objects.
+
+    Args:
+        stream (file): File opened for reading.
+
+    Yields:
+        tuple: (row, node name, knob name, value)
+
+    """
+    data = json.load(stream)
+    if isinstance(data, list):
+        for row, item in enumerate(data, 1):
+            for value in _items(row, item):
+                yield value
+        return
+
+    names = data.get(export.NODE_COLUMN, [])
+    for knob_name, values in data.items():
+        if knob_name in (export.NODE_COLUMN, export.CLASS_COLUMN):
+            continue
+        for row, (name, value) in enumerate(zip(names, values), 1):
+            if value is not None:
+                yield row, name, knob_name, value
+
+
+_READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+    'json': read_json,
+}
+
+
+def read_file(path, file_format=None):
+    """Yield the values of a file.
+
+    Args:
+        path (str): File to read, see export.FORMATS for extensions.
+        file_format (str, optional): One of export.FORMATS. Defaults to the
+            format of the path's extension.
+
+    Yields:
+        tuple: (line, node name, knob name, value)
+
+    """
+    reader = _READERS[file_format or export.get_format(path)]
+    with _open(path) as stream:
+        for value in reader(stream):
+            yield value
+
+
+def build_name_index(nodes, adapter):
+    """Map the full names of nodes to the nodes.
+
+    Args:
+        nodes (list): Nodes to index, ie. all nodes of the script.
+        adapter (core.NodeAdapter): Reads the names.
+
+    Returns:
+        dict: Node by full name.
+
+    """
+    index = {}
+    for node in nodes:
+        try:
+            name = adapter.full_name(node)
+        except ValueError:
+            # Node was deleted.
+            continue
+        if name is None:
+            record = adapter.read(node)
+            if record is None:
+                continue
+            name = record.name
+        index[name] = node
+    return index
+
+
+class ImportPlan(object):
+    """Changes an import would make, and the values that can't be applied.
+
+    Attributes:
+        changes (list): core.Change of every value that differs.
+        unchanged (int): Number of values equal to the current value.
+        errors (list): (line, message) of every value that can't be applied.
+        knobs (dict): Knob by (node, knob name) of every change.
+
+    """
+
+    def __init__(self):
+        self.changes = []  # type: list
+        self.unchanged = 0
+        self.errors = []  # type: list
+        self.knobs = {}  # type: dict
+
+    def __len__(self):
+        return len(self.changes)
+
+    def summary(self):
+        """str: Number of changes, unchanged values and errors."""
+        return '{} changes, {} unchanged, {} errors'.format(
+            len(self.changes), self.unchanged, len(self.errors))
+
+
+def plan_import(items, adapter, nodes=None, records=None):
+    """Compare imported values with the current values, without applying.
+
+    Args:
+        items (iterable): (line, node name, knob name, value), ie. from
+            read_file().
+        adapter (core.NodeAdapter): Reads the nodes.
+        nodes (list, optional): Nodes to resolve names against. Defaults to
+            all nodes of the script.
+        records (dict, optional): Metadata by node that was read already,
+            ie. the records of a table.
+
+    Returns:
+        ImportPlan: The changes and errors.
+
+    """
+    if nodes is None:
+        nodes = adapter.all_nodes()
+    index = build_name_index(nodes, adapter)
+    records = dict(records or {})
+    plan = ImportPlan()
+
+    for line, name, knob_name, value in items:
+        node = index.get(name)
+        if node is None:
+            plan.errors.append((line, 'Unknown node: {}'.format(name)))
+            continue
+        record = records.get(node)
+        if record is None:
+            record = records[node] = adapter.read(node)
+        knob = record and record.knobs.get(knob_name)
+        if knob is None:
+            plan.errors.append((line, '{} has no knob {}'.format(
+                name, knob_name)))
+            continue
+        try:
+            old = adapter.get_value(knob)
+            new = coerce_value(value, old)
+        except ValueError as error:
+            plan.errors.append((line, '{}.{}: {}'.format(
+                name, knob_name, error)))
+            continue
+        if new == old:
+            plan.unchanged += 1
+            continue
+        plan.changes.append(core.Change(node, knob_name, old, new))
+        plan.knobs[(node, knob_name)] = knob
+    return plan
+
+
+def apply_plan(plan, adapter, set_values=None, name='Import knob values'):
+    """Apply the changes of a plan as one undo step.
+
+    Args:
+        plan (ImportPlan): Changes to apply.
+        adapter (core.NodeAdapter): Writes the nodes.
+        set_values (callable, optional): Writes many values and returns the
+            (node, knob name) it wrote, ie. NodeTableModel.set_values, so
+            a table shows the new values. Remaining changes are written
+            through the adapter.
+        name (str, optional): Name of the undo step.
+
+    Returns:
+        int: Number of applied changes.
+
+    """
+    with adapter.undo_group(name):
+        applied = set()
+        if set_values is not None:
+            applied.update(set_values(
+                (change.node, change.knob_name, change.new)
+                for change in plan.changes))
+        for change in plan.changes:
+            if (change.node, change.knob_name) not in applied:
+                adapter.set_value(plan.knobs[(change.node, change.knob_name)],
+                                  change.new)
+    return len(plan.changes)
+
+
+def import_values(path, adapter=None, dry_run=False, file_format=None):
+    """Apply the values of a file to the nodes of the script.
+
+    Args:
+        path (str): File to read, see export.FORMATS for extensions.
+        adapter (core.NodeAdapter, optional): Reads and writes the nodes.
+            Defaults to the nodes of the running Nuke session.
+        dry_run (bool, optional): Only return the plan.
+        file_format (str, optional): One of export.FORMATS.
+
+    Returns:
+        ImportPlan: The changes that were, or would be, applied.
+
+    """
+    if adapter is None:
+        # Import local modules
+        # pylint: disable=import-outside-toplevel
+        from node_table import nuke_adapter
+        adapter = nuke_adapter.NukeNodeAdapter()
+    plan = plan_import(read_file(path, file_format), adapter)
+    if not dry_run:
+        apply_plan(plan, adapter)
+    return plan
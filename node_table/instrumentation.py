@@ -0,0 +1,488 @@
+"""Count calls into the Nuke API per API function and per UI operation.
+
+Almost all cost of the table is spent in round trips to Nuke. When enabled,
+the ``nuke`` module used by node_table's modules is replaced by a proxy that
+counts and times every call. Nodes and knobs returned by Nuke are wrapped as
+well, so calls like ``node.knobs()`` or ``knob.value()`` are counted too.
+
+Calls are attributed to the innermost running operation, ie. ``load``,
+``filter``, ``paint`` or ``commit``.
+
+Examples:
+    >>> from node_table import instrumentation
+    >>> instrumentation.enable()
+    >>> table.node_list = nuke.selectedNodes()
+    >>> print(instrumentation.report())
+    >>> instrumentation.set_budget('load', 2000)
+    >>> instrumentation.check_budgets()
+
+"""
+
+# Import built-in modules
+import functools
+import sys
+import time
+
+timer = getattr(time, 'perf_counter', time.time)
+
+# Modules whose `nuke` attribute is replaced when enabled.
+INSTRUMENTED_MODULES = (
+    'node_table.delegate',
+    'node_table.knob_editors',
+    'node_table.model',
+    'node_table.nuke_adapter',
+    'node_table.nuke_utils',
+    'node_table.view',
+)
+
+# Operation name used for calls outside of any operation.
+NO_OPERATION = 'other'
+
+
+class BudgetExceededError(AssertionError):
+    """Raised by check_budgets() if an operation made too many calls."""
+
+
+class _State(object):
+    """Module state. Use the module functions to change it."""
+
+    enabled = False
+    real_nuke = None
+    operations = []
+    # (operation, api) -> [calls, seconds]
+    calls = {}
+    # operation -> [runs, seconds]
+    runs = {}
+    # operation -> maximum calls per run
+    budgets = {}
+    # operation -> maximum calls of one run
+    peaks = {}
+
+
+def _record(api, seconds):
+    """Add one call to the counters of the current operation."""
+    operation = _State.operations[-1][0] if _State.operations \
+        else NO_OPERATION
+    counter = _State.calls.get((operation, api))
+    if counter is None:
+        _State.calls[(operation, api)] = [1, seconds]
+    else:
+        counter[0] += 1
+        counter[1] += seconds
+    if _State.operations:
+        _State.operations[-1][1] += 1
+
+
+def unwrap(obj):
+    """Return the wrapped object of a proxy or obj itself."""
+    if isinstance(obj, _CountingProxy):
+        return object.__getattribute__(obj, '_wrapped')
+    return obj
+
+
+def wrap(obj):
+    """Wrap nodes and knobs, also inside lists and dicts, for counting.
+
+    Returns obj unchanged while instrumentation is disabled.
+
+    Args:
+        obj (object): Object returned by Nuke.
+
+    Returns:
+        object: obj or a counting proxy of obj.
+
+    """
+    if not _State.enabled:
+        return obj
+
+    real_nuke = _State.real_nuke
+    if isinstance(obj, _CountingProxy) or obj is None:
+        return obj
+    if isinstance(obj, real_nuke.Knob):
+        return _CountingProxy(obj, 'Knob')
+    if isinstance(obj, real_nuke.Node):
+        return _CountingProxy(obj, 'Node')
+    if isinstance(obj, list):
+        return [wrap(item) for item in obj]
+    if isinstance(obj, dict):
+        return dict((key, wrap(value)) for key, value in obj.items())
+    return obj
+
+
+def _counted_call(api, func):
+    """Return a function calling func and counting the call as api."""
+    def call(*args, **kwargs):
+        if not _State.enabled:
+            return func(*args, **kwargs)
+        args = [unwrap(arg) for arg in args]
+        start = timer()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _record(api, timer() - start)
+        return wrap(result)
+    return call
+
+
+class _CountingProxy(object):
+    """Proxy of a node or knob counting its method calls.
+
+    isinstance() checks, comparison and hashing behave like the wrapped
+    object.
+
+    """
+
+    __slots__ = ('_wrapped', '_kind')
+
+    def __init__(self, wrapped, kind):
+        object.__setattr__(self, '_wrapped', wrapped)
+        object.__setattr__(self, '_kind', kind)
+
+    @property
+    def __class__(self):
+        return type(object.__getattribute__(self, '_wrapped'))
+
+    def __getattr__(self, name):
+        attr = getattr(object.__getattribute__(self, '_wrapped'), name)
+        if not callable(attr):
+            return attr
+        kind = object.__getattribute__(self, '_kind')
+        return _counted_call('{}.{}'.format(kind, name), attr)
+
+    def __getitem__(self, name):
+        wrapped = object.__getattribute__(self, '_wrapped')
+        kind = object.__getattribute__(self, '_kind')
+        return _counted_call('{}.__getitem__'.format(kind),
+                             wrapped.__getitem__)(name)
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, '_wrapped') == unwrap(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, '_wrapped'))
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, '_wrapped'))
+
+    __nonzero__ = __bool__
+
+    def __enter__(self):
+        return object.__getattribute__(self, '_wrapped').__enter__()
+
+    def __exit__(self, *args):
+        return object.__getattribute__(self, '_wrapped').__exit__(*args)
+
+    def __repr__(self):
+        return repr(object.__getattribute__(self, '_wrapped'))
+
+    def __str__(self):
+        return str(object.__getattribute__(self, '_wrapped'))
+
+
+class CountingNuke(object):
+    """Stand-in for the nuke module that counts calls of its functions.
+
+    Classes and constants are returned unchanged so isinstance() checks and
+    comparisons keep working.
+
+    """
+
+    def __init__(self, real_nuke):
+        self._real_nuke = real_nuke
+        self._functions = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._real_nuke, name)
+        if isinstance(attr, type) or not callable(attr):
+            return attr
+
+        function = self._functions.get(name)
+        if function is None:
+            function = self._functions[name] = _counted_call(
+                'nuke.{}'.format(name), attr)
+        return function
+
+
+class _Operation(object):
+    """Context manager attributing calls to a named operation."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        _State.operations.append([self.name, 0])
+        self.start = timer()
+        return self
+
+    def __exit__(self, *args):
+        seconds = timer() - self.start
+        _, calls = _State.operations.pop()
+        runs = _State.runs.setdefault(self.name, [0, 0.0])
+        runs[0] += 1
+        runs[1] += seconds
+        if calls > _State.peaks.get(self.name, 0):
+            _State.peaks[self.name] = calls
+        # Calls of nested operations count towards the outer operation.
+        if _State.operations:
+            _State.operations[-1][1] += calls
+
+
+class _NoOperation(object):
+    """Shared context manager doing nothing while disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NO_OPERATION = _NoOperation()
+
+
+def operation(name):
+    """Return a context manager attributing calls to the operation `name`.
+
+    Args:
+        name (str): Operation, ie. 'load', 'filter', 'paint' or 'commit'.
+
+    Returns:
+        object: Context manager.
+
+    """
+    if not _State.enabled:
+        return _NO_OPERATION
+    return _Operation(name)
+
+
+def counted(name):
+    """Decorate a function to run as the operation `name`.
+
+    Args:
+        name (str): Operation name.
+
+    Returns:
+        callable: Decorator.
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            with _Operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# pylint: disable=too-many-instance-attributes
+class PerformanceCounters(object):
+    """Cheap counters that are always updated, shown in the performance HUD.
+
+    Unlike the API call accounting, these counters are not opt-in. Updating
+    them costs a few attribute assignments per operation.
+
+    """
+
+    __slots__ = ('cache_hits', 'cache_misses', 'dirty_cells',
+                 'last_load_seconds', 'last_filter_seconds',
+                 'last_paint_seconds', 'loads', 'filters', 'paints')
+
+    def __init__(self):
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Cells that changed since the last paint.
+        self.dirty_cells = 0
+        self.last_load_seconds = 0.0
+        self.last_filter_seconds = 0.0
+        self.last_paint_seconds = 0.0
+        self.loads = 0
+        self.filters = 0
+        self.paints = 0
+
+    @property
+    def cache_hit_ratio(self):
+        """float: Ratio of cache hits to all cache lookups or None."""
+        lookups = self.cache_hits + self.cache_misses
+        if not lookups:
+            return None
+        return float(self.cache_hits) / lookups
+
+    def timer(self, name):
+        """Return a context manager storing its duration.
+
+        Args:
+            name (str): One of 'load', 'filter' or 'paint'.
+
+        Returns:
+            object: Context manager.
+
+        """
+        return _CounterTimer(self, name)
+
+
+class _CounterTimer(object):
+    """Context manager timing an operation into PerformanceCounters."""
+
+    __slots__ = ('counters', 'name', 'start')
+
+    def __init__(self, counters, name):
+        self.counters = counters
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = timer()
+        return self
+
+    def __exit__(self, *args):
+        counters = self.counters
+        setattr(counters, 'last_{}_seconds'.format(self.name),
+                timer() - self.start)
+        runs_attribute = self.name + 's'
+        setattr(counters, runs_attribute,
+                getattr(counters, runs_attribute) + 1)
+        if self.name == 'paint':
+            counters.dirty_cells = 0
+
+
+def is_enabled():
+    """bool: True if calls are counted."""
+    return _State.enabled
+
+
+def enable():
+    """Start counting calls to Nuke made from node_table's modules."""
+    if _State.enabled:
+        return
+
+    import nuke  # pylint: disable=import-error,import-outside-toplevel
+    _State.real_nuke = nuke
+    counting_nuke = CountingNuke(nuke)
+    for module_name in INSTRUMENTED_MODULES:
+        module = sys.modules.get(module_name)
+        if module is not None and getattr(module, 'nuke', None) is nuke:
+            module.nuke = counting_nuke
+    _State.enabled = True
+
+
+def disable():
+    """Stop counting and restore the nuke module in all modules."""
+    if not _State.enabled:
+        return
+
+    for module_name in INSTRUMENTED_MODULES:
+        module = sys.modules.get(module_name)
+        if module is not None and isinstance(getattr(module, 'nuke', None),
+                                             CountingNuke):
+            module.nuke = _State.real_nuke
+    _State.enabled = False
+
+
+def reset():
+    """Clear all counters. Budgets are kept."""
+    _State.calls = {}
+    _State.runs = {}
+    _State.peaks = {}
+
+
+def stats():
+    """Return the counters.
+
+    Returns:
+        dict: For every operation a dict with `runs`, `seconds`, `calls`,
+            `peak_calls` (most calls of a single run) and `apis` mapping
+            each API to its number of calls and accumulated seconds.
+
+    """
+    result = {}
+    for (operation_name, api), (calls, seconds) in _State.calls.items():
+        entry = result.setdefault(operation_name, {
+            'runs': 0, 'seconds': 0.0, 'calls': 0, 'peak_calls': 0,
+            'apis': {}})
+        entry['calls'] += calls
+        entry['apis'][api] = {'calls': calls, 'seconds': seconds}
+
+    for operation_name, (runs, seconds) in _State.runs.items():
+        entry = result.setdefault(operation_name, {
+            'runs': 0, 'seconds': 0.0, 'calls': 0, 'peak_calls': 0,
+            'apis': {}})
+        entry['runs'] = runs
+        entry['seconds'] = seconds
+        entry['peak_calls'] = _State.peaks.get(operation_name, 0)
+
+    return result
+
+
+def report():
+    """Return the counters as a human readable table.
+
+    Returns:
+        str: Report, one block per operation sorted by number of calls.
+
+    """
+    lines = []
+    operations = sorted(stats().items(), key=lambda item: -item[1]['calls'])
+    for operation_name, entry in operations:
+        lines.append('{}: {} runs, {:.4f}s, {} calls, peak {} calls per '
+                     'run'.format(operation_name, entry['runs'],
+                                  entry['seconds'], entry['calls'],
+                                  entry['peak_calls']))
+        apis = sorted(entry['apis'].items(), key=lambda item: -item[1]['calls'])
+        for api, counter in apis:
+            lines.append('    {:<32} {:>9} calls {:>10.4f}s'.format(
+                api, counter['calls'], counter['seconds']))
+    if not lines:
+        lines.append('No calls counted.')
+    return '\n'.join(lines)
+
+
+def dump_report(stream=None):
+    """Write the report, to stdout by default (the Script Editor in Nuke).
+
+    Args:
+        stream (file, optional): Stream to write to.
+
+    """
+    stream = stream or sys.stdout
+    stream.write(report() + '\n')
+
+
+def set_budget(operation_name, max_calls):
+    """Set the maximum number of calls a single run of an operation may make.
+
+    Args:
+        operation_name (str): Operation, ie. 'load'.
+        max_calls (int): Maximum calls or None to remove the budget.
+
+    """
+    if max_calls is None:
+        _State.budgets.pop(operation_name, None)
+    else:
+        _State.budgets[operation_name] = max_calls
+
+
+def check_budgets():
+    """Raise if any operation exceeded its budget since the last reset().
+
+    Raises:
+        BudgetExceededError: Lists all operations over budget.
+
+    """
+    violations = []
+    for operation_name, max_calls in sorted(_State.budgets.items()):
+        peak = _State.peaks.get(operation_name, 0)
+        if peak > max_calls:
+            violations.append('{}: {} calls exceed budget of {}'.format(
+                operation_name, peak, max_calls))
+    if violations:
+        raise BudgetExceededError('\n'.join(violations))
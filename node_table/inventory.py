@@ -0,0 +1,408 @@
+"""Collect knob values of many .nk scripts in parallel, without Nuke.
+
+Every script is read by nk_reader in a worker process. Nodes and knobs are
+filtered with the syntax of the table's filter fields and a predicate, see
+:mod:`node_table.predicate`. Rows of all scripts are merged into one file
+with the script of every row in the ``script`` column.
+
+Examples:
+    Every Write's file knob of a show::
+
+        python -m node_table.inventory /shows/abc --class Write \\
+            --knob file -o writes.json
+
+    Scripts with large blurs::
+
+        python -m node_table.inventory /shows/abc --class Blur \\
+            --where "size > 100" -o blurs.csv
+
+"""
+
+# Import built-in modules
+import argparse
+import csv
+import functools
+import json
+import multiprocessing
+import os
+import sys
+
+# Import local modules
+from node_table import constants
+from node_table import core
+from node_table import export
+from node_table import nk_reader
+from node_table import predicate
+
+# Column of the script path of every row.
+SCRIPT_COLUMN = 'script'
+
+
+class Query(object):
+    """Filters of nodes and knobs, as in the filter fields of the table.
+
+    Examples:
+        >>> query = Query(node_classes='Blur', where='size > 100')
+        >>> for name, node_class, values in query.iter_rows(nodes, adapter):
+        ...     print(name, values)
+
+    """
+
+    def __init__(self, node_classes='', node_names='', knob_names='',
+                 where=''):
+        """Compile the filters.
+
+        Args:
+            node_classes (str, optional): Node classes separated by
+                constants.FILTER_DELIMITER.
+            node_names (str, optional): Node names.
+            knob_names (str, optional): Knob names.
+            where (str, optional): Predicate rows must match.
+
+        Raises:
+            predicate.PredicateError: If the predicate is invalid.
+
+        """
+        self.node_classes = core.ListFilter(node_classes)
+        self.node_names = core.ListFilter(node_names)
+        self.knob_names = core.ListFilter(knob_names)
+        self.where = predicate.compile_predicate(where) if where else None
+
+    def accepts_node(self, node):
+        """Return True if the class and name of a node pass the filters.
+
+        Args:
+            node (object): Node with Class() and name(), ie. nuke.Node or
+                nk_reader.NkNode.
+
+        Returns:
+            bool: True if the node passes.
+
+        """
+        return (self.node_classes.match(node.Class()) and
+                self.node_names.match(node.name()))
+
+    def iter_rows(self, nodes, adapter, chunk_size=constants.QUERY_CHUNK_SIZE):
+        """Yield the matching knobs of matching nodes.
+
+        Nodes are loaded into a table in chunks, so memory is bound by the
+        chunk size, not the number of nodes.
+
+        Args:
+            nodes (iterable): Nodes to query.
+            adapter (core.NodeAdapter): Reads the nodes.
+            chunk_size (int, optional): Number of nodes per table.
+
+        Yields:
+            tuple: (full node name, node class, list of (knob name, value))
+                in order of nodes.
+
+        """
+        chunk = []
+        for node in nodes:
+            if not self.accepts_node(node):
+                continue
+            chunk.append(node)
+            if len(chunk) >= chunk_size:
+                for row in self._query_chunk(chunk, adapter):
+                    yield row
+                chunk = []
+        if chunk:
+            for row in self._query_chunk(chunk, adapter):
+                yield row
+
+    def _query_chunk(self, nodes, adapter):
+        """Yield the matching rows of some nodes."""
+        table = core.TableCore(adapter)
+        table.load(nodes)
+        rows = range(table.row_count)
+        if self.where is not None:
+            rows = [row for row, accepted
+                    in zip(rows, self.where.evaluate(table, rows))
+                    if accepted]
+        knob_names = [knob_name for knob_name in table.columns
+                      if self.knob_names.match(knob_name)]
+        for row in rows:
+            record = table.record(row)
+            values = []
+            for knob_name in knob_names:
+                if knob_name in record.knobs:
+                    try:
+                        values.append((knob_name, table.peek_value(
+                            record.node, knob_name)))
+                    except ValueError:
+                        # Node was deleted.
+                        continue
+            yield export.get_node_name(table, row), record.node_class, values
+
+
+def find_scripts(paths):
+    """Return the .nk scripts of files and directory trees.
+
+    Args:
+        paths (list): Scripts and directories to search recursively.
+
+    Returns:
+        :obj:`list` of :obj:`str`: Paths of the scripts, sorted per
+            directory.
+
+    """
+    scripts = []
+    for path in paths:
+        if not os.path.isdir(path):
+            scripts.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            scripts.extend(os.path.join(root, name) for name in sorted(files)
+                           if name.endswith('.nk'))
+    return scripts
+
+
+def scan_script(path, query_args):
+    """Query one script, called in a worker process.
+
+    Args:
+        path (str): Script to read.
+        query_args (dict): Keyword arguments of Query.
+
+    Returns:
+        tuple: (path, rows, error). Rows as yielded by Query.iter_rows()
+            with values converted by export.to_json_value(). Error is None
+            or the message why the script could not be read.
+
+    """
+    try:
+        query = Query(**query_args)
+        with nk_reader.NkScript(path) as script:
+            adapter = nk_reader.NkScriptAdapter(script)
+            rows = [(name, node_class,
+                     [(knob_name, export.to_json_value(value))
+                      for knob_name, value in values])
+                    for name, node_class, values
+                    in query.iter_rows(script.iter_nodes(), adapter)]
+    except (IOError, OSError, ValueError) as error:
+        return path, [], str(error)
+    return path, rows, None
+
+
+class Inventory(object):
+    """Rows of many scripts in sparse columns.
+
+    Attributes:
+        row_count (int): Number of rows.
+        errors (list): (script, message) of scripts that failed.
+
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self.errors = []  # type: list
+        # Value by row, by column name.
+        self._columns = {
+            SCRIPT_COLUMN: {},
+            export.NODE_COLUMN: {},
+            export.CLASS_COLUMN: {},
+        }
+
+    @property
+    def columns(self):
+        """:obj:`list` of :obj:`str`: Script, node and class, then the knob
+            names sorted."""
+        fixed = [SCRIPT_COLUMN, export.NODE_COLUMN, export.CLASS_COLUMN]
+        return fixed + sorted(name for name in self._columns
+                              if name not in fixed)
+
+    def add(self, path, rows):
+        """Add the rows of a script.
+
+        Args:
+            path (str): Path of the script.
+            rows (list): Rows as returned by scan_script().
+
+        """
+        columns = self._columns
+        for name, node_class, values in rows:
+            row = self.row_count
+            columns[SCRIPT_COLUMN][row] = path
+            columns[export.NODE_COLUMN][row] = name
+            columns[export.CLASS_COLUMN][row] = node_class
+            for knob_name, value in values:
+                column = columns.get(knob_name)
+                if column is None:
+                    column = columns[knob_name] = {}
+                column[row] = value
+            self.row_count += 1
+
+    def column(self, name):
+        """Return the values of a column.
+
+        Args:
+            name (str): Name of the column.
+
+        Returns:
+            list: Value of every row, None for rows without the knob.
+
+        """
+        column = self._columns[name]
+        return [column.get(row) for row in range(self.row_count)]
+
+    def iter_rows(self):
+        """Yield every row as dict of the columns it has a value in.
+
+        Yields:
+            dict: Value by column name.
+
+        """
+        columns = [(name, self._columns[name]) for name in self.columns]
+        for row in range(self.row_count):
+            yield dict((name, column[row]) for name, column in columns
+                       if row in column)
+
+    def write(self, path, file_format=None):
+        """Write the rows to a file, see export.FORMATS.
+
+        Args:
+            path (str): File to write.
+            file_format (str, optional): One of export.FORMATS. Defaults to
+                the format of the path's extension.
+
+        """
+        file_format = file_format or export.get_format(path)
+        # pylint: disable=protected-access
+        with export._open(path) as stream:
+            if file_format == 'csv':
+                columns = self.columns
+                writer = csv.writer(stream)
+                writer.writerow(columns)
+                for item in self.iter_rows():
+                    writer.writerow([export.to_text(item.get(name))
+                                     for name in columns])
+            elif file_format == 'jsonl':
+                for item in self.iter_rows():
+                    stream.write(json.dumps(item))
+                    stream.write('\n')
+            else:
+                stream.write('{')
+                for i, name in enumerate(self.columns):
+                    if i:
+                        stream.write(',\n')
+                    stream.write('{}: {}'.format(json.dumps(name),
+                                                 json.dumps(self.column(name))))
+                stream.write('}\n')
+
+
+def run_inventory(paths, query_args=None, processes=None, progress=None):
+    """Query many scripts in parallel, one script per worker process.
+
+    Args:
+        paths (list): Scripts and directories to search recursively.
+        query_args (dict, optional): Keyword arguments of Query.
+        processes (int, optional): Number of worker processes, defaults to
+            the number of CPUs. 1 queries all scripts in this process.
+        progress (callable, optional): Called with the number of finished
+            scripts, the number of all scripts and the finished script.
+
+    Returns:
+        Inventory: The rows of all scripts, in order of the scripts.
+
+    Raises:
+        predicate.PredicateError: If the predicate is invalid.
+
+    """
+    query_args = query_args or {}
+    # Raise invalid filters before starting any worker.
+    Query(**query_args)
+
+    scripts = find_scripts(paths)
+    worker = functools.partial(scan_script, query_args=query_args)
+    inventory = Inventory()
+    pool = None
+    if processes != 1 and len(scripts) > 1:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap(worker, scripts)
+    else:
+        results = (worker(script) for script in scripts)
+
+    try:
+        for done, (path, rows, error) in enumerate(results, 1):
+            if error is None:
+                inventory.add(path, rows)
+            else:
+                inventory.errors.append((path, error))
+            if progress is not None:
+                progress(done, len(scripts), path)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return inventory
+
+
+def print_progress(done, total, path):
+    """Show the progress on stderr.
+
+    Args:
+        done (int): Number of finished scripts.
+        total (int): Number of all scripts.
+        path (str): Finished script.
+
+    """
+    sys.stderr.write('\r[{}/{}] {}\033[K'.format(done, total, path))
+    if done == total:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    """Run an inventory from the command line.
+
+    Args:
+        argv (list, optional): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Exit code, 1 if any script failed.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m node_table.inventory',
+        description='Collect knob values of many .nk scripts.')
+    parser.add_argument('paths', nargs='+',
+                        help='Scripts and directories to search for scripts.')
+    parser.add_argument('-o', '--output', required=True,
+                        help='File to write: .json (columnar), .jsonl or '
+                             '.csv.')
+    parser.add_argument('--class', dest='node_classes', default='',
+                        help='Node classes, separated by commas.')
+    parser.add_argument('--name', dest='node_names', default='',
+                        help='Node names, separated by commas.')
+    parser.add_argument('--knob', dest='knob_names', default='',
+                        help='Knob names, separated by commas.')
+    parser.add_argument('--where', default='',
+                        help='Expression rows must match, ie. "size > 100".')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of worker processes, defaults to the '
+                             'number of CPUs.')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Do not show progress.')
+    args = parser.parse_args(argv)
+
+    query_args = dict(node_classes=args.node_classes,
+                      node_names=args.node_names,
+                      knob_names=args.knob_names,
+                      where=args.where)
+    try:
+        inventory = run_inventory(
+            args.paths, query_args, processes=args.jobs,
+            progress=None if args.quiet else print_progress)
+    except predicate.PredicateError as error:
+        parser.error(str(error))
+    inventory.write(args.output)
+
+    for path, error in inventory.errors:
+        sys.stderr.write('{}: {}\n'.format(path, error))
+    return 1 if inventory.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,13 +6,13 @@ Some knobs need to be translated into custom editor widgets to be editable.
 # Import third-party modules
 import nuke
 if nuke.NUKE_VERSION_MAJOR >= 16:
-    from PySide6 import QtGui, QtWidgets
+    from PySide6 import QtCore, QtGui, QtWidgets
     from PySide6.QtCore import Qt
     # In PySide6, QAction and QShortcut moved to QtGui
     QtWidgets.QAction = QtGui.QAction
     QtWidgets.QShortcut = QtGui.QShortcut
 elif nuke.NUKE_VERSION_MAJOR < 11:
-    from PySide import QtGui, QtGui as QtWidgets
+    from PySide import QtCore, QtGui, QtGui as QtWidgets
     from PySide.QtCore import Qt
 else:
     from PySide2 import QtWidgets, QtGui, QtCore
@@ -28,6 +28,80 @@ from node_table import nuke_utils
 from node_table import constants
 
 
+# Shared combobox models. Filling a QComboBox item by item is slow for
+# hundreds of formats, so all editors share one model per list of values.
+_FORMATS_MODEL = None
+_FORMAT_NAMES = None
+_ENUMERATION_MODELS = {}
+
+
+def get_formats_model():
+    """Return the shared model listing the names of all formats.
+
+    The model is rebuilt only when the names of the formats changed, ie.
+    after a format was added or renamed.
+
+    Returns:
+        QtCore.QStringListModel: Names of all formats.
+
+    """
+    global _FORMATS_MODEL, _FORMAT_NAMES  # pylint: disable=global-statement
+
+    if _FORMATS_MODEL is None:
+        _FORMATS_MODEL = QtCore.QStringListModel()
+
+    names = tuple(format_.name() for format_ in nuke.formats())
+    if names != _FORMAT_NAMES:
+        _FORMATS_MODEL.setStringList(list(names))
+        _FORMAT_NAMES = names
+
+    return _FORMATS_MODEL
+
+
+def get_enumeration_model(knob):
+    """Return a shared model listing the values of an Enumeration_Knob.
+
+    Models are cached per (knob class, knob name). If the knob offers
+    different values than the cached model, the model is updated.
+
+    Args:
+        knob (nuke.Enumeration_Knob): Knob to get the values from.
+
+    Returns:
+        QtCore.QStringListModel: Values of the knob.
+
+    """
+    key = (knob.Class(), knob.name())
+    values = list(knob.values())
+
+    cached = _ENUMERATION_MODELS.get(key)
+    if cached is None:
+        cached = _ENUMERATION_MODELS[key] = [None, QtCore.QStringListModel()]
+
+    if cached[0] != values:
+        cached[1].setStringList(values)
+        cached[0] = values
+
+    return cached[1]
+
+
+def create_combo_box(parent, string_list_model):
+    """Create a combobox showing a shared model.
+
+    Args:
+        parent (QtWidgets.QWidget): The parent widget.
+        string_list_model (QtCore.QStringListModel): Items to show.
+
+    Returns:
+        QtWidgets.QComboBox: The new combobox.
+
+    """
+    combobox = QtWidgets.QComboBox(parent)
+    # The combobox does not take ownership of a model it is not parent of.
+    combobox.setModel(string_list_model)
+    return combobox
+
+
 class ArrayEditor(QtWidgets.QGroupBox):
     """Knob editor to allow changing multiple 'channels' of an Array_Knob."""
 
@@ -71,6 +145,11 @@ class ArrayEditor(QtWidgets.QGroupBox):
         self.adjustSize()
         self.raise_()
 
+    def reset(self):
+        """Reset all values so a pooled editor can be handed out again."""
+        for spin_box in self.double_spin_boxes:
+            spin_box.setValue(0.0)
+
     def set_editor_data(self, data):
         """Set data to editor.
 
@@ -142,3 +221,126 @@ class ColorEditor(ArrayEditor):
         new_color = nuke_utils.to_rgb(nuke.getColor(initial_color_hex))
         self.set_editor_data(new_color)
         self._set_color_picker_button_color()
+
+    def reset(self):
+        """Reset all values and the color of the pick button."""
+        super(ColorEditor, self).reset()
+        self._set_color_picker_button_color()
+
+
+class EditorPool(object):
+    """Recycle knob editors instead of rebuilding their widget trees.
+
+    Building an ArrayEditor allocates one QDoubleSpinBox per element, up to
+    16 for a matrix. Since the view opens an editor on every click, editors
+    are kept alive after closing and handed out again for the next cell that
+    needs an editor of the same kind.
+
+    Editors are keyed by (class, length, rows, decimals). The pool and key
+    are stored on the editor itself, so a deleted editor can never be taken
+    for another one.
+
+    """
+
+    def __init__(self, max_per_key=4):
+        """Create an empty pool.
+
+        Args:
+            max_per_key (int, optional): Maximum number of idle editors
+                kept per key. Further released editors are deleted.
+
+        """
+        self.max_per_key = max_per_key
+        self._idle = {}  # type: dict
+
+    @staticmethod
+    def get_key(editor_class, length, rows=1,
+                decimals=constants.EDITOR_DECIMALS):
+        """Return the key identifying interchangeable editors.
+
+        Args:
+            editor_class (type): ArrayEditor or a subclass of it.
+            length (int): Number of elements in the knob's array.
+            rows (int, optional): Number of rows of the editor.
+            decimals (int, optional): Precision of the editor.
+
+        Returns:
+            tuple: Hashable key.
+
+        """
+        return editor_class, length, rows, decimals
+
+    def acquire(self, parent, editor_class, length, rows=1,
+                decimals=constants.EDITOR_DECIMALS):
+        """Return an idle editor or build a new one.
+
+        Args:
+            parent (QtWidgets.QWidget): Parent widget of the editor.
+            editor_class (type): ArrayEditor or a subclass of it.
+            length (int): Number of elements in the knob's array.
+            rows (int, optional): Number of rows of the editor.
+            decimals (int, optional): Precision of the editor.
+
+        Returns:
+            ArrayEditor: Editor reset to default values.
+
+        """
+        key = self.get_key(editor_class, length, rows, decimals)
+        idle = self._idle.get(key)
+        while idle:
+            editor = idle.pop()
+            try:
+                if editor.parentWidget() is not parent:
+                    editor.setParent(parent)
+                editor.reset()
+            except RuntimeError:
+                # The underlying C++ object was deleted with its parent.
+                continue
+            return editor
+
+        if editor_class is ColorEditor:
+            editor = ColorEditor(parent, decimals=decimals)
+        else:
+            editor = editor_class(parent, length, rows, decimals=decimals)
+        editor.editor_pool = self
+        editor.editor_pool_key = key
+        return editor
+
+    def release(self, editor):
+        """Hide the editor and keep it for later use.
+
+        Args:
+            editor (QtWidgets.QWidget): Editor the view is done with.
+
+        Returns:
+            bool: True if the editor was taken by the pool. False if the
+                editor was not created by this pool or the pool is full, in
+                which case the caller should delete the editor.
+
+        """
+        if getattr(editor, 'editor_pool', None) is not self:
+            return False
+
+        idle = self._idle.setdefault(editor.editor_pool_key, [])
+        if editor in idle:
+            return True
+
+        if len(idle) >= self.max_per_key:
+            editor.editor_pool = None
+            return False
+
+        editor.hide()
+        editor.clearFocus()
+        idle.append(editor)
+        return True
+
+    def clear(self):
+        """Delete all idle editors."""
+        for idle in self._idle.values():
+            for editor in idle:
+                editor.editor_pool = None
+                try:
+                    editor.deleteLater()
+                except RuntimeError:
+                    pass
+        self._idle = {}
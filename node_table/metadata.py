@@ -0,0 +1,181 @@
+"""Read everything the table needs to know about nodes in a single pass.
+
+Filters, completers and the model all need the names, classes, knob names
+and colors of the loaded nodes. Reading them once per load and sharing the
+result avoids calling the Nuke API several times per node.
+
+Nodes are read through a :class:`node_table.core.NodeAdapter`, so this
+module does not depend on Nuke.
+"""
+
+# Import built-in modules
+try:
+    from sys import intern
+except ImportError:
+    # Python 2 has intern as builtin.
+    pass
+
+
+class KnobNameTable(object):
+    """Interned knob names, identified by integer IDs.
+
+    Nuke returns new strings for the knob names of every node. Sharing one
+    string per knob name between all rows and referring to columns by ID
+    saves memory on large tables.
+
+    Examples:
+        >>> table = KnobNameTable()
+        >>> table.intern('size')
+        0
+        >>> table.names[0]
+        'size'
+
+    """
+
+    __slots__ = ('ids', 'names')
+
+    def __init__(self):
+        self.ids = {}  # type: dict
+        self.names = []  # type: list
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def intern(self, name):
+        """Return the ID of a knob name, adding it if necessary.
+
+        Args:
+            name (str): Knob name.
+
+        Returns:
+            int: ID of the knob name.
+
+        """
+        knob_id = self.ids.get(name)
+        if knob_id is None:
+            knob_id = len(self.names)
+            name = intern(str(name))
+            self.names.append(name)
+            self.ids[name] = knob_id
+        return knob_id
+
+
+# Knob names of all tables.
+KNOB_NAMES = KnobNameTable()
+
+
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+class NodeMetadata(object):
+    """Facts about a node that are read once when the node is loaded.
+
+    Attributes:
+        node (object): The node itself, ie. a nuke.Node.
+        name (str): Name of the node.
+        name_lower (str): Lower case name for sorting and filtering.
+        node_class (str): Class of the node, interned.
+        knobs (dict): Knob names mapped to knobs, including linked knobs.
+            The names are the interned strings of the knob name table.
+        knob_ids (tuple): IDs of all knob names in the knob name table.
+        tile_color (tuple): Node color in rgb.
+        font_color (tuple): Label color in rgb.
+
+    """
+
+    __slots__ = ('node', 'name', 'name_lower', 'node_class', 'knobs',
+                 'knob_ids', 'tile_color', 'font_color')
+
+    def __init__(self, node, name, node_class, knobs, tile_color=None,
+                 font_color=None, knob_table=KNOB_NAMES):
+        self.node = node
+        self.name = name
+        self.name_lower = name.lower()
+        self.node_class = intern(str(node_class))
+        knob_ids = tuple(knob_table.intern(knob_name) for knob_name in knobs)
+        names = knob_table.names
+        self.knobs = dict(zip([names[knob_id] for knob_id in knob_ids],
+                              knobs.values()))
+        self.knob_ids = knob_ids
+        self.tile_color = tile_color
+        self.font_color = font_color
+
+    @property
+    def knob_names(self):
+        """Names of all knobs, supporting ``in`` and iteration."""
+        return self.knobs.keys()
+
+
+class MetadataSnapshot(object):
+    """Metadata of all nodes of one load.
+
+    Examples:
+        >>> snapshot = MetadataSnapshot(nuke.selectedNodes(), adapter)
+        >>> snapshot.node_classes
+        ['Blur', 'Grade']
+
+    """
+
+    def __init__(self, nodes, adapter):
+        """Read the metadata of all nodes, skipping deleted nodes.
+
+        Args:
+            nodes (:obj:`list` of :obj:`nuke.Node`): Nodes to read.
+            adapter (core.NodeAdapter): Reads the nodes.
+
+        """
+        self.records = []  # type: list
+        self._by_node = {}  # type: dict
+
+        default_colors = {}
+        for node in nodes or []:
+            if node in self._by_node:
+                continue
+            record = adapter.read(node, default_colors)
+            if record:
+                self.records.append(record)
+                self._by_node[node] = record
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, node):
+        """Return the metadata of a node.
+
+        Args:
+            node (nuke.Node): Node to get the metadata for.
+
+        Returns:
+            NodeMetadata: Metadata or None if node is not in snapshot.
+
+        """
+        return self._by_node.get(node)
+
+    @property
+    def nodes(self):
+        """:obj:`list` of :obj:`nuke.Node`: All existing nodes."""
+        return [record.node for record in self.records]
+
+    @property
+    def node_names(self):
+        """:obj:`list` of :obj:`str`: Sorted node names."""
+        return sorted((record.name for record in self.records),
+                      key=lambda n: n.lower())
+
+    @property
+    def node_classes(self):
+        """:obj:`list` of :obj:`str`: Sorted unique node classes."""
+        classes = set(record.node_class for record in self.records)
+        return sorted(classes, key=lambda s: s.lower())
+
+    @property
+    def knob_names(self):
+        """:obj:`list` of :obj:`str`: Sorted unique knob names."""
+        knob_names = set()
+        for record in self.records:
+            knob_names.update(record.knobs)
+        return sorted(knob_names, key=lambda s: s.lower())
@@ -1,15 +1,5 @@
 """models to server and filter nodes data to the view."""
 
-try:
-    # Python 2
-    string_types = basestring
-except NameError:
-    # Python 3
-    string_types = str
-
-# Import built-in modules
-import sys
-
 # Import third-party modules
 import nuke  # pylint: disable=import-error
 if nuke.NUKE_VERSION_MAJOR >= 16:
@@ -30,8 +20,30 @@ else:
         QtGui.QShortcut = QtWidgets.QShortcut
 
 # Import local modules
+from node_table import aggregates
 from node_table import constants
-from node_table import nuke_utils
+from node_table import core
+from node_table import instrumentation
+from node_table import metadata
+from node_table import nuke_adapter
+from node_table import predicate
+from node_table import snapshot
+from node_table import tracing
+# pylint: disable=unused-import
+from node_table.core import (MISSING_SORT_KEY, SORT_BY_CLASS, SORT_BY_NAME,
+                             SORT_BY_POSITION, bisect_case_insensitive,
+                             get_sort_key)
+
+
+# Header role returning the node's metadata.NodeMetadata.
+MetadataRole = QtCore.Qt.UserRole + 1
+
+# Background of cells by their status in a snapshot.SnapshotDiff.
+DIFF_COLORS = {
+    snapshot.CHANGED: constants.DIFF_CHANGED_COLOR,
+    snapshot.ADDED: constants.DIFF_ADDED_COLOR,
+    snapshot.REMOVED: constants.DIFF_REMOVED_COLOR,
+}
 
 
 def scalar(tpl, multiplier):
@@ -72,28 +84,103 @@ def get_palette(widget=None):
         return QtGui.QPalette()
 
 
-def bisect_case_insensitive(sorted_list, new_item):
-    """Locate the insertion point for new_item to maintain sorted order.
+def get_source_model(model):
+    """Return the model at the bottom of a stack of proxy models.
+
+    Args:
+        model (QtCore.QAbstractItemModel): A model or proxy model.
 
-    Taken from https://stackoverflow.com/a/41903429
+    Returns:
+        QtCore.QAbstractItemModel: The source model.
+
+    """
+    while isinstance(model, QtCore.QAbstractProxyModel):
+        model = model.sourceModel()
+    return model
+
+
+def get_source_rows(model):
+    """Return the source model row of every row of a stack of proxy models.
 
     Args:
-        sorted_list (list): Sorted list.
-        new_item (str): Item to find sorted location for.
+        model (QtCore.QAbstractItemModel): A model or proxy model.
 
     Returns:
-        int: Index at which point new_item must be inserted.
+        :obj:`list` of :obj:`int`: Rows of the source model in order of the
+            given model's rows.
 
     """
-    key = new_item.lower()
-    low, high = 0, len(sorted_list)
-    while low < high:
-        mid = (low + high) // 2
-        if key < sorted_list[mid].lower():
-            high = mid
-        else:
-            low = mid + 1
-    return low
+    if not model.columnCount():
+        return []
+
+    rows = []
+    for row in range(model.rowCount()):
+        index = model.index(row, 0)
+        while isinstance(index.model(), QtCore.QAbstractProxyModel):
+            index = index.model().mapToSource(index)
+        rows.append(index.row())
+    return rows
+
+
+def map_from_source(model, source_index):
+    """Map an index of the source model to the top of a stack of proxies.
+
+    Args:
+        model (QtCore.QAbstractItemModel): A model or proxy model.
+        source_index (QtCore.QModelIndex): Index of the source model.
+
+    Returns:
+        QtCore.QModelIndex: Index of given model, invalid if filtered out.
+
+    """
+    proxies = []
+    while isinstance(model, QtCore.QAbstractProxyModel):
+        proxies.append(model)
+        model = model.sourceModel()
+    index = source_index
+    for proxy in reversed(proxies):
+        index = proxy.mapFromSource(index)
+        if not index.isValid():
+            break
+    return index
+
+
+def map_to_source(index):
+    """Map an index through a stack of proxy models to the source model.
+
+    Args:
+        index (QtCore.QModelIndex): Index of a model or proxy model.
+
+    Returns:
+        QtCore.QModelIndex: Index of the source model.
+
+    """
+    while isinstance(index.model(), QtCore.QAbstractProxyModel):
+        index = index.model().mapToSource(index)
+    return index
+
+
+def get_source_columns(model):
+    """Return the source model column of every column of a stack of proxies.
+
+    Args:
+        model (QtCore.QAbstractItemModel): A model or proxy model.
+
+    Returns:
+        :obj:`list` of :obj:`int`: Columns of the source model in order of
+            the given model's columns.
+
+    """
+    if not model.rowCount():
+        return []
+
+    columns = []
+    for column in range(model.columnCount()):
+        index = model.index(0, column)
+        while isinstance(index.model(), QtCore.QAbstractProxyModel):
+            index = index.model().mapToSource(index)
+        columns.append(index.column())
+    return columns
 
 
 def find_substring_in_dict_keys(dictionary,
@@ -138,7 +225,62 @@ def find_substring_in_dict_keys(dictionary,
     return result
 
 
-class KnobStatesFilterModel(QtCore.QSortFilterProxyModel):
+class SourceSortFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """Proxy that lets the source model sort instead of sorting itself.
+
+    QSortFilterProxyModel sorts by comparing display strings of the source
+    model which queries Nuke for every comparison. Instead, the sort is
+    passed down the stack of proxies to the NodeTableModel which sorts
+    using precomputed keys.
+
+    """
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """Sort the source model by the source column of given column.
+
+        Args:
+            column (int): Column of this proxy to sort by.
+            order (QtCore.Qt.SortOrder): Sort order.
+
+        """
+        source_model = self.sourceModel()
+        if not source_model or column < 0 or not self.rowCount():
+            return
+
+        source_column = self.mapToSource(self.index(0, column)).column()
+        if source_column >= 0:
+            source_model.sort(source_column, order)
+
+    def invalidateFilter(self):
+        """Re-run the filter, recorded as span while tracing.
+
+        The duration, including the update of all proxies stacked on top of
+        this one, is stored in the source model's counters.
+
+        """
+        counters = getattr(get_source_model(self), 'counters', None)
+        with tracing.span('invalidateFilter', 'proxy',
+                          proxy=type(self).__name__):
+            if counters is None:
+                super(SourceSortFilterProxyModel, self).invalidateFilter()
+                return
+            with counters.timer('filter'):
+                super(SourceSortFilterProxyModel, self).invalidateFilter()
+
+    def source_records(self):
+        """Yield the metadata of every row of the source model.
+
+        Yields:
+            metadata.NodeMetadata: Metadata or None for deleted nodes.
+
+        """
+        source_model = self.sourceModel()
+        for row in range(source_model.rowCount()):
+            yield source_model.headerData(row, QtCore.Qt.Vertical,
+                                          MetadataRole)
+
+
+class KnobStatesFilterModel(SourceSortFilterProxyModel):
     """Filters columns by the knobs flags."""
 
     def __init__(self, parent):
@@ -167,27 +309,9 @@ class KnobStatesFilterModel(QtCore.QSortFilterProxyModel):
         knob_name = self.sourceModel().headerData(column,
                                              QtCore.Qt.Horizontal,
                                              QtCore.Qt.UserRole)
-
-        # Return early if this filter when we show knobs of all states.
-        if self.hidden_knobs and self.disabled_knobs:
-            return True
-
-        for row in range(self.sourceModel().rowCount()):
-            node = self.sourceModel().headerData(row, QtCore.Qt.Vertical,
-                                                 QtCore.Qt.UserRole)
-
-            # Using knobs() to also get linked knobs.
-            knob = node.knobs().get(knob_name)
-            if knob:
-                accept = knob.visible() or self._hidden_knobs
-                accept &= knob.enabled() or self._disabled_knobs
-
-                # Return early if any knob in th column is both visible
-                # and enable or filter allow to show the knob.
-                if accept:
-                    return True
-
-        return False
+        return core.accepts_knob_states(self.source_records(), knob_name,
+                                        self._hidden_knobs,
+                                        self._disabled_knobs)
 
     @property
     def hidden_knobs(self):
@@ -210,7 +334,7 @@ class KnobStatesFilterModel(QtCore.QSortFilterProxyModel):
         self.invalidateFilter()
 
 
-class ListFilterModel(QtCore.QSortFilterProxyModel):
+class ListFilterModel(SourceSortFilterProxyModel):
     """Abstract class that defines how the filter is set.
 
     The derived FilterProxyModel should do substring matching if
@@ -220,8 +344,12 @@ class ListFilterModel(QtCore.QSortFilterProxyModel):
 
     def __init__(self, parent, filter_delimiter=constants.FILTER_DELIMITER):
         super(ListFilterModel, self).__init__(parent)
-        self.filter_list = None
-        self.filter_delimiter = filter_delimiter
+        self.list_filter = core.ListFilter(delimiter=filter_delimiter)
+
+    @property
+    def filter_list(self):
+        """:obj:`list` of :obj:`str`: Lower case filter terms."""
+        return self.list_filter.terms
 
     def set_filter_str(self, filter_str):
         """Set filter as string with delimiter.
@@ -230,13 +358,11 @@ class ListFilterModel(QtCore.QSortFilterProxyModel):
             filter_str (str): Filter to use.
 
         """
-        filter_list = [filter_s.strip().lower() for filter_s
-                       in filter_str.split(self.filter_delimiter)]
-        self.filter_list = filter_list
+        self.list_filter.filter_str = filter_str
         self.invalidateFilter()
 
     def match(self, string):
-        """Check if string is in filter_list.
+        """Check if string matches the filter.
 
         Check for substring only when filtering by one item.
 
@@ -244,25 +370,10 @@ class ListFilterModel(QtCore.QSortFilterProxyModel):
             string (str): match this string against filter
 
         Returns:
-            bool: True if string is in ``filter_list``.
+            bool: True if string matches ``filter_list``.
 
         """
-        matching = True
-
-        if not self.filter_list:
-            return matching
-
-        # Case sensitive filtering is confusing and unnecessary.
-        string = string.lower()
-
-        # Check for full name in case filter list is more than one item.
-        if len(self.filter_list) > 1:
-            matching = string in self.filter_list
-        # Check for substring.
-        elif len(self.filter_list) == 1:
-            matching = self.filter_list[0] in string
-
-        return matching
+        return self.list_filter.match(string)
 
 
 class HeaderHorizontalFilterModel(ListFilterModel):
@@ -280,7 +391,7 @@ class HeaderHorizontalFilterModel(ListFilterModel):
             bool: True if header matches the filter.
 
         """
-        if not self.filter_list:
+        if not self.list_filter:
             return True
 
         header_name = self.sourceModel().headerData(column,
@@ -303,13 +414,15 @@ class NodeNameFilterModel(ListFilterModel):
             bool: True if header matches the filter.
 
         """
-        if not self.filter_list:
+        if not self.list_filter:
             return True
 
-        header_name = self.sourceModel().headerData(row,
-                                                    QtCore.Qt.Vertical,
-                                                    QtCore.Qt.DisplayRole)
-        return self.match(header_name)
+        node_metadata = self.sourceModel().headerData(row,
+                                                      QtCore.Qt.Vertical,
+                                                      MetadataRole)
+        if not node_metadata:
+            return False
+        return self.match(node_metadata.name)
 
 
 class NodeClassFilterModel(ListFilterModel):
@@ -327,17 +440,216 @@ class NodeClassFilterModel(ListFilterModel):
             bool: True if node's class matches the filter.
 
         """
-        if not self.filter_list:
+        if not self.list_filter:
             return True
-        node = self.sourceModel().headerData(row,
-                                             QtCore.Qt.Vertical,
-                                             QtCore.Qt.UserRole)
-        node_class = node.Class()
-        return self.match(node_class)
+        node_metadata = self.sourceModel().headerData(row,
+                                                      QtCore.Qt.Vertical,
+                                                      MetadataRole)
+        if not node_metadata:
+            return False
+        return self.match(node_metadata.node_class)
+
+
+class PredicateFilterModel(SourceSortFilterProxyModel):
+    """Filter rows by an expression over knob values.
+
+    The expression is evaluated once for all rows of the table. Afterwards
+    only rows whose knobs change are evaluated again. Results are not kept
+    while the table lacks a column of the expression, ie. during a load,
+    and all rows are evaluated again once its columns change.
+
+    """
+
+    def __init__(self, parent):
+        super(PredicateFilterModel, self).__init__(parent)
+        self.predicate = None  # type: predicate.Predicate
+        # Result by node.
+        self._results = {}  # type: dict
+        # Row in the table by node, rebuilt when found outdated.
+        self._rows = {}  # type: dict
+        self._table_model = None
+
+    def setSourceModel(self, source_model):
+        """Set the source model and listen to knob changes of its table.
+
+        Args:
+            source_model (QtCore.QAbstractItemModel): Model to filter.
+
+        """
+        super(PredicateFilterModel, self).setSourceModel(source_model)
+        table_model = get_source_model(source_model)
+        if table_model is self._table_model:
+            return
+        if self._table_model is not None:
+            self._table_model.core.knob_listeners.remove(self.knob_changed)
+            self._table_model.modelReset.disconnect(self.clear_results)
+            self._table_model.rowsInserted.disconnect(self.rows_inserted)
+            self._table_model.columnsInserted.disconnect(self.columns_changed)
+            self._table_model.columnsRemoved.disconnect(self.columns_changed)
+        self._table_model = table_model
+        table_model.core.knob_listeners.append(self.knob_changed)
+        table_model.modelReset.connect(self.clear_results)
+        table_model.rowsInserted.connect(self.rows_inserted)
+        table_model.columnsInserted.connect(self.columns_changed)
+        table_model.columnsRemoved.connect(self.columns_changed)
+
+    def set_predicate(self, expression):
+        """Compile and apply an expression.
+
+        Args:
+            expression (str): Expression, empty to show all rows.
+
+        Raises:
+            predicate.PredicateError: If the expression is invalid. The
+                previous expression stays active.
+
+        """
+        if expression and expression.strip():
+            self.predicate = predicate.compile_predicate(expression)
+        else:
+            self.predicate = None
+        self.evaluate_all()
+        self.invalidateFilter()
+
+    def evaluate_all(self):
+        """Evaluate the expression for every row of the table at once."""
+        self._results = {}
+        if self.predicate is None or self._table_model is None:
+            return
+        table = self._table_model.core
+        if not self.has_columns(table):
+            return
+        with tracing.span('evaluate_predicate', 'proxy',
+                          rows=table.row_count):
+            results = self.predicate.evaluate(table, range(table.row_count))
+        self._results = dict(zip(table.nodes, results))
+
+    def has_columns(self, table):
+        """Return True if the table has a column for every knob of the
+            expression, so results are final until knobs change.
+
+        Args:
+            table (core.TableCore): Table to evaluate.
+
+        Returns:
+            bool: False if any knob is missing from the columns.
+
+        """
+        return all(table.column_of(knob_name) >= 0
+                   for knob_name in self.predicate.knob_names)
+
+    @QtCore.Slot()
+    def clear_results(self):
+        """Forget all results after the table was reset."""
+        self._results = {}
+
+    # pylint: disable=unused-argument
+    def rows_inserted(self, parent, first, last):
+        """Forget results of inserted nodes, their knobs may have changed
+            while they were not shown.
+
+        Args:
+            parent (QtCore.QModelIndex): Parent index.
+            first (int): First inserted row.
+            last (int): Last inserted row.
+
+        """
+        if not self._results:
+            return
+        nodes = self._table_model.core.nodes
+        for row in range(first, last + 1):
+            self._results.pop(nodes[row], None)
+
+    # pylint: disable=unused-argument
+    def columns_changed(self, parent, first, last):
+        """Evaluate all rows again after columns were added or removed.
+
+        Args:
+            parent (QtCore.QModelIndex): Parent index.
+            first (int): First changed column.
+            last (int): Last changed column.
+
+        """
+        if self.predicate is None:
+            return
+        self.evaluate_all()
+        self.invalidateFilter()
+
+    def knob_changed(self, node, knob_name, row=None):
+        """Forget the result of a node whose knob changed.
+
+        Called by the table's core before the model emits dataChanged, on
+        which this proxy filters the row again and evaluates it anew.
+
+        Args:
+            node (object): Node of the knob.
+            knob_name (str): Name of the changed knob.
+            row (int, optional): Row of the node in the table.
+
+        """
+        if self.predicate is None or knob_name not in self.predicate.knob_names:
+            return
+        self._results.pop(node, None)
+
+    def table_row(self, node):
+        """Return the row of a node in the table.
+
+        The source model may be another proxy, so the source row is not the
+        table's row. Rows are looked up in a dict that is rebuilt only once
+        it is found outdated, ie. once per inserted or sorted batch of rows.
+
+        Args:
+            node (object): Node to find.
+
+        Returns:
+            int: Row of the node or -1.
+
+        """
+        nodes = self._table_model.core.nodes
+        row = self._rows.get(node, -1)
+        if row < 0 or row >= len(nodes) or nodes[row] is not node:
+            self._rows = dict(zip(nodes, range(len(nodes))))
+            row = self._rows.get(node, -1)
+        return row
+
+    # pylint: disable=invalid-name, unused-argument
+    def filterAcceptsRow(self, row, parent):
+        """Filter by the expression.
+
+        Rows without result, ie. inserted or changed since the last
+        evaluation, are evaluated on their own.
+
+        Args:
+            row (int): Current row.
+            parent (QtCore.QModelIndex): Parent index.
+
+        Returns:
+            bool: True if the node matches the expression.
+
+        """
+        if self.predicate is None:
+            return True
+        node_metadata = self.sourceModel().headerData(row,
+                                                      QtCore.Qt.Vertical,
+                                                      MetadataRole)
+        if not node_metadata:
+            return False
+
+        node = node_metadata.node
+        result = self._results.get(node)
+        if result is None:
+            table = self._table_model.core
+            table_row = self.table_row(node)
+            if table_row < 0:
+                return False
+            result = self.predicate.evaluate_row(table, table_row)
+            if self.has_columns(table):
+                self._results[node] = result
+        return result
 
 
 # pylint: disable=too-few-public-methods
-class EmptyColumnFilterModel(QtCore.QSortFilterProxyModel):
+class EmptyColumnFilterModel(SourceSortFilterProxyModel):
     """Filter out every empty column.
 
     Notes:
@@ -361,53 +673,136 @@ class EmptyColumnFilterModel(QtCore.QSortFilterProxyModel):
         header_name = self.sourceModel().headerData(column,
                                                     QtCore.Qt.Horizontal,
                                                     QtCore.Qt.DisplayRole)
-
-        for row in range(self.sourceModel().rowCount()):
-            node = self.sourceModel().headerData(row, QtCore.Qt.Vertical,
-                                                 QtCore.Qt.UserRole)
-            if header_name in node.knobs():
-                return True
-        return False
+        return core.any_has_knob(self.source_records(), header_name)
 
 
 # pylint: disable=invalid-name
 class NodeTableModel(QtCore.QAbstractTableModel):
-    """Digest and store nodes and serve their data."""
+    """Serve the nodes and knobs of a core.TableCore to Qt views.
+
+    All bookkeeping happens in the core. This model emits the signals Qt
+    needs around every change of the core.
+
+    """
 
-    def __init__(self, nodes=None):
+    def __init__(self, nodes=None, adapter=None):
         """
 
         Args:
             nodes (:obj:`list` of :obj:`nuke.Node`, optional): Nodes to
                 represent in the model.
+            adapter (core.NodeAdapter, optional): Reads and writes the nodes.
+                Defaults to the nodes of the running Nuke session.
 
         """
         super(NodeTableModel, self).__init__()
 
-        self._node_list = nodes or []  # type: list
-        self._knob_list = []  # type: list
+        self.core = core.TableCore(adapter or nuke_adapter.NukeNodeAdapter())
+
+        # Counters shown in the performance HUD.
+        self.counters = self.core.counters
+
+        # Cells highlighted as (node, knob name), ie. search results.
+        self.highlighted_cells = set()  # type: set
+        # Status of cells differing from a snapshot by (node, knob name).
+        self.diff_cells = {}  # type: dict
+        # Majority values of the columns, see highlight_outliers.
+        self.column_modes = None  # type: aggregates.ColumnModes
+        self._highlight_outliers = False
+        # True while setting data, to ignore the resulting knob callbacks.
+        self._editing = False
+        # Reads the cells of a warm start snapshot again, see warm_start().
+        self.revalidator = None  # type: snapshot.Revalidator
 
         self.palette = get_palette()  # type: QtGui.QPalette
 
+        if nodes:
+            self.node_list = nodes
+
+    @property
+    def adapter(self):
+        """core.NodeAdapter: Reads and writes the nodes."""
+        return self.core.adapter
+
+    @property
+    def highlight_outliers(self):
+        """bool: Tint cells differing from their column's majority value.
+
+        The values of a column are counted on its first paint and then kept
+        current as knobs change, so toggling and editing cost no rescan.
+
+        """
+        return self._highlight_outliers
+
+    @highlight_outliers.setter
+    def highlight_outliers(self, enabled):
+        if enabled and self.column_modes is None:
+            self.column_modes = aggregates.ColumnModes(self.core)
+            self.column_modes.majority_listeners.append(self.majority_changed)
+        self._highlight_outliers = enabled
+
+    def majority_changed(self, knob_name):
+        """Repaint a column whose majority value changed.
+
+        Args:
+            knob_name (str): Name of the column's knob.
+
+        """
+        if not self._highlight_outliers or not self.core.row_count:
+            return
+        column = self.core.column_of(knob_name)
+        if column < 0:
+            return
+        self.dataChanged.emit(self.index(0, column),
+                              self.index(self.core.row_count - 1, column))
+
     @property
     def node_list(self):
         """:obj:`list` of :obj:`nuke.Node`: Current list of displayed nodes."""
-        return self._node_list
+        return self.core.nodes
 
     @property
     def node_names(self):
         """:obj:`list` of :obj:`str`: Names of the current node list."""
-        return [node.name() for node in self.node_list]
+        return self.core.node_names
+
+    @property
+    def metadata(self):
+        """:obj:`list` of :obj:`metadata.NodeMetadata`: Metadata of all
+            nodes in the order of the node list."""
+        return self.core.metadata
+
+    def get_metadata(self, row):
+        """Return the metadata of the node in given row.
+
+        Args:
+            row (int): Row of the node.
+
+        Returns:
+            metadata.NodeMetadata: The node's metadata.
+
+        """
+        return self.core.record(row)
+
+    def update_metadata(self, node):
+        """Read the metadata of a node again, ie. after its color changed.
+
+        Args:
+            node (nuke.Node): Node in the node list.
+
+        """
+        self.core.update_record(node)
 
     @property
     def knob_list(self):
-        """:obj:`list` of :obj:`nuke.Knob`: Current knob's names.
+        """:obj:`list` of :obj:`str`: Current knob's names.
 
         This list defines the horizontal header.
-        To add a knob use insertColumns().
+        To add a knob use insertColumns(). The core stores the columns as
+        knob name IDs, so this returns a new list.
 
         """
-        return self._knob_list
+        return self.core.columns
 
     @property
     def knob_names(self):
@@ -415,23 +810,76 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         return self.knob_list
 
     @node_list.setter
+    @tracing.traced('set node list', 'model')
     def node_list(self, nodes):
-        new_nodes = set(nodes) - set(self.node_list)
-        remove_nodes = set(self.node_list) - set(nodes)
-
-        for node in remove_nodes:
-            remove_index = self.node_list.index(node)
-            self.removeRows(parent=QtCore.QModelIndex(),
-                            row=remove_index,
-                            count=1)
-
-        for node in new_nodes:
-            insert_index = bisect_case_insensitive(self.node_names,
-                                                   node.name())
+        with self.counters.timer('load'):
+            self._set_node_list(nodes)
+
+    def _set_node_list(self, nodes):
+        """Add and remove rows to match nodes.
+
+        Args:
+            nodes (:obj:`list` of :obj:`nuke.Node`): Nodes to show.
+
+        """
+        # Count calls on nodes that were not returned through the counting
+        # nuke module while instrumentation is enabled.
+        nodes = instrumentation.wrap(list(nodes))
+
+        # Read all nodes once. Deleted nodes are skipped.
+        node_snapshot = self.core.read(nodes)
+        # Shown nodes may have been renamed or recolored since their load.
+        changed_nodes = self.core.update_records(node_snapshot)
+        remove_nodes, new_records = self.core.diff(node_snapshot)
+
+        # Remove runs of consecutive rows at once, from the bottom up.
+        if remove_nodes:
+            rows = dict(zip(self.core.nodes, range(self.core.row_count)))
+            runs = []
+            for row in sorted((rows[node] for node in remove_nodes),
+                              reverse=True):
+                if runs and runs[-1][0] == row + 1:
+                    runs[-1][0] = row
+                    runs[-1][1] += 1
+                else:
+                    runs.append([row, 1])
+            for row, count in runs:
+                self.removeRows(parent=QtCore.QModelIndex(),
+                                row=row,
+                                count=count,
+                                setup_model_data=False)
+
+        if new_records:
+            # Append all new rows at once, then sort them into the rows
+            # like the last sort did, ie. by name.
+            shown_rows = self.core.row_count
+            new_records = sorted(new_records,
+                                 key=lambda record: record.name_lower)
             self.insertRows(parent=QtCore.QModelIndex(),
-                            row=insert_index,
-                            count=1,
-                            items=[node])
+                            row=shown_rows,
+                            count=len(new_records),
+                            items=new_records,
+                            setup_model_data=False)
+            key, reverse = self.core.sort_order
+            if shown_rows or (key, reverse) != (SORT_BY_NAME, False):
+                self.sort_rows(key, QtCore.Qt.DescendingOrder if reverse
+                               else QtCore.Qt.AscendingOrder)
+
+        self.setup_model_data()
+
+        # Filter and paint the rows of changed metadata again.
+        last_column = self.core.column_count - 1
+        rows = dict(zip(self.core.nodes, range(self.core.row_count))) \
+            if changed_nodes else {}
+        for node in changed_nodes:
+            row = rows.get(node, -1)
+            if row < 0 or last_column < 0:
+                continue
+            # noinspection PyUnresolvedReferences
+            self.headerDataChanged.emit(QtCore.Qt.Vertical, row, row)
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(self.index(row, 0),
+                                  self.index(row, last_column))
 
     def rowCount(self, parent=QtCore.QModelIndex()):
         """Number of nodes in the model.
@@ -446,10 +894,7 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         if parent.isValid():
             return 0
 
-        if not self.node_list:
-            return 0
-
-        return len(self.node_list)
+        return self.core.row_count
 
     def columnCount(self, parent):
         """Number of columns in the model.
@@ -468,77 +913,42 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         if parent.isValid():
             return 0
 
-        if not self.node_list:
+        if not self.core.row_count:
             return 0
 
-        return len(self.knob_list)
+        return self.core.column_count
 
+    @tracing.traced('setup model data', 'model')
     def setup_model_data(self):
-        """Read all knob names from set self.node_list to define header.
+        """Match the horizontal header with the knobs of all nodes.
 
-        First all knobs to display are collected. To match this list, all
-        knobs to remove and to add are collected and removed and inserted as
-        needed.
+        The core's knob index knows which knobs to remove and to add.
 
         """
-        old_header_knobs_names = set(self.knob_names)
-        new_header_knobs = {}
-
-        # Collect all knobs to display.
-        # Iterating over copy of the node list to not saw off the tree
-        # we're sitting on.
-        for node in list(self.node_list):
-            # If node was deleted, remove node and return.
-            if not nuke_utils.node_exists(node):
-                self.removeRows(row=self.node_list.index(node),
-                                count=1,
-                                parent=QtCore.QModelIndex(),
-                                setup_model_data=False)
-                # Continue with the next node, since we removed this node.
-                continue
-
-            # noinspection PyUnresolvedReferences
-            for knob_name, knob in node.knobs().items():
-                if knob_name not in new_header_knobs.keys():
-                    new_header_knobs[knob_name] = knob
-
-        # Collect all knobs to remove.
-        remove_knobs = []
-        for knob_name in self.knob_names:
-            if knob_name not in new_header_knobs.keys():
-                remove_knobs.append(knob_name)
+        remove_knobs, add_knobs = self.core.column_diff()
 
         # Remove all knobs that do not belong to current node selection.
         for knob_name in remove_knobs:
-            remove_index = self.knob_names.index(knob_name)
             self.removeColumns(parent=QtCore.QModelIndex(),
-                               column=remove_index,
+                               column=self.knob_names.index(knob_name),
                                count=1)
 
         # Add all knobs at once, if model is empty.
-        if not self.knob_list and new_header_knobs:
-            # Sort knobs since they are not sorted on addition like below
-            new_header_knobs_list = sorted(new_header_knobs.values(),
-                                           key=lambda k: k.name().lower())
+        if not self.knob_list and add_knobs:
             self.insertColumns(parent=QtCore.QModelIndex(),
                                column=0,
-                               count=len(new_header_knobs_list),
-                               items=[knob.name() for
-                                      knob in new_header_knobs_list])
+                               count=len(add_knobs),
+                               items=add_knobs)
 
         # Insert each knob in sorted order.
         else:
-            for knob in new_header_knobs.values():
-                if knob.name() in old_header_knobs_names:
-                    continue
-                header_names = self.knob_names
-                insert_index = bisect_case_insensitive(header_names,
-                                                       knob.name())
+            for knob_name in add_knobs:
                 self.insertColumns(parent=QtCore.QModelIndex(),
-                                   column=insert_index,
+                                   column=self.core.column_position(knob_name),
                                    count=1,
-                                   items=[knob.name()])
+                                   items=[knob_name])
 
+    @tracing.traced('insertColumns', 'model')
     def insertColumns(self, column, count, parent, items):
         """Add items to header.
 
@@ -546,7 +956,7 @@ class NodeTableModel(QtCore.QAbstractTableModel):
             parent (QtCore.QModelIndex): Parent index.
             column (int): index of new columns.
             count (int, unused): Number of items to add (ignored).
-            item (list): Items to add.
+            item (list): Knob names to add.
 
         Returns:
             bool: True if items were added.
@@ -556,11 +966,11 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         self.beginInsertColumns(parent,
                                 column,
                                 column + count - 1)
-        for i, item in enumerate(items):
-            self._knob_list.insert(column + i, item)
+        self.core.insert_columns(column, items)
         self.endInsertColumns()
         return True
 
+    @tracing.traced('removeColumns', 'model')
     def removeColumns(self, column, count, parent):
         """Remove columns.
 
@@ -574,36 +984,50 @@ class NodeTableModel(QtCore.QAbstractTableModel):
 
         """
         self.beginRemoveColumns(parent, column, column + count - 1)
-
-        for col in reversed(range(column, column + count)):
-            self._knob_list.pop(col)
+        self.core.remove_columns(column, count)
         self.endRemoveColumns()
         return True
 
-    def insertRows(self, row, count, parent, items):
+    @tracing.traced('insertRows', 'model')
+    def insertRows(self, row, count, parent, items, setup_model_data=True):
         """Add consecutive rows.
 
         Args:
             parent (QtCore.QModelIndex): Parent index.
             count (int, unused): Number of items to add).
-            item (list): items to add.
+            item (list): Nodes or their metadata.NodeMetadata to add.
+            setup_model_data (bool): Setup model after inserting rows.
+                Disable when inserting many rows one by one.
 
         Returns:
             bool: True if items added.
 
         """
-        count = len(items)
+        records = []
+        for item in items:
+            if not isinstance(item, metadata.NodeMetadata):
+                item = self.core.adapter.read(item)
+            # Skip deleted and already shown nodes.
+            if item and item.node not in self.core.records:
+                records.append(item)
+        if not records:
+            return False
+
+        count = len(records)
         self.beginInsertRows(parent,
                              row,
                              row + count - 1)
-        for i, item in enumerate(items):
-            self._node_list.insert(row + i, item)
+        self.core.insert_rows(row, records)
         self.endInsertRows()
+        if self.column_modes is not None:
+            self.column_modes.reset()
 
-        self.setup_model_data()
+        if setup_model_data:
+            self.setup_model_data()
 
         return True
 
+    @tracing.traced('removeRows', 'model')
     def removeRows(self, row, count, parent, setup_model_data=True):
         """Remove consecutive rows.
 
@@ -619,16 +1043,17 @@ class NodeTableModel(QtCore.QAbstractTableModel):
 
         """
         self.beginRemoveRows(parent, row, row + count - 1)
-        for i in reversed(range(row, row + count)):
-            self._node_list.pop(i)
+        self.core.remove_rows(row, count)
         self.endRemoveRows()
+        if self.column_modes is not None:
+            self.column_modes.reset()
 
         # Update horizontal header.
         if setup_model_data:
             self.setup_model_data()
         return True
 
-    def get_background_color(self, row, node, knob):
+    def get_background_color(self, row, column, knob):
         """Return the cell color.
 
         If a knob is animated, return colors matching Nuke's property panel.
@@ -637,40 +1062,67 @@ class NodeTableModel(QtCore.QAbstractTableModel):
 
         Args:
             row (int): Row to get background color for.
-            node (nuke.Node): Node to get color from.
+            column (int): Column to get background color for.
             knob (nuke.Knob): Knob to get color from. Overwrites the node's
                 color if animated.
         Returns:
             QtGui.QBrush: Color of the current cell.
 
         """
-        if knob and knob.isAnimated():
-            # noinspection PyArgumentList
-            if knob.isKeyAt(nuke.frame()):
+        # Cached values are known not to be animated.
+        if knob and self.core.is_volatile(row, column) is not False:
+            try:
+                animated = knob.isAnimated()
+                # noinspection PyArgumentList
+                keyed = animated and knob.isKeyAt(nuke.frame())
+            except ValueError:
+                # Node was deleted.
+                return None
+            if keyed:
                 return QtGui.QBrush(QtGui.QColor().fromRgbF(
                     *constants.KNOB_HAS_KEY_AT_COLOR))
+            if animated:
+                return QtGui.QBrush(QtGui.QColor().fromRgbF(
+                    *constants.KNOB_ANIMATED_COLOR))
+
+        record = self.core.record(row)
+        if knob and self.highlighted_cells and \
+                (record.node, self.core.column_name(column)) in \
+                self.highlighted_cells:
             return QtGui.QBrush(QtGui.QColor().fromRgbF(
-                *constants.KNOB_ANIMATED_COLOR))
+                *constants.SEARCH_MATCH_COLOR))
+
+        # Removed cells have no knob anymore, so check cells without knob.
+        if self.diff_cells:
+            status = self.diff_cells.get((record.node,
+                                          self.core.column_name(column)))
+            if status is not None:
+                return QtGui.QBrush(QtGui.QColor().fromRgbF(
+                    *DIFF_COLORS[status]))
 
+        if knob and self._highlight_outliers and \
+                self.column_modes.is_outlier(row, column):
+            return QtGui.QBrush(QtGui.QColor().fromRgbF(
+                *constants.OUTLIER_COLOR))
+
+        color = record.tile_color
+        if not row % 2:
+            base = self.palette.base().color()  # type: QtGui.QColor
         else:
-            color = nuke_utils.get_node_tile_color(node)
-            if not row % 2:
-                base = self.palette.base().color()  # type: QtGui.QColor
-            else:
-                base = self.palette.alternateBase().color()
+            base = self.palette.alternateBase().color()
 
-            if knob:
-                mix = constants.CELL_MIX_NODE_COLOR_AMOUNT_HAS_KNOB
-            else:
-                mix = constants.CELL_MIX_NODE_COLOR_AMOUNT_NO_KNOB
+        if knob:
+            mix = constants.CELL_MIX_NODE_COLOR_AMOUNT_HAS_KNOB
+        else:
+            mix = constants.CELL_MIX_NODE_COLOR_AMOUNT_NO_KNOB
 
-            base_color = base.getRgbF()[:3]
+        base_color = base.getRgbF()[:3]
 
-            # Blend Nodes color with base color
-            base_color_blend = scalar(base_color, 1.0 - mix)
-            color_blend = scalar(color, mix)
-            color = [sum(x) for x in zip(base_color_blend, color_blend)]
-            return QtGui.QBrush(QtGui.QColor().fromRgbF(*color))
+        # Blend Nodes color with base color
+        base_color_blend = scalar(base_color, 1.0 - mix)
+        color_blend = scalar(color, mix)
+        color = [sum(x) for x in zip(base_color_blend, color_blend)]
+        return QtGui.QBrush(QtGui.QColor().fromRgbF(*color))
 
     def data(self, index, role):
         """Returns the header data.
@@ -694,24 +1146,13 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         row = index.row()
         col = index.column()
 
-        if not self.node_list:
-            self.setup_model_data()
-            return
-
-        node = self.node_list[row]
-
-        # Return early if node was deleted to prevent access to detached
-        # python node object.
-        if not nuke_utils.node_exists(node):
-            self.removeRows(parent=QtCore.QModelIndex(),
-                            row=row,
-                            count=1)
+        if not self.core.row_count:
             return
 
-        knob = node.knob(self.knob_list[col])
+        knob = self.core.knob(row, col)
 
         if role == QtCore.Qt.BackgroundRole:
-            return self.get_background_color(row, node, knob)
+            return self.get_background_color(row, col, knob)
 
         # Return early if node has no knob at current index.
         # Further data roles require a knob.
@@ -722,48 +1163,85 @@ class NodeTableModel(QtCore.QAbstractTableModel):
             if role in [QtCore.Qt.CheckStateRole, QtCore.Qt.DisplayRole]:
                 return None
 
-        elif isinstance(knob, nuke.IArray_Knob):
-            if (role == QtCore.Qt.DisplayRole) or (role == QtCore.Qt.EditRole):
-                # dim = knob.dimensions()
-                width = knob.width()
-                height = knob.height()
-                value = [knob.value(i / width, i % width)
-                         for i in range(width * height)]
-                # return value
-                if role == QtCore.Qt.DisplayRole:
-                    return str(value)
-                else:
-                    return value
-
-        elif isinstance(knob, (nuke.Axis_Knob, nuke.Transform2d_Knob)):
-            if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.EditRole:
-                matrix_list = []
-                matrix = knob.value()
-                # enumerating over the matrix results in a RuntimeError:
-                # index out of range. Iterating manually instead.
-                # pylint: disable=consider-using-enumerate
-                for idx in range(len(matrix)):
-                    matrix_list.append(matrix[idx])
-
-                if role == QtCore.Qt.DisplayRole:
-                    return str(matrix_list)
-                else:
-                    return matrix_list
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            try:
+                value = self.core.value(row, col)
+            except ValueError:
+                # Node was deleted, remove it to prevent further access to
+                # the detached python node object.
+                self.removeRows(parent=QtCore.QModelIndex(),
+                                row=row,
+                                count=1)
+                return
+            if role == QtCore.Qt.DisplayRole:
+                return str(value)
+            return value
+
+        elif role == QtCore.Qt.UserRole:
+            return knob
 
-        elif isinstance(knob, nuke.Format_Knob):
-            if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.EditRole:
-                format = knob.value()  # type: nuke.Format
-                return format.name()
+    def get_knob_value(self, knob):
+        """Return the value of a knob as displayed and edited in the table.
 
-        # Return data for all other knob classes.
-        if role == QtCore.Qt.DisplayRole:
-            return str(knob.value())
+        Args:
+            knob (nuke.Knob): Knob to get the value from.
 
-        elif role == QtCore.Qt.EditRole:
-            return knob.value()
+        Returns:
+            object: Value of the knob.
 
-        elif role == QtCore.Qt.UserRole:
-            return knob
+        """
+        return self.core.adapter.get_value(knob)
+
+    def get_sort_keys(self, key):
+        """Return the sort keys of all rows, extracting them if necessary.
+
+        Args:
+            key (str): Knob name or one of SORT_BY_NAME, SORT_BY_CLASS or
+                SORT_BY_POSITION.
+
+        Returns:
+            list: Sort keys in order of the node list.
+
+        """
+        return self.core.sort_keys(key)
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """Sort the rows by the knob values of given column.
+
+        Args:
+            column (int): Column to sort by.
+            order (QtCore.Qt.SortOrder): Sort order.
+
+        """
+        if 0 <= column < self.core.column_count:
+            self.sort_rows(self.core.column_name(column), order)
+
+    @tracing.traced('sort rows', 'model')
+    def sort_rows(self, key, order=QtCore.Qt.AscendingOrder):
+        """Sort the rows in one pass over precomputed keys.
+
+        Args:
+            key (str): Knob name or one of SORT_BY_NAME, SORT_BY_CLASS or
+                SORT_BY_POSITION.
+            order (QtCore.Qt.SortOrder): Sort order.
+
+        """
+        reverse = order == QtCore.Qt.DescendingOrder
+        self.core.sort_order = (key, reverse)
+        permutation = self.core.sort_permutation(key, reverse=reverse)
+        if permutation is None:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+
+        new_rows = self.core.apply_permutation(permutation)
+
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(new_rows[index.row()], index.column())
+                       for index in old_indexes]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+
+        self.layoutChanged.emit()
 
     @staticmethod
     def safe_string(string):
@@ -772,22 +1250,11 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         Args:
             string: Encode this string.
 
-        Todo:
-            Fix `unicode` type comparison for Python 3.
-
         Returns:
             str: String encoded or string unchanged if not unicode.
 
         """
-
-        # Check if running in Python 3
-        if sys.version_info.major >= 3:
-            return string
-
-        if isinstance(string, unicode):
-            return string.encode('utf-8')
-        else:
-            return string
+        return nuke_adapter.safe_string(string)
 
     def setData(self, index, value, role):
         """Sets edited data to node.
@@ -808,40 +1275,22 @@ class NodeTableModel(QtCore.QAbstractTableModel):
             return
 
         if role == QtCore.Qt.EditRole:
-            row = index.row()
-            col = index.column()
-            node = self.node_list[row]
-            knob_name = self.headerData(col,
-                                        QtCore.Qt.Horizontal,
-                                        QtCore.Qt.DisplayRole)
-            knob = node.knob(knob_name)
-
-            if knob:
-                edited = False
-                if isinstance(value, (list, tuple)):
-
-                    for i, val in enumerate(value):
-                        frame = nuke.root()['frame'].value()
-                        if knob.valueAt(frame, i) == val:
-                            edited = True
-                        else:
-                            edited = knob.setValueAt(val, frame, i)
-
-                elif isinstance(value, string_types):
-                    value = self.safe_string(value)
-                    edited = knob.setValue(value)
-
-                else:
-                    edited = knob.setValue(value)
-
-                # Contrary to the reference, nuke.Knob.setValue() does not
-                # always return True but None or even False if value was set
-                # successfully:
-                # nuke.createNode('NoOp')['label'].setValue('lorem ipsum')
-                # >>> None
-                # Therefore we must emit dataChanged() even when
-                # the returned value from setValue() is None or True.
-                # Otherwise we cause lagging in the UI.
+            # Contrary to the reference, nuke.Knob.setValue() does not
+            # always return True but None or even False if value was set
+            # successfully:
+            # nuke.createNode('NoOp')['label'].setValue('lorem ipsum')
+            # >>> None
+            # Therefore we must emit dataChanged() even when
+            # the returned value from setValue() is None or True.
+            # Otherwise we cause lagging in the UI.
+            self._editing = True
+            try:
+                edited = self.core.set_value(index.row(), index.column(),
+                                             value)
+            finally:
+                self._editing = False
+            if edited:
+                self.counters.dirty_cells += 1
 
                 # noinspection PyUnresolvedReferences
                 self.dataChanged.emit(index, index)
@@ -849,6 +1298,129 @@ class NodeTableModel(QtCore.QAbstractTableModel):
 
         return False
 
+    def set_values(self, changes, errors=None):
+        """Set many cells, emitting one dataChanged per column.
+
+        Args:
+            changes (iterable): (node, knob name, value) of every cell.
+            errors (list, optional): Collects (node, knob name, message) of
+                values the knobs rejected.
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: (node, knob name) of every cell
+                that was set.
+
+        """
+        self._editing = True
+        try:
+            with tracing.span('set values', 'model'):
+                applied = self.core.set_values(changes, errors)
+        finally:
+            self._editing = False
+        self.counters.dirty_cells += len(applied)
+        self.emit_cells_changed(applied)
+        return applied
+
+    def warm_start(self, table_snapshot, names=None):
+        """Show the values of a snapshot until revalidate() read them again.
+
+        Args:
+            table_snapshot (snapshot.TableSnapshot): Values of a previous
+                load of the same nodes.
+            names (list, optional): Full names of the rows, if known.
+
+        """
+        if self.revalidator is not None:
+            self.revalidator.cancel()
+        with tracing.span('warm start', 'model'):
+            self.revalidator = snapshot.Revalidator(self.core, table_snapshot,
+                                                    names)
+
+    def revalidate(self, seconds=constants.SNAPSHOT_REVALIDATE_SLICE):
+        """Read the cells of the warm start snapshot again for a time slice.
+
+        Emits dataChanged for cells that differ from the snapshot.
+
+        Args:
+            seconds (float, optional): Duration of the slice.
+
+        Returns:
+            bool: True if all cells were read again.
+
+        """
+        if self.revalidator is None:
+            return True
+        with tracing.span('revalidate', 'model'):
+            changed = self.revalidator.run(seconds)
+        self.emit_cells_changed(changed)
+        if not self.revalidator.complete:
+            return False
+        self.revalidator = None
+        return True
+
+    def set_diff(self, snapshot_diff, names=None):
+        """Highlight the cells of the current rows that differ in a diff.
+
+        Args:
+            snapshot_diff (snapshot.SnapshotDiff): Diff of a snapshot and
+                the current rows or None to remove the highlights.
+            names (list, optional): Full names of the rows, if known.
+
+        """
+        self.diff_cells = {}
+        if snapshot_diff is None or not snapshot_diff.cells:
+            return
+        if names is None:
+            names = snapshot.node_names(self.core)
+        nodes = dict(zip(names, self.core.nodes))
+        for (name, knob_name), difference in snapshot_diff.cells.items():
+            node = nodes.get(name)
+            if node is not None:
+                self.diff_cells[(node, knob_name)] = difference.status
+
+    def emit_cells_changed(self, cells):
+        """Emit dataChanged for the range of changed rows of every column.
+
+        Args:
+            cells (list): Changed cells as (node, knob name).
+
+        """
+        if not cells:
+            return
+        table = self.core
+        rows = dict(zip(table.nodes, range(table.row_count)))
+        ranges = {}
+        for node, knob_name in cells:
+            row = rows.get(node)
+            if row is None:
+                continue
+            first, last = ranges.get(knob_name, (row, row))
+            ranges[knob_name] = (min(first, row), max(last, row))
+        for knob_name, (first, last) in ranges.items():
+            column = table.column_of(knob_name)
+            if column >= 0:
+                # noinspection PyUnresolvedReferences
+                self.dataChanged.emit(self.index(first, column),
+                                      self.index(last, column))
+
+    def knob_changed(self, node, knob_name):
+        """Update a cell after its knob was changed outside of the table.
+
+        Args:
+            node (nuke.Node): Node of the knob.
+            knob_name (str): Name of the changed knob.
+
+        """
+        if self._editing or node not in self.core.records:
+            return
+        row = self.core.row_of(node)
+        self.core.knob_changed(node, knob_name, row)
+        column = self.core.column_of(knob_name)
+        if column >= 0:
+            index = self.index(row, column)
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(index, index)
+
     def flags(self, index):
         """Make cell selectable and editable for enabled knobs.
 
@@ -861,31 +1433,29 @@ class NodeTableModel(QtCore.QAbstractTableModel):
             QtCore.Qt.ItemFlag: Flag for current cell.
 
         """
-        row = index.row()
-        node = self.node_list[row]
-
         flags = QtCore.Qt.NoItemFlags
 
-        if not nuke_utils.node_exists(node):
-            # Only return NoTIemFlags and don't remove the row here.
-            # beginRemoveRows() calls flags() causing infinite recursion.
-            return flags
-
-        knob = self.data(index, QtCore.Qt.UserRole)  # type: nuke.Knob
-
+        knob = self.core.knob(index.row(), index.column())  # type: nuke.Knob
         if not knob:
             return flags
 
-        if knob.enabled():
-            flags |= QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEditable
+        try:
+            if not knob.enabled():
+                return flags
 
+            flags |= QtCore.Qt.ItemIsSelectable
+            if not self.core.adapter.read_only:
+                flags |= QtCore.Qt.ItemIsEditable
             if not isinstance(knob, tuple(constants.READ_ONLY_KNOBS)) \
                     and not knob.hasExpression():
                 flags |= QtCore.Qt.ItemIsEnabled
+        except ValueError:
+            # Node was deleted. Only return NoItemFlags and don't remove the
+            # row here. beginRemoveRows() calls flags() causing infinite
+            # recursion.
+            return QtCore.Qt.NoItemFlags
 
-            return flags
-
-        return QtCore.Qt.NoItemFlags
+        return flags
 
     def headerData(self, section, orientation, role):
         """Returns the header data.
@@ -899,27 +1469,40 @@ class NodeTableModel(QtCore.QAbstractTableModel):
             role (QtCore.int): the current role.
                 QtCore.Qt.DisplayRole: name of node or knob
                 QtCore.Qt.UserRole: the node or knob itself
+                MetadataRole: the node's metadata
 
         Returns:
             str|nuke.Knob: The knob or it's name.
 
         """
         if orientation == QtCore.Qt.Horizontal:
-            if section >= len(self.knob_list):
+            if section >= self.core.column_count:
                 return None
 
-            if role == QtCore.Qt.DisplayRole:
-                return self.knob_list[section]
-            elif role == QtCore.Qt.UserRole:
-                return self.knob_list[section]
+            if role in (QtCore.Qt.DisplayRole, QtCore.Qt.UserRole):
+                return self.core.column_name(section)
             return None
 
         elif orientation == QtCore.Qt.Vertical:
-            if section >= len(self.node_list):
+            if section >= self.core.row_count:
+                return None
+
+            node_metadata = self.core.record(section)
+            # Filters read the metadata of every row, without touching Nuke.
+            if role == MetadataRole:
+                return node_metadata
+            elif role == QtCore.Qt.BackgroundRole:
+                return QtGui.QBrush(QtGui.QColor.fromRgbF(
+                    *node_metadata.tile_color))
+            elif role == QtCore.Qt.ForegroundRole:
+                return QtGui.QPen(QtGui.QColor.fromRgbF(
+                    *node_metadata.font_color))
+
+            if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.UserRole):
                 return None
 
-            node = self.node_list[section]  # type: nuke.Node
-            if not nuke_utils.node_exists(node):
+            node = node_metadata.node  # type: nuke.Node
+            if not self.core.adapter.exists(node):
                 self.removeRows(row=section,
                                 count=1,
                                 parent= QtCore.QModelIndex())
@@ -927,11 +1510,193 @@ class NodeTableModel(QtCore.QAbstractTableModel):
 
             if role == QtCore.Qt.DisplayRole:
                 return node.name()
-            elif role == QtCore.Qt.UserRole:
-                return node
-            elif role == QtCore.Qt.BackgroundRole:
-                return QtGui.QBrush(QtGui.QColor.fromRgbF(
-                    *(nuke_utils.get_node_tile_color(node))))
-            elif role == QtCore.Qt.ForegroundRole:
-                return QtGui.QPen(QtGui.QColor.fromRgbF(
-                    *(nuke_utils.get_node_font_color(node))))
+            return node
+
+
+class AggregateModel(QtCore.QAbstractTableModel):
+    """Serve statistics of the rows of a proxy model as horizontal header.
+
+    The model has no rows. Each column's header shows the statistics of
+    the same column of the proxy, computed when first shown and updated
+    incrementally when cells change.
+
+    """
+
+    def __init__(self, proxy, parent=None):
+        """
+
+        Args:
+            proxy (QtCore.QAbstractItemModel): Model whose visible rows are
+                aggregated, ie. the top of the stack of filter models.
+            parent (QtCore.QObject, optional): Parent object.
+
+        """
+        super(AggregateModel, self).__init__(parent)
+        self.proxy = proxy
+        self.table_model = get_source_model(proxy)  # type: NodeTableModel
+
+        # Rows of the table model passing all filters.
+        self._rows = None
+        # Aggregate by knob name.
+        self._aggregates = {}  # type: dict
+        # Nodes the aggregates were computed for.
+        self._nodes = None
+
+        proxy.modelReset.connect(self.reset)
+        proxy.columnsInserted.connect(self.reset)
+        proxy.columnsRemoved.connect(self.reset)
+        proxy.rowsInserted.connect(self.invalidate)
+        proxy.rowsRemoved.connect(self.invalidate)
+        # Sorting changes the rows but keeps the set of nodes.
+        proxy.layoutChanged.connect(self.invalidate_rows)
+        self.table_model.dataChanged.connect(self.source_data_changed)
+
+    @property
+    def rows(self):
+        """:obj:`list` of :obj:`int`: Rows of the table model to aggregate."""
+        if self._rows is None:
+            self._rows = get_source_rows(self.proxy)
+            nodes = self.table_model.node_list
+            visible_nodes = frozenset(nodes[row] for row in self._rows)
+            if visible_nodes != self._nodes:
+                self._aggregates.clear()
+                self._nodes = visible_nodes
+        return self._rows
+
+    def aggregate(self, column):
+        """Return the statistics of a column of the proxy.
+
+        Args:
+            column (int): Column of the proxy.
+
+        Returns:
+            aggregates.Aggregate: The statistics.
+
+        """
+        knob_name = self.proxy.headerData(column, QtCore.Qt.Horizontal,
+                                          QtCore.Qt.UserRole)
+        rows = self.rows
+        aggregate = self._aggregates.get(knob_name)
+        if aggregate is None:
+            with tracing.span('aggregate', 'model', knob=knob_name):
+                aggregate = aggregates.aggregate_column(
+                    self.table_model.core, knob_name, rows)
+            self._aggregates[knob_name] = aggregate
+        return aggregate
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """The statistics only have a header.
+
+        Returns:
+            int: 0
+
+        """
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        """Number of columns of the proxy.
+
+        Args:
+            parent (QtCore.QModelIndex, optional): Parent index.
+
+        Returns:
+            int: Number of columns.
+
+        """
+        if parent.isValid():
+            return 0
+        return self.proxy.columnCount()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """The statistics only have a header.
+
+        Returns:
+            None: Always.
+
+        """
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        """Return the statistics of a column.
+
+        Args:
+            section (int): Column of the proxy.
+            orientation (QtCore.Qt.Orientation): Only horizontal is supported.
+            role (int): DisplayRole or ToolTipRole.
+
+        Returns:
+            str: Statistics as text.
+
+        """
+        if orientation != QtCore.Qt.Horizontal or \
+                not 0 <= section < self.proxy.columnCount():
+            return None
+
+        if role == QtCore.Qt.DisplayRole:
+            return self.aggregate(section).summary()
+        elif role == QtCore.Qt.ToolTipRole:
+            aggregate = self.aggregate(section)
+            return '{}: {} of {} rows\n{}'.format(
+                aggregate.knob_name, len(aggregate), len(self.rows),
+                aggregate.summary())
+        return None
+
+    @QtCore.Slot()
+    def reset(self):
+        """Start over after the columns changed."""
+        self.beginResetModel()
+        self._rows = None
+        self._aggregates.clear()
+        self._nodes = None
+        self.endResetModel()
+
+    @QtCore.Slot()
+    def invalidate(self):
+        """Recompute all statistics after the filtered rows changed."""
+        self._rows = None
+        self._aggregates.clear()
+        self._nodes = None
+        self._emit_header_changed()
+
+    @QtCore.Slot()
+    def invalidate_rows(self):
+        """Map the rows again, keeping statistics if the nodes are the same."""
+        self._rows = None
+        self._emit_header_changed()
+
+    def source_data_changed(self, top_left, bottom_right, roles=None):
+        """Replace the values of changed cells in the statistics.
+
+        Args:
+            top_left (QtCore.QModelIndex): First changed cell.
+            bottom_right (QtCore.QModelIndex): Last changed cell.
+            roles (list, optional): Changed roles.
+
+        """
+        if not self._aggregates:
+            return
+
+        table = self.table_model.core
+        changed = False
+        for column in range(top_left.column(), bottom_right.column() + 1):
+            aggregate = self._aggregates.get(table.column_name(column))
+            if aggregate is None:
+                continue
+            for row in range(top_left.row(), bottom_right.row() + 1):
+                node = table.nodes[row]
+                if node not in aggregate.values:
+                    continue
+                try:
+                    aggregate.replace(node, table.value(row, column))
+                except ValueError:
+                    # Node was deleted.
+                    aggregate.discard(node)
+                changed = True
+
+        if changed:
+            self._emit_header_changed()
+
+    def _emit_header_changed(self):
+        count = self.columnCount()
+        if count:
+            self.headerDataChanged.emit(QtCore.Qt.Horizontal, 0, count - 1)
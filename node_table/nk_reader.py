@@ -0,0 +1,656 @@
+"""Read nodes and knobs of .nk scripts without Nuke.
+
+Scripts are memory mapped and scanned line by line. The scan only records
+the class, name and byte range of every node block, so scripts of any size
+can be indexed with little memory. Knobs of a node are parsed from its
+block when the node is read, ie. when it is loaded into a table.
+
+NkNode and NkKnob mimic the parts of nuke.Node and nuke.Knob the table
+uses, and NkScriptAdapter implements core.NodeAdapter for them, so a
+NodeTableModel can show a script read-only.
+
+Scripts only store knobs that differ from their defaults, so nodes lack
+all knobs left at default values.
+
+Examples:
+    >>> script = NkScript('/shots/sh010/comp_v012.nk')
+    >>> adapter = NkScriptAdapter(script)
+    >>> table = core.TableCore(adapter)
+    >>> table.load(script.nodes)
+    >>> table.node_value(script.nodes[0], 'file')
+    '/shots/sh010/plates/sh010.####.exr'
+
+"""
+
+# Import built-in modules
+import mmap
+import os
+import re
+
+try:
+    from sys import intern
+except ImportError:
+    # Python 2 has intern as builtin.
+    pass
+
+try:
+    # Python 2
+    string_types = basestring
+except NameError:
+    # Python 3
+    string_types = str
+
+# Import local modules
+from node_table import core
+from node_table import metadata
+
+# Colors of nodes without tile_color or note_font_color knob.
+DEFAULT_TILE_COLOR = (0.5, 0.5, 0.5)
+DEFAULT_FONT_COLOR = (0.0, 0.0, 0.0)
+
+# Classes that are written like nodes but are not part of the DAG.
+_SKIPPED_CLASSES = frozenset([b'Root'])
+
+# Start of a node block, ie. `Blur {` or `clone node1|Blur|1 Blur {`.
+_HEADER_RE = re.compile(br'^( *)(?:clone +\S+ +)?([\w.]+) \{\s*$')
+# Characters that change the nesting of braces and quotes.
+_SPECIAL_RE = re.compile(br'\\.|[{}"]', re.DOTALL)
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_INT_RE = re.compile(r'^[-+]?\d+$')
+_HEX_RE = re.compile(r'^0x[0-9a-fA-F]+$')
+_FLOAT_RE = re.compile(
+    r'^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$|^[-+]?(inf|nan)$')
+
+
+def _nesting(line, depth, in_quote):
+    """Return the nesting after a line, given the nesting before it.
+
+    Args:
+        line (bytes): Line of the script.
+        depth (int): Open braces before the line.
+        in_quote (bool): True if a quoted string is open before the line.
+
+    Returns:
+        tuple: (depth, in_quote) after the line.
+
+    """
+    if b'"' not in line and b'\\' not in line:
+        if in_quote:
+            return depth, in_quote
+        return depth + line.count(b'{') - line.count(b'}'), in_quote
+    for match in _SPECIAL_RE.finditer(line):
+        token = match.group()
+        if len(token) == 2:
+            # Escaped character.
+            continue
+        if in_quote:
+            if token == b'"':
+                in_quote = False
+        elif token == b'{':
+            depth += 1
+        elif token == b'}':
+            depth -= 1
+        elif not depth and line[match.start() - 1:match.start()] in (
+                b'', b' ', b'\t'):
+            # Quotes only start strings at the beginning of words and are
+            # literal inside braces.
+            in_quote = True
+    return depth, in_quote
+
+
+def unescape(text):
+    """Replace the backslash escapes of a quoted string.
+
+    Args:
+        text (str): Text between the quotes.
+
+    Returns:
+        str: The text with escapes replaced.
+
+    """
+    if '\\' not in text:
+        return text
+    return _ESCAPE_RE.sub(
+        lambda match: _ESCAPES.get(match.group(1), match.group(1)), text)
+
+
+def parse_number(text):
+    """Return the number of a word, or None if it is no number.
+
+    Args:
+        text (str): Word of a script.
+
+    Returns:
+        int|float: Integers for words without decimal point or exponent,
+            ie. `xpos 120`, floats otherwise.
+
+    """
+    if _INT_RE.match(text):
+        return int(text)
+    if _HEX_RE.match(text):
+        return int(text, 16)
+    if _FLOAT_RE.match(text):
+        return float(text)
+    return None
+
+
+def parse_value(text):
+    """Convert the text of a knob value to a value like nuke.Knob.value().
+
+    Args:
+        text (str): Text after the knob name, ie. `{10 20}` or `"a b"`.
+
+    Returns:
+        object: Bools, numbers, lists of floats for braced numbers and
+            strings for everything else. Expressions and animations are
+            returned as their text.
+
+    """
+    text = text.strip()
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        return unescape(text[1:-1])
+    if len(text) >= 2 and text[0] == '{' and text[-1] == '}':
+        inner = text[1:-1]
+        if '{' in inner or '[' in inner or '$' in inner:
+            return inner.strip()
+        words = inner.split()
+        numbers = [parse_number(word) for word in words]
+        if words and None not in numbers:
+            return [float(number) for number in numbers]
+        return inner.strip()
+    if text == 'true':
+        return True
+    if text == 'false':
+        return False
+    number = parse_number(text)
+    if number is not None:
+        return number
+    return unescape(text)
+
+
+def parse_knobs(text):
+    """Split the lines of a node block into knob names and value texts.
+
+    Args:
+        text (bytes): The block without its first and last line.
+
+    Returns:
+        :obj:`list` of :obj:`tuple`: (knob name, value text) in order.
+            User knob definitions are skipped.
+
+    """
+    knobs = []
+    lines = []
+    depth, in_quote = 0, False
+    for line in text.splitlines():
+        lines.append(line)
+        depth, in_quote = _nesting(line, depth, in_quote)
+        if depth > 0 or in_quote:
+            continue
+        item = b'\n'.join(lines).strip()
+        lines = []
+        depth, in_quote = 0, False
+        if not item:
+            continue
+        knob_name, _, value = item.partition(b' ')
+        if knob_name == b'addUserKnob':
+            continue
+        knobs.append((knob_name.decode('utf-8', 'replace'),
+                      value.decode('utf-8', 'replace')))
+    return knobs
+
+
+class NkKnob(object):
+    """Knob of a node in a .nk script, with the read-only API of nuke.Knob."""
+
+    __slots__ = ('_node', '_name', 'text', '_value')
+
+    def __init__(self, node, name, text):
+        """
+
+        Args:
+            node (NkNode): Node of the knob.
+            name (str): Name of the knob.
+            text (str): Text of the value as written in the script.
+
+        """
+        self._node = node
+        self._name = name
+        self.text = text
+        self._value = None
+
+    def __repr__(self):
+        return '<NkKnob {}>'.format(self._name)
+
+    def name(self):
+        """str: Name of the knob."""
+        return self._name
+
+    def node(self):
+        """NkNode: Node of the knob."""
+        return self._node
+
+    def value(self):
+        """object: The parsed value, see parse_value()."""
+        if self._value is None:
+            self._value = parse_value(self.text)
+        return self._value
+
+    def isAnimated(self):  # pylint: disable=invalid-name
+        """bool: True if the value contains an animation curve."""
+        return '{curve' in self.text
+
+    def hasExpression(self):  # pylint: disable=invalid-name
+        """bool: True if the value contains an expression."""
+        return self.text.startswith('{') and not self.isAnimated() and (
+            '{' in self.text[1:-1] or '[' in self.text or '$' in self.text)
+
+    def isKeyAt(self, frame):  # pylint: disable=invalid-name, unused-argument
+        """bool: Keys of curves are not parsed, always False."""
+        return False
+
+    def enabled(self):
+        """bool: Always True, knob states are not stored in scripts."""
+        return True
+
+    def visible(self):
+        """bool: Always True, knob states are not stored in scripts."""
+        return True
+
+
+class NkNode(object):
+    """Node block of a .nk script, with the read-only API of nuke.Node.
+
+    Only the class, name and byte range of the block are kept. Knobs are
+    parsed again every time knobs() is called.
+
+    """
+
+    __slots__ = ('script', '_class', '_name', 'parent', 'start', 'end')
+
+    def __init__(self, script, node_class, name, parent, start, end):
+        """
+
+        Args:
+            script (NkScript): Script of the node.
+            node_class (str): Class of the node.
+            name (str): Name of the node.
+            parent (NkNode): Group containing the node or None.
+            start (int): Offset of the block's first byte in the script.
+            end (int): Offset after the block's last byte.
+
+        """
+        self.script = script
+        self._class = node_class
+        self._name = name
+        self.parent = parent
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return '<NkNode {} {}>'.format(self._class, self.fullName())
+
+    def Class(self):  # pylint: disable=invalid-name
+        """str: Class of the node."""
+        return self._class
+
+    def name(self):
+        """str: Name of the node."""
+        return self._name
+
+    def fullName(self):  # pylint: disable=invalid-name
+        """str: Name including the names of parent groups, ie. Group1.Blur1."""
+        if self.parent is None:
+            return self._name
+        return '{}.{}'.format(self.parent.fullName(), self._name)
+
+    def knobs(self):
+        """Parse the knobs of the node.
+
+        Returns:
+            dict: NkKnob by knob name.
+
+        """
+        block = self.script.block(self)
+        # Skip the header and closing brace.
+        body = block[block.find(b'\n') + 1:block.rstrip().rfind(b'\n')]
+        return dict((name, NkKnob(self, name, text))
+                    for name, text in parse_knobs(body))
+
+    def __getitem__(self, knob_name):
+        return self.knobs()[knob_name]
+
+
+class NkScript(object):
+    """Index of the node blocks of a .nk script.
+
+    Examples:
+        >>> with NkScript('/tmp/comp.nk') as script:
+        ...     for node in script.iter_nodes():
+        ...         print(node.fullName())
+
+    """
+
+    def __init__(self, path):
+        """Map the script into memory. Nodes are indexed when first needed.
+
+        Args:
+            path (str): Path of the .nk script.
+
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        if os.path.getsize(path):
+            self._data = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        else:
+            self._data = b''
+        self._nodes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Unmap and close the script."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._file.close()
+
+    def block(self, node):
+        """Return the text of a node's block.
+
+        Args:
+            node (NkNode): Node of this script.
+
+        Returns:
+            bytes: The block including its header and closing brace.
+
+        """
+        return self._data[node.start:node.end]
+
+    @property
+    def nodes(self):
+        """:obj:`list` of :obj:`NkNode`: All nodes, including group members."""
+        if self._nodes is None:
+            self._nodes = list(self.iter_nodes())
+        return self._nodes
+
+    def iter_nodes(self):
+        """Scan the script and yield its nodes in order.
+
+        Members of groups follow their group with one more space of
+        indentation until `end_group`.
+
+        Yields:
+            NkNode: The nodes, including nodes inside groups.
+
+        """
+        if self._nodes is not None:
+            for node in self._nodes:
+                yield node
+            return
+
+        data = self._data
+        size = len(data)
+        groups = []
+        last_node = None
+        offset = 0
+        depth, in_quote = 0, False
+        while offset < size:
+            end = data.find(b'\n', offset)
+            end = size if end < 0 else end + 1
+            line = data[offset:end]
+            line_start, offset = offset, end
+
+            if depth > 0 or in_quote:
+                # Continued value of a command, ie. define_window_layout_xml.
+                depth, in_quote = _nesting(line, depth, in_quote)
+                continue
+
+            match = _HEADER_RE.match(line)
+            if match:
+                indent = match.group(1)
+                block_end = self._block_end(offset, indent)
+                node_class = match.group(2)
+                if len(indent) > len(groups) and last_node is not None:
+                    groups.append(last_node)
+                if node_class not in _SKIPPED_CLASSES:
+                    last_node = NkNode(
+                        self, intern(str(node_class.decode('utf-8'))),
+                        self._block_name(offset - 1, block_end, indent),
+                        groups[-1] if groups else None, line_start,
+                        block_end)
+                    yield last_node
+                offset = block_end
+                continue
+
+            if line.strip() == b'end_group':
+                if groups:
+                    last_node = groups.pop()
+                continue
+
+            depth, in_quote = _nesting(line, 0, False)
+
+    def _block_end(self, offset, indent):
+        """Return the offset after the closing brace of a node block.
+
+        Args:
+            offset (int): Offset after the block's header.
+            indent (bytes): Indentation of the header and closing brace.
+
+        Returns:
+            int: Offset after the line of the closing brace.
+
+        """
+        data = self._data
+        closing = b'\n' + indent + b'}'
+        depth, in_quote = 0, False
+        position = search = offset - 1
+        while True:
+            found = data.find(closing, search)
+            if found < 0:
+                return len(data)
+            line_end = data.find(b'\n', found + 1)
+            line_end = len(data) if line_end < 0 else line_end + 1
+            if not data[found + len(closing):line_end].strip():
+                # Only a brace at the indentation of the header closes the
+                # block, unless it is part of a multi-line value.
+                depth, in_quote = _nesting(data[position:found], depth,
+                                           in_quote)
+                position = found
+                if depth <= 0 and not in_quote:
+                    return line_end
+            search = found + 1
+
+    def _block_name(self, start, end, indent):
+        """Return the value of the name knob of a node block.
+
+        Args:
+            start (int): Offset of the line break before the first knob.
+            end (int): Offset after the block.
+            indent (bytes): Indentation of the block's header.
+
+        Returns:
+            str: The name or the offset of the block if it has no name.
+
+        """
+        data = self._data
+        key = b'\n' + indent + b' name '
+        found = data.find(key, start, end)
+        if found < 0:
+            return 'node{}'.format(start)
+        line_end = data.find(b'\n', found + len(key), end)
+        text = data[found + len(key):line_end if line_end >= 0 else end]
+        return str(parse_value(text.decode('utf-8', 'replace')))
+
+
+def _to_rgb(color):
+    """Convert a color like 0xff0000ff to rgb."""
+    return ((0xFF & color >> 24) / 255.0,
+            (0xFF & color >> 16) / 255.0,
+            (0xFF & color >> 8) / 255.0)
+
+
+class NkScriptAdapter(core.NodeAdapter):
+    """Read-only adapter for nodes of a .nk script."""
+
+    read_only = True
+
+    def __init__(self, script):
+        """
+
+        Args:
+            script (NkScript): Script to read nodes from.
+
+        """
+        self.script = script
+
+    def read(self, node, default_colors=None):
+        """Parse the knobs of a node.
+
+        Args:
+            node (NkNode): Node to read.
+            default_colors (dict, optional): Unused, default colors of node
+                classes are unknown without Nuke.
+
+        Returns:
+            metadata.NodeMetadata: Metadata of the node.
+
+        """
+        knobs = node.knobs()
+        tile_color = font_color = None
+        knob = knobs.get('tile_color')
+        if knob is not None and isinstance(knob.value(), int) and knob.value():
+            tile_color = _to_rgb(knob.value())
+        knob = knobs.get('note_font_color')
+        if knob is not None and isinstance(knob.value(), int):
+            font_color = _to_rgb(knob.value())
+        return metadata.NodeMetadata(
+            node, node.name(), node.Class(), knobs,
+            tile_color=tile_color or DEFAULT_TILE_COLOR,
+            font_color=font_color or DEFAULT_FONT_COLOR)
+
+    def all_nodes(self):
+        """Return all nodes of the script.
+
+        Returns:
+            :obj:`list` of :obj:`NkNode`: The nodes.
+
+        """
+        return self.script.nodes
+
+    def full_name(self, node):
+        """Return the name of a node including its parent groups.
+
+        Args:
+            node (NkNode): Node to get the name of.
+
+        Returns:
+            str: Full name, ie. Group1.Blur1.
+
+        """
+        return node.fullName()
+
+    def exists(self, node):
+        """Return True, nodes of a script are never deleted.
+
+        Args:
+            node (NkNode): Node to check.
+
+        Returns:
+            bool: True
+
+        """
+        return True
+
+    def get_value(self, knob):
+        """Return the parsed value of a knob.
+
+        Args:
+            knob (NkKnob): Knob to read.
+
+        Returns:
+            object: Value of the knob.
+
+        """
+        return knob.value()
+
+    def is_volatile(self, knob):
+        """Return True for animated knobs and knobs with expressions.
+
+        Args:
+            knob (NkKnob): Knob to check.
+
+        Returns:
+            bool: True to show the knob like animated knobs in Nuke.
+
+        """
+        return knob.isAnimated() or knob.hasExpression()
+
+    def is_numeric(self, knob):
+        """Return True for float values and lists of floats.
+
+        Args:
+            knob (NkKnob): Knob to check.
+
+        Returns:
+            bool: True if the value can be kept in a columnar buffer.
+
+        """
+        return isinstance(knob.value(), (float, list))
+
+    def is_text(self, knob):
+        """Return True for string values that are not expressions.
+
+        Args:
+            knob (NkKnob): Knob to check.
+
+        Returns:
+            bool: True if the value is indexed for full text search.
+
+        """
+        return isinstance(knob.value(), string_types) and not (
+            knob.isAnimated() or knob.hasExpression())
+
+    def set_value(self, knob, value):
+        """Scripts are read-only.
+
+        Returns:
+            bool: False
+
+        """
+        return False
+
+    def position(self, node):
+        """Return the DAG position of a node.
+
+        Args:
+            node (NkNode): Node to get the position of.
+
+        Returns:
+            tuple: (ypos, xpos), zero for missing positions.
+
+        """
+        knobs = node.knobs()
+        positions = []
+        for knob_name in ('ypos', 'xpos'):
+            knob = knobs.get(knob_name)
+            value = knob.value() if knob is not None else 0
+            positions.append(value if isinstance(value, (int, float)) else 0)
+        return tuple(positions)
+
+    def script_state(self):
+        """Return the path, size and modification time of the script.
+
+        Returns:
+            list: [path, size, modification time]
+
+        """
+        path = os.path.abspath(self.script.path)
+        stat = os.stat(path)
+        return [path, stat.st_size, stat.st_mtime]
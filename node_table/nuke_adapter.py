@@ -0,0 +1,344 @@
+"""Read and write nodes of the running Nuke session for the table core."""
+
+# Import built-in modules
+import os
+import sys
+
+try:
+    # Python 2
+    string_types = basestring
+except NameError:
+    # Python 3
+    string_types = str
+
+# Import third-party modules
+import nuke  # pylint: disable=import-error
+
+# Import local modules
+from node_table import constants
+from node_table import core
+from node_table import metadata
+from node_table import nuke_utils
+
+
+# Colors in rgb by hex value, shared between all rows.
+_RGB_COLORS = {}
+
+
+def to_rgb(color_hex):
+    """Convert a hex color to rgb, returning the same tuple for equal colors.
+
+    Args:
+        color_hex (int): Color in hex format.
+
+    Returns:
+        :obj:`tuple` of :obj:`float`: Color in rgb.
+
+    """
+    rgb = _RGB_COLORS.get(color_hex)
+    if rgb is None:
+        rgb = _RGB_COLORS[color_hex] = nuke_utils.to_rgb(color_hex)[:3]
+    return rgb
+
+
+def read_tile_color(knobs, node_class, default_colors):
+    """Return the node's tile color or default node color if not set.
+
+    Args:
+        knobs (dict): Knobs of the node.
+        node_class (str): Class of the node.
+        default_colors (dict): Default colors per node class.
+
+    Returns:
+        :obj:`tuple` of :obj:`float`: Color in rgb.
+
+    """
+    color = None
+    tile_color_knob = knobs.get('tile_color')
+    if tile_color_knob:
+        color = tile_color_knob.value()
+    if not color:
+        if node_class not in default_colors:
+            default_colors[node_class] = nuke.defaultNodeColor(node_class)
+        color = default_colors[node_class]
+
+    if color:
+        return to_rgb(color)
+
+
+def read_font_color(knobs):
+    """Return the label color of a node.
+
+    Args:
+        knobs (dict): Knobs of the node.
+
+    Returns:
+        :obj:`tuple` of :obj:`float`: Color in rgb.
+
+    """
+    color_knob = knobs.get('note_font_color')
+    if color_knob:
+        return to_rgb(color_knob.value())
+
+
+def safe_string(string):
+    """Encode unicode to string because nuke knobs don't accept unicode.
+
+    Args:
+        string: Encode this string.
+
+    Returns:
+        str: String encoded or string unchanged if not unicode.
+
+    """
+    # Check if running in Python 3
+    if sys.version_info.major >= 3:
+        return string
+
+    if isinstance(string, unicode):  # pylint: disable=undefined-variable
+        return string.encode('utf-8')
+    return string
+
+
+class NukeUndoGroup(core.UndoGroup):
+    """Records edits as one step of Nuke's undo history."""
+
+    def __init__(self, name):
+        super(NukeUndoGroup, self).__init__(name)
+        self._undo = None
+
+    def begin(self):
+        """Start recording edits."""
+        self._undo = nuke.Undo()
+        self._undo.begin(self.name)
+
+    def end(self):
+        """Finish the undo step."""
+        if self._undo is not None:
+            self._undo.end()
+            self._undo = None
+
+    def cancel(self):
+        """Finish without recording an undo step."""
+        if self._undo is not None:
+            self._undo.cancel()
+            self._undo = None
+
+
+class NukeNodeAdapter(core.NodeAdapter):
+    """Adapter for nodes of the running Nuke session."""
+
+    def read(self, node, default_colors=None):
+        """Read the metadata of a node.
+
+        Args:
+            node (nuke.Node): Node to read.
+            default_colors (dict, optional): Cache of default node colors per
+                node class, shared between calls.
+
+        Returns:
+            metadata.NodeMetadata: Metadata or None if the node was deleted.
+
+        """
+        try:
+            name = node.name()
+        except ValueError:
+            # Node was deleted.
+            return None
+
+        node_class = node.Class()
+        # Using knobs() to also get linked knobs.
+        knobs = node.knobs()
+
+        if default_colors is None:
+            default_colors = {}
+
+        return metadata.NodeMetadata(
+            node, name, node_class, knobs,
+            tile_color=read_tile_color(knobs, node_class, default_colors),
+            font_color=read_font_color(knobs))
+
+    def all_nodes(self):
+        """Return all nodes of the script, including nodes inside groups.
+
+        Returns:
+            :obj:`list` of :obj:`nuke.Node`: The nodes.
+
+        """
+        return nuke.allNodes(group=nuke.root(), recurseGroups=True)
+
+    def full_name(self, node):
+        """Return the name of a node including its parent groups.
+
+        Args:
+            node (nuke.Node): Node to get the name of.
+
+        Returns:
+            str: Full name, ie. Group1.Blur1.
+
+        """
+        return node.fullName()
+
+    def exists(self, node):
+        """Return True if the python node object is still attached to a Node.
+
+        Args:
+            node (nuke.Node): Node to check.
+
+        Returns:
+            bool: True if node exists.
+
+        """
+        return nuke_utils.node_exists(node)
+
+    def get_value(self, knob):
+        """Return the value of a knob as displayed and edited in the table.
+
+        Args:
+            knob (nuke.Knob): Knob to get the value from.
+
+        Returns:
+            object: Value of the knob.
+
+        """
+        if isinstance(knob, nuke.IArray_Knob):
+            # dim = knob.dimensions()
+            width = knob.width()
+            height = knob.height()
+            return [knob.value(i / width, i % width)
+                    for i in range(width * height)]
+
+        elif isinstance(knob, (nuke.Axis_Knob, nuke.Transform2d_Knob)):
+            matrix_list = []
+            matrix = knob.value()
+            # enumerating over the matrix results in a RuntimeError:
+            # index out of range. Iterating manually instead.
+            # pylint: disable=consider-using-enumerate
+            for idx in range(len(matrix)):
+                matrix_list.append(matrix[idx])
+            return matrix_list
+
+        elif isinstance(knob, nuke.Format_Knob):
+            format = knob.value()  # type: nuke.Format
+            return format.name()
+
+        return knob.value()
+
+    def is_volatile(self, knob):
+        """Return True for animated knobs and knobs with expressions.
+
+        Args:
+            knob (nuke.Knob): Knob to check.
+
+        Returns:
+            bool: True if the value must be read live.
+
+        """
+        try:
+            return bool(knob.isAnimated() or knob.hasExpression())
+        except AttributeError:
+            return False
+
+    def is_numeric(self, knob):
+        """Return True for knobs of floats, ie. Double_Knob or Color_Knob.
+
+        Args:
+            knob (nuke.Knob): Knob to check.
+
+        Returns:
+            bool: True if the knob is one of constants.NUMERIC_KNOBS.
+
+        """
+        return isinstance(knob, tuple(constants.NUMERIC_KNOBS))
+
+    def is_text(self, knob):
+        """Return True for string and enumeration knobs.
+
+        Args:
+            knob (nuke.Knob): Knob to check.
+
+        Returns:
+            bool: True if the knob is one of constants.TEXT_KNOBS.
+
+        """
+        return isinstance(knob, tuple(constants.TEXT_KNOBS))
+
+    def accepts_value(self, knob, value):
+        """Return False for values that are not an option of an enumeration.
+
+        Args:
+            knob (nuke.Knob): Knob to check.
+            value (object): New value.
+
+        Returns:
+            bool: True if the knob can be set to the value.
+
+        """
+        if isinstance(knob, nuke.Enumeration_Knob):
+            return value in knob.values()
+        return True
+
+    def set_value(self, knob, value):
+        """Set the value of a knob at the current frame.
+
+        Args:
+            knob (nuke.Knob): Knob to edit.
+            value (object): New value.
+
+        Returns:
+            bool: Result of setValue(), which is unreliable in Nuke.
+
+        """
+        if isinstance(value, (list, tuple)):
+            edited = False
+            frame = nuke.root()['frame'].value()
+            for i, val in enumerate(value):
+                if knob.valueAt(frame, i) == val:
+                    edited = True
+                else:
+                    edited = knob.setValueAt(val, frame, i)
+            return edited
+
+        if isinstance(value, string_types):
+            value = safe_string(value)
+        return knob.setValue(value)
+
+    def undo_group(self, name):
+        """Return a group to record many edits as one undo step.
+
+        Args:
+            name (str): Name of the step in Nuke's undo history.
+
+        Returns:
+            NukeUndoGroup: The group, not begun yet.
+
+        """
+        return NukeUndoGroup(name)
+
+    def position(self, node):
+        """Return the DAG position of a node.
+
+        Args:
+            node (nuke.Node): Node to get the position of.
+
+        Returns:
+            tuple: (ypos, xpos)
+
+        """
+        return node.ypos(), node.xpos()
+
+    def script_state(self):
+        """Return the path, modification time and modified state of the script.
+
+        Returns:
+            list: [path, modification time, modified] or None for scripts
+                that were never saved.
+
+        """
+        root = nuke.root()
+        path = root.name()
+        if not os.path.isfile(path):
+            # Untitled script.
+            return None
+        return [os.path.abspath(path), os.path.getmtime(path),
+                bool(root.modified())]
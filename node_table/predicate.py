@@ -0,0 +1,486 @@
+"""Filter rows by expressions over knob values.
+
+Expressions are compiled once and evaluated column by column over the
+values held by the table core, ie. its columnar buffers and cell cache.
+
+Syntax::
+
+    size > 50 and not disable
+    file contains v012
+    class == Blur or (mix < 1 and label startswith "todo")
+
+Comparison operators are ``== = != > >= < <=`` and the case insensitive
+string operators ``contains``, ``startswith``, ``endswith`` and ``matches``
+(regular expression search). A knob name without operator tests the knob's
+value for truth. ``class`` refers to the node class. Words on the right of
+an operator are text, use quotes for text with spaces. Numbers, ``true``
+and ``false`` are parsed as such, except for the string operators, which
+compare with the text as written, ie. ``file contains 012``.
+
+Nodes without a knob never match a comparison of that knob. Comparisons
+with list values, ie. of XY knobs, match if any component matches.
+
+Examples:
+    >>> predicate = compile_predicate('size > 50 and not disable')
+    >>> predicate.knob_names
+    frozenset(['size', 'disable'])
+    >>> predicate.evaluate(table, range(table.row_count))
+    [True, False, ...]
+
+"""
+
+# Import built-in modules
+import operator
+import re
+
+# Import local modules
+from node_table import columnar
+
+# Name of the pseudo knob holding the node class.
+CLASS_KNOB = 'class'
+
+# Value of cells without a knob.
+MISSING = object()
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?(?![^\s()=!<>]))|
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+        (?P<op>==|!=|>=|<=|=|>|<)|
+        (?P<paren>[()])|
+        (?P<word>[^\s()=!<>"']+)
+    )''', re.VERBOSE)
+
+_KEYWORDS = ('and', 'or', 'not')
+
+_STRING_OPERATORS = ('contains', 'startswith', 'endswith', 'matches')
+
+_COMPARISONS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+class PredicateError(ValueError):
+    """Raised for expressions that can't be parsed."""
+
+
+def tokenize(text):
+    """Split an expression into tokens.
+
+    Args:
+        text (str): Expression.
+
+    Returns:
+        :obj:`list` of :obj:`tuple`: (kind, value, position) per token.
+            Values of numbers are their text, converted by the parser.
+
+    Raises:
+        PredicateError: On unexpected characters.
+
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match:
+            raise PredicateError('Unexpected "{}" at {}'.format(
+                text[position:].strip()[:10], position))
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'word' and value.lower() in _KEYWORDS + _STRING_OPERATORS:
+            kind = 'keyword' if value.lower() in _KEYWORDS else 'op'
+            value = value.lower()
+        tokens.append((kind, value, start))
+        position = match.end()
+    return tokens
+
+
+class _Node(object):
+    """Compiled part of an expression."""
+
+    def evaluate(self, columns, count):
+        """Evaluate for many rows at once.
+
+        Args:
+            columns (dict): Values of every referenced knob, one per row.
+            count (int): Number of rows.
+
+        Returns:
+            list: One result per row.
+
+        """
+        raise NotImplementedError
+
+
+class _And(_Node):
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def evaluate(self, columns, count):
+        return [a and b for a, b in zip(self.left.evaluate(columns, count),
+                                        self.right.evaluate(columns, count))]
+
+
+class _Or(_And):
+
+    def evaluate(self, columns, count):
+        return [a or b for a, b in zip(self.left.evaluate(columns, count),
+                                       self.right.evaluate(columns, count))]
+
+
+class _Not(_Node):
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def evaluate(self, columns, count):
+        return [not result for result in self.operand.evaluate(columns, count)]
+
+
+class _Truth(_Node):
+    """A knob name without operator."""
+
+    def __init__(self, knob_name):
+        self.knob_name = knob_name
+
+    def evaluate(self, columns, count):
+        return [is_true(value) for value in columns.values_of(self.knob_name)]
+
+
+def is_true(value):
+    """Return the truth of a knob value.
+
+    Args:
+        value (object): Value of the knob or MISSING.
+
+    Returns:
+        bool: False for MISSING and for lists whose components are all
+            zero, ie. a size of [0.0, 0.0].
+
+    """
+    if value is MISSING:
+        return False
+    if isinstance(value, (list, tuple)):
+        return any(value)
+    return bool(value)
+
+
+class _Comparison(_Node):
+
+    def __init__(self, knob_name, op, literal):
+        self.knob_name = knob_name
+        self.op = op
+        self.literal = literal
+        if op in _COMPARISONS:
+            self.function = _COMPARISONS[op]
+        elif op == 'matches':
+            try:
+                pattern = re.compile(str(literal), re.IGNORECASE)
+            except re.error as error:
+                raise PredicateError('Invalid pattern "{}": {}'.format(
+                    literal, error))
+            self.function = lambda value, _: bool(pattern.search(value))
+        else:
+            self.function = getattr(str, {'contains': '__contains__'}.get(
+                op, op))
+        if op in _STRING_OPERATORS:
+            self.literal = str(literal).lower()
+
+    def match(self, value):
+        """Compare a single value.
+
+        Args:
+            value (object): Value of the knob or MISSING.
+
+        Returns:
+            bool: True if the value matches.
+
+        """
+        if value is MISSING or value is None:
+            return False
+        if isinstance(value, (list, tuple)):
+            return any(self.match(component) for component in value)
+
+        literal = self.literal
+        if self.op in _STRING_OPERATORS:
+            return self.function(str(value).lower(), literal)
+
+        if isinstance(literal, float) or isinstance(value, bool) or \
+                isinstance(literal, bool):
+            try:
+                value = float(value)
+                literal = float(literal)
+            except (TypeError, ValueError):
+                return False
+        else:
+            value = str(value)
+            if self.op in ('==', '=', '!='):
+                value = value.lower()
+                literal = literal.lower()
+        try:
+            return self.function(value, literal)
+        except TypeError:
+            return False
+
+    def evaluate(self, columns, count):
+        values = columns[self.knob_name]
+        if isinstance(values, columnar.NumericColumn):
+            return self._evaluate_numeric(values, columns.rows)
+        match = self.match
+        return [match(value) for value in values]
+
+    def _evaluate_numeric(self, column, rows):
+        """Compare a numeric column in one vectorized operation if possible.
+
+        Args:
+            column (columnar.NumericColumn): Values of all rows.
+            rows (list): Rows to evaluate.
+
+        Returns:
+            list: One result per row.
+
+        """
+        numpy = columnar.numpy
+        if numpy is None or not isinstance(self.literal, float) or \
+                self.op not in _COMPARISONS:
+            match = self.match
+            return [match(value) for value in column_values(column, rows)]
+
+        values, has_knob = column.to_numpy()
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        codes = numpy.frombuffer(column.mask, dtype=numpy.uint8)[rows]
+        selected = values[rows]
+        # Compare every component, ignoring unused ones.
+        components = numpy.arange(column.width)
+        lengths = numpy.where(codes == columnar.SCALAR, 1, codes)
+        used = components[numpy.newaxis, :] < lengths[:, numpy.newaxis]
+        result = self.function(selected, self.literal) & used
+        return (result.any(axis=1) & has_knob[rows]).tolist()
+
+
+class _Columns(dict):
+    """Values of the referenced knobs, with the rows they belong to."""
+
+    def __init__(self, rows):
+        super(_Columns, self).__init__()
+        self.rows = rows
+
+    def values_of(self, knob_name):
+        """list: Values of a knob in order of the rows."""
+        values = self[knob_name]
+        if isinstance(values, columnar.NumericColumn):
+            return column_values(values, self.rows)
+        return values
+
+
+def column_values(column, rows):
+    """Return the values of a numeric column for some rows.
+
+    Args:
+        column (columnar.NumericColumn): Values of all rows.
+        rows (list): Rows to read.
+
+    Returns:
+        list: Values in order of rows, MISSING for nodes without the knob.
+
+    """
+    get = column.get
+    return [get(row, MISSING) for row in rows]
+
+
+class Predicate(object):
+    """A compiled expression.
+
+    Attributes:
+        text (str): The expression.
+        knob_names (frozenset): Knobs the expression depends on.
+
+    """
+
+    def __init__(self, text, root, knob_names):
+        self.text = text
+        self._root = root
+        self.knob_names = frozenset(knob_names)
+
+    def evaluate(self, table, rows):
+        """Evaluate the expression for many rows at once.
+
+        Numeric knobs are read from the table's columnar buffers, all other
+        knobs through its cell cache.
+
+        Args:
+            table (core.TableCore): Table to read values from.
+            rows (list): Rows to evaluate.
+
+        Returns:
+            :obj:`list` of :obj:`bool`: One result per row.
+
+        """
+        rows = list(rows)
+        columns = _Columns(rows)
+        for knob_name in self.knob_names:
+            columns[knob_name] = get_column_values(table, knob_name, rows)
+        return [bool(result) for result
+                in self._root.evaluate(columns, len(rows))]
+
+    def evaluate_row(self, table, row):
+        """Evaluate the expression for a single row.
+
+        Args:
+            table (core.TableCore): Table to read values from.
+            row (int): Row to evaluate.
+
+        Returns:
+            bool: True if the row matches.
+
+        """
+        return self.evaluate(table, [row])[0]
+
+
+def get_column_values(table, knob_name, rows):
+    """Return the values of a knob for some rows.
+
+    Args:
+        table (core.TableCore): Table to read values from.
+        knob_name (str): Knob name or CLASS_KNOB.
+        rows (list): Rows to read.
+
+    Returns:
+        list|columnar.NumericColumn: Values in order of rows, MISSING for
+            nodes without the knob, or the numeric column of all rows.
+
+    """
+    knob_id = table.knob_table.ids.get(knob_name)
+    try:
+        table_column = table.column_ids.index(knob_id)
+    except ValueError:
+        if knob_name == CLASS_KNOB:
+            return [table.record(row).node_class for row in rows]
+        return [MISSING] * len(rows)
+
+    if len(rows) > 1:
+        column = table.numeric_column(knob_name)
+        if column is not None:
+            return column
+
+    values = []
+    for row in rows:
+        if table.knob(row, table_column) is None:
+            values.append(MISSING)
+            continue
+        try:
+            values.append(table.value(row, table_column))
+        except ValueError:
+            # Node was deleted.
+            values.append(MISSING)
+    return values
+
+
+class _Parser(object):
+    """Recursive descent parser building the compiled expression."""
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.position = 0
+        self.knob_names = set()
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None, None
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise PredicateError('Unexpected end of expression')
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise PredicateError('Empty expression')
+        root = self.parse_or()
+        kind, value, position = self.peek()
+        if kind is not None:
+            raise PredicateError('Unexpected "{}" at {}'.format(value,
+                                                                 position))
+        return root
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek()[:2] == ('keyword', 'or'):
+            self.next()
+            node = _Or(node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek()[:2] == ('keyword', 'and'):
+            self.next()
+            node = _And(node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.peek()[:2] == ('keyword', 'not'):
+            self.next()
+            return _Not(self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        kind, value, position = self.next()
+        if (kind, value) == ('paren', '('):
+            node = self.parse_or()
+            kind, value, position = self.next()
+            if (kind, value) != ('paren', ')'):
+                raise PredicateError('Expected ")" at {}'.format(position))
+            return node
+
+        if kind != 'word':
+            raise PredicateError('Expected knob name at {}'.format(position))
+        knob_name = value
+        self.knob_names.add(knob_name)
+
+        if self.peek()[0] != 'op':
+            return _Truth(knob_name)
+
+        op = self.next()[1]
+        kind, literal, position = self.next()
+        if kind not in ('word', 'number', 'string'):
+            raise PredicateError('Expected value at {}'.format(position))
+        # String operators compare with the text as written, ie. "012".
+        if op not in _STRING_OPERATORS:
+            if kind == 'number':
+                literal = float(literal)
+            elif kind == 'word' and literal.lower() in ('true', 'false'):
+                literal = literal.lower() == 'true'
+        return _Comparison(knob_name, op, literal)
+
+
+def compile_predicate(text):
+    """Compile an expression.
+
+    Args:
+        text (str): Expression, see module documentation.
+
+    Returns:
+        Predicate: The compiled expression.
+
+    Raises:
+        PredicateError: If the expression is invalid.
+
+    """
+    parser = _Parser(text)
+    root = parser.parse()
+    return Predicate(text, root, parser.knob_names)
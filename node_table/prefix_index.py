@@ -0,0 +1,135 @@
+"""Case insensitive prefix index used for completing names.
+
+The index keeps all words in a sorted list and finds completions with
+bisection, so looking up a prefix costs O(log n) no matter how many node or
+knob names were loaded. Words are counted, which allows adding and removing
+words incrementally as rows or columns are added to or removed from a model.
+"""
+
+# Import built-in modules
+import bisect
+
+
+class PrefixIndex(object):
+    """Counted set of words supporting case insensitive prefix lookups.
+
+    Examples:
+        >>> index = PrefixIndex(['Blur1', 'Blur2', 'Grade1'])
+        >>> index.complete('bl')
+        ['Blur1', 'Blur2']
+        >>> index.discard('Blur1')
+        >>> index.complete('bl')
+        ['Blur2']
+
+    """
+
+    def __init__(self, words=None):
+        """Create the index.
+
+        Args:
+            words (:obj:`list` of :obj:`str`, optional): Words to add.
+
+        """
+        self._keys = []  # Sorted lower case words.
+        self._words = {}  # Lower case word -> word as added first.
+        self._counts = {}  # Lower case word -> number of times added.
+
+        if words:
+            self.update(words)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, word):
+        return word.lower() in self._counts
+
+    def __iter__(self):
+        return (self._words[key] for key in self._keys)
+
+    def add(self, word):
+        """Add a word or increase its count if it was already added.
+
+        Args:
+            word (str): Word to add.
+
+        """
+        key = word.lower()
+        count = self._counts.get(key)
+        if count:
+            self._counts[key] = count + 1
+            return
+
+        self._counts[key] = 1
+        self._words[key] = word
+        bisect.insort(self._keys, key)
+
+    def discard(self, word):
+        """Decrease the count of a word and remove it when it drops to zero.
+
+        Args:
+            word (str): Word to remove. Unknown words are ignored.
+
+        """
+        key = word.lower()
+        count = self._counts.get(key)
+        if not count:
+            return
+
+        if count > 1:
+            self._counts[key] = count - 1
+            return
+
+        del self._counts[key]
+        del self._words[key]
+        del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def update(self, words):
+        """Add many words at once.
+
+        Sorting once is faster than inserting each word if the index is empty.
+
+        Args:
+            words (iterable): Words to add.
+
+        """
+        if self._keys:
+            for word in words:
+                self.add(word)
+            return
+
+        for word in words:
+            key = word.lower()
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._words.setdefault(key, word)
+        self._keys = sorted(self._counts)
+
+    def clear(self):
+        """Remove all words."""
+        self._keys = []
+        self._words = {}
+        self._counts = {}
+
+    def complete(self, prefix, limit=None):
+        """Return words starting with prefix, sorted case insensitive.
+
+        Args:
+            prefix (str): Beginning of the words to find.
+            limit (int, optional): Return at most this many words.
+
+        Returns:
+            :obj:`list` of :obj:`str`: Matching words.
+
+        """
+        prefix = prefix.lower()
+        keys = self._keys
+        start = bisect.bisect_left(keys, prefix)
+
+        matches = []
+        for i in range(start, len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            matches.append(self._words[key])
+            if limit and len(matches) >= limit:
+                break
+        return matches
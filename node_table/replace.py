@@ -0,0 +1,120 @@
+"""Find and replace text in string knob values.
+
+A Replacer substitutes plain text or a regular expression. preview()
+lists the changes it would make to cells of a table, which can then be
+applied in chunks with NodeTableModel.set_values().
+
+Examples:
+    >>> replacer = Replacer('v012', 'v013')
+    >>> changes = list(preview(table, cells, replacer))
+    >>> changes[0]
+    Change(node=<Read1>, knob_name='file', old='a_v012.exr', new='a_v013.exr')
+
+"""
+
+# Import built-in modules
+import re
+
+try:
+    # Python 2
+    string_types = basestring
+except NameError:
+    # Python 3
+    string_types = str
+
+# Import local modules
+from node_table import core
+
+
+class ReplaceError(ValueError):
+    """Raised for invalid regular expressions or replacement templates."""
+
+
+class Replacer(object):
+    """Replace every occurrence of a text or pattern."""
+
+    def __init__(self, find, replace, regex=False, case_sensitive=False):
+        """Compile the search.
+
+        Args:
+            find (str): Text or regular expression to find.
+            replace (str): Replacement. For regular expressions, group
+                references like ``\\1`` are expanded.
+            regex (bool, optional): Treat find as regular expression.
+            case_sensitive (bool, optional): Match case.
+
+        Raises:
+            ReplaceError: If find is empty or not a valid expression.
+
+        """
+        if not find:
+            raise ReplaceError('Nothing to find')
+        flags = 0 if case_sensitive else re.IGNORECASE
+        if not regex:
+            find = re.escape(find)
+            # Don't expand backslashes of plain text.
+            replace = replace.replace('\\', '\\\\')
+        try:
+            self.pattern = re.compile(find, flags)
+            # Validate group references of the template.
+            self.pattern.sub(replace, '')
+        except (re.error, IndexError) as error:
+            raise ReplaceError(str(error))
+        self.replacement = replace
+
+    def replace(self, text):
+        """Replace all occurrences in a text.
+
+        Args:
+            text (str): Text to search.
+
+        Returns:
+            str: The text with replacements.
+
+        Raises:
+            ReplaceError: If the template references a group that did not
+                participate in the match.
+
+        """
+        try:
+            return self.pattern.sub(self.replacement, text)
+        except (re.error, IndexError) as error:
+            raise ReplaceError(str(error))
+
+
+def preview(table, cells, replacer):
+    """Yield the changes a replacement makes to string cells.
+
+    Values are read through the table's cell cache. Cells without a string
+    knob or without a match are skipped, as are replacements the knob does
+    not accept, ie. values that are not an option of an enumeration.
+
+    Args:
+        table (core.TableCore): Table to read values from.
+        cells (iterable): Cells as (node, knob name).
+        replacer (Replacer): Replacement to apply.
+
+    Yields:
+        core.Change: Node, knob name, old and new value of every changed cell.
+
+    """
+    records = table.records
+    is_text = table.adapter.is_text
+    accepts_value = table.adapter.accepts_value
+    for node, knob_name in cells:
+        record = records.get(node)
+        if record is None:
+            continue
+        knob = record.knobs.get(knob_name)
+        if knob is None or not is_text(knob):
+            continue
+        try:
+            old = table.node_value(node, knob_name)
+        except ValueError:
+            # Node was deleted.
+            continue
+        if not isinstance(old, string_types):
+            continue
+        new = replacer.replace(old)
+        if new != old and accepts_value(knob, new):
+            yield core.Change(node, knob_name, old, new)
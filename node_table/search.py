@@ -0,0 +1,270 @@
+"""Full text search over the string knob values of a table.
+
+The SearchIndex maps lower case tokens of string values to the cells
+containing them. Tokens are sorted so a query term matches every token it
+is a prefix of, which allows searching while typing. Cells are kept as
+(node, knob name) and only mapped to rows and columns by find(), so the
+index survives sorting and filtering.
+
+The index is built in slices of a given duration to keep the UI responsive
+and kept current through the table core's knob listeners.
+
+Examples:
+    >>> index = SearchIndex(table)
+    >>> while not index.build(seconds=0.02):
+    ...     pass
+    >>> index.find('v012')
+    [(3, 7), (12, 7)]
+
+"""
+
+# Import built-in modules
+import bisect
+import collections
+import re
+import time
+
+# Import local modules
+from node_table import constants
+
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split text into lower case tokens of letters and digits.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        :obj:`list` of :obj:`str`: Tokens in order of appearance.
+
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex(object):
+    """Inverted index from tokens to cells of a core.TableCore."""
+
+    def __init__(self, table):
+        """Create an empty index and queue all rows of the table.
+
+        Args:
+            table (core.TableCore): Table to index.
+
+        """
+        self.table = table
+        # Cells by token.
+        self._postings = {}  # type: dict
+        # Sorted tokens for prefix lookups.
+        self._tokens = []  # type: list
+        # Tokens by cell, to remove a cell's tokens when its value changes.
+        self._cell_tokens = {}  # type: dict
+        # Indexed knob names by node.
+        self._indexed = {}  # type: dict
+        self._pending = collections.deque()
+
+        table.knob_listeners.append(self.knob_changed)
+        self.sync()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    @property
+    def complete(self):
+        """bool: True if all queued nodes are indexed."""
+        return not self._pending
+
+    @property
+    def progress(self):
+        """float: Fraction of the table's nodes indexed so far."""
+        total = len(self._indexed) + len(self._pending)
+        if not total:
+            return 1.0
+        return float(len(self._indexed)) / total
+
+    def close(self):
+        """Stop listening to knob changes of the table."""
+        if self.knob_changed in self.table.knob_listeners:
+            self.table.knob_listeners.remove(self.knob_changed)
+
+    def sync(self):
+        """Queue added nodes and remove nodes no longer in the table."""
+        nodes = self.table.records
+        for node in [node for node in self._indexed if node not in nodes]:
+            self.remove_node(node)
+        queued = set(self._pending)
+        self._pending.extend(node for node in self.table.nodes
+                             if node not in self._indexed
+                             and node not in queued)
+
+    def build(self, seconds=constants.SEARCH_INDEX_SLICE):
+        """Index queued nodes for a limited time.
+
+        Args:
+            seconds (float): Stop after this duration. At least one node is
+                indexed per call.
+
+        Returns:
+            bool: True if the index is complete.
+
+        """
+        end = time.time() + seconds
+        pending = self._pending
+        while pending:
+            node = pending.popleft()
+            if node in self.table.records:
+                self.index_node(node)
+            if time.time() >= end:
+                break
+        return not pending
+
+    def index_node(self, node):
+        """Index the string knobs of a node.
+
+        Args:
+            node (object): Node in the table.
+
+        """
+        record = self.table.records[node]
+        is_text = self.table.adapter.is_text
+        knob_names = self._indexed.setdefault(node, set())
+        for knob_name, knob in record.knobs.items():
+            if is_text(knob):
+                knob_names.add(knob_name)
+                self.index_cell(node, knob_name)
+
+    def remove_node(self, node):
+        """Remove all cells of a node.
+
+        Args:
+            node (object): Node to remove.
+
+        """
+        for knob_name in self._indexed.pop(node, ()):
+            self.remove_cell((node, knob_name))
+
+    def index_cell(self, node, knob_name):
+        """Index the value of a cell, replacing previously indexed tokens.
+
+        Args:
+            node (object): Node of the cell.
+            knob_name (str): Knob of the cell.
+
+        """
+        cell = (node, knob_name)
+        self.remove_cell(cell)
+        try:
+            value = self.table.node_value(node, knob_name)
+        except ValueError:
+            # Node was deleted.
+            return
+        if value is None:
+            return
+
+        tokens = frozenset(tokenize(str(value)))
+        if not tokens:
+            return
+        self._cell_tokens[cell] = tokens
+        postings = self._postings
+        for token in tokens:
+            cells = postings.get(token)
+            if cells is None:
+                cells = postings[token] = set()
+                bisect.insort(self._tokens, token)
+            cells.add(cell)
+
+    def remove_cell(self, cell):
+        """Remove the tokens of a cell.
+
+        Args:
+            cell (tuple): (node, knob name)
+
+        """
+        postings = self._postings
+        for token in self._cell_tokens.pop(cell, ()):
+            cells = postings[token]
+            cells.discard(cell)
+            if not cells:
+                del postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def knob_changed(self, node, knob_name, row=None):
+        """Index the new value of a changed string knob.
+
+        Args:
+            node (object): Node of the knob.
+            knob_name (str): Name of the changed knob.
+            row (int, optional): Row of the node, unused.
+
+        """
+        knob_names = self._indexed.get(node)
+        if knob_names is not None and knob_name in knob_names:
+            self.index_cell(node, knob_name)
+
+    def lookup_term(self, term):
+        """Return the cells with a token starting with the term.
+
+        Args:
+            term (str): Lower case token or beginning of one.
+
+        Returns:
+            set: Cells as (node, knob name).
+
+        """
+        tokens = self._tokens
+        start = bisect.bisect_left(tokens, term)
+        end = bisect.bisect_left(tokens, term + u'\uffff', start)
+        if end - start == 1:
+            return self._postings[tokens[start]]
+        cells = set()
+        for token in tokens[start:end]:
+            cells.update(self._postings[token])
+        return cells
+
+    def lookup(self, query):
+        """Return the cells matching every term of a query.
+
+        Args:
+            query (str): Text to search.
+
+        Returns:
+            set: Cells as (node, knob name).
+
+        """
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not terms:
+            return set()
+        # Start with the longest term which likely matches the fewest cells.
+        cells = set(self.lookup_term(terms[0]))
+        for term in terms[1:]:
+            if not cells:
+                break
+            cells.intersection_update(self.lookup_term(term))
+        return cells
+
+    def find(self, query):
+        """Return the table cells matching a query.
+
+        Args:
+            query (str): Text to search.
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: (row, column) of every matching
+                cell in a column of the table, ordered by row and column.
+
+        """
+        cells = self.lookup(query)
+        if not cells:
+            return []
+        table = self.table
+        rows = dict(zip(table.nodes, range(table.row_count)))
+        columns = dict(zip(table.columns, range(table.column_count)))
+        matches = []
+        for node, knob_name in cells:
+            row = rows.get(node)
+            column = columns.get(knob_name)
+            if row is not None and column is not None:
+                matches.append((row, column))
+        matches.sort()
+        return matches
@@ -0,0 +1,603 @@
+"""Snapshots of the cells of a table, to show a table before reading it.
+
+A TableSnapshot holds the rows, columns, cell values and column widths of
+a table. Cells are keyed by full node name and knob name, so a snapshot can
+be saved to a file and applied to the nodes of a later load.
+
+The warm start cache keeps the snapshot of the last load of every script
+and selection, keyed by the adapter's script state and the names of the
+loaded nodes. When the same nodes are loaded again, the cached values are
+shown at once while a Revalidator reads the knobs again in time slices and
+reports only the cells that differ.
+
+A SnapshotDiff lists the cells that changed, were added or were removed
+between two snapshots, ie. of a lighting template and a shot comp, or of
+the same nodes before and after a session.
+
+Examples:
+    >>> key = table_key(table)
+    >>> cached = load_cached(key)
+    >>> if cached is not None:
+    ...     revalidator = Revalidator(table, cached)
+    ...     while not revalidator.complete:
+    ...         changed = revalidator.run(seconds=0.02)
+    >>> save_cached(key, TableSnapshot.capture(table, read=False))
+    >>> SnapshotDiff(TableSnapshot.load('template.json'),
+    ...              TableSnapshot.capture(table)).write('changes.csv')
+
+"""
+
+# Import built-in modules
+import collections
+import csv
+import hashlib
+import json
+import os
+import time
+
+# Import local modules
+from node_table import constants
+from node_table import core
+from node_table import export
+
+# Version of the snapshot file format.
+SNAPSHOT_VERSION = 1
+
+# Extension of cached snapshot files.
+CACHE_EXTENSION = '.json'
+
+# Value of cells that are not in a snapshot.
+_MISSING = object()
+
+
+class TableSnapshot(object):
+    """Values of a table's cells by node name and knob name.
+
+    Attributes:
+        rows (list): (node name, node class) of every row.
+        columns (list): Knob names of the columns.
+        cells (dict): Values by (node name, knob name), converted by
+            export.to_json_value().
+        widths (dict): Column widths in pixels by knob name.
+
+    """
+
+    def __init__(self, rows=None, columns=None, cells=None, widths=None):
+        self.rows = rows or []  # type: list
+        self.columns = columns or []  # type: list
+        self.cells = cells or {}  # type: dict
+        self.widths = widths or {}  # type: dict
+
+    def __len__(self):
+        return len(self.cells)
+
+    @classmethod
+    def capture(cls, table, rows=None, knob_names=None, widths=None,
+                read=True):
+        """Take a snapshot of a table.
+
+        Args:
+            table (core.TableCore): Table to take the snapshot of.
+            rows (iterable, optional): Rows to include, defaults to all rows.
+            knob_names (list, optional): Knobs to include, defaults to all
+                columns.
+            widths (dict, optional): Column widths by knob name.
+            read (bool, optional): Read cells that are not cached. If
+                False, only cells read before are included, which needs no
+                call to the nodes.
+
+        Returns:
+            TableSnapshot: The snapshot.
+
+        """
+        if rows is None:
+            rows = range(table.row_count)
+        columns = list(table.columns if knob_names is None else knob_names)
+        wanted = set(columns)
+        cache = table.cache
+
+        snapshot_rows = []
+        cells = {}
+        for row in rows:
+            record = table.record(row)
+            name = export.get_node_name(table, row)
+            snapshot_rows.append((name, record.node_class))
+            for knob_name in record.knobs:
+                if knob_name not in wanted:
+                    continue
+                if read:
+                    try:
+                        value = table.peek_value(record.node, knob_name)
+                    except ValueError:
+                        # Node was deleted.
+                        break
+                else:
+                    value = cache.last(record.node, knob_name, _MISSING)
+                    if value is _MISSING or value is core.VOLATILE:
+                        continue
+                cells[(name, knob_name)] = export.to_json_value(value)
+        return cls(snapshot_rows, columns, cells, widths)
+
+    def to_dict(self):
+        """Return the snapshot as JSON serializable dict.
+
+        Returns:
+            dict: Rows as [node name, node class, values by knob name].
+
+        """
+        values = collections.defaultdict(dict)
+        for (name, knob_name), value in self.cells.items():
+            values[name][knob_name] = value
+        return {
+            'version': SNAPSHOT_VERSION,
+            'columns': self.columns,
+            'rows': [[name, node_class, values.get(name, {})]
+                     for name, node_class in self.rows],
+            'widths': self.widths,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a snapshot from a dict returned by to_dict().
+
+        Args:
+            data (dict): The snapshot's data.
+
+        Returns:
+            TableSnapshot: The snapshot.
+
+        Raises:
+            ValueError: If the data is of another version.
+
+        """
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise ValueError('Unsupported snapshot version: {}'.format(
+                data.get('version')))
+        rows = []
+        cells = {}
+        for name, node_class, values in data['rows']:
+            rows.append((name, node_class))
+            for knob_name, value in values.items():
+                cells[(name, knob_name)] = value
+        return cls(rows, data['columns'], cells, data.get('widths'))
+
+    def save(self, path):
+        """Write the snapshot to a JSON file, replacing it atomically.
+
+        Args:
+            path (str): File to write.
+
+        """
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'w') as stream:
+            json.dump(self.to_dict(), stream)
+        try:
+            os.replace(temp_path, path)
+        except AttributeError:
+            # Python 2, os.rename does not replace files on Windows.
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot from a JSON file.
+
+        Args:
+            path (str): File written by save().
+
+        Returns:
+            TableSnapshot: The snapshot.
+
+        Raises:
+            IOError: If the file can not be read.
+            ValueError: If the file is no snapshot.
+
+        """
+        with open(path) as stream:
+            return cls.from_dict(json.load(stream))
+
+
+# Status of a cell in a SnapshotDiff.
+CHANGED = 'changed'
+ADDED = 'added'
+REMOVED = 'removed'
+
+# A cell that differs between two snapshots. Old is None for added cells,
+# new is None for removed cells.
+Difference = collections.namedtuple('Difference',
+                                    'name knob_name status old new')
+
+# Columns of an exported diff.
+DIFF_COLUMNS = (export.NODE_COLUMN, 'knob', 'status', 'old', 'new')
+
+
+class SnapshotDiff(object):
+    """Cells that were changed, added or removed between two snapshots.
+
+    Cells are matched by their (node name, knob name) key in one pass over
+    both snapshots, so a diff takes linear time.
+
+    Examples:
+        >>> before = TableSnapshot.capture(table)
+        >>> # ... edit knobs ...
+        >>> diff = SnapshotDiff(before, TableSnapshot.capture(table))
+        >>> diff.status('Blur1', 'size')
+        'changed'
+        >>> diff.write('/tmp/changes.csv')
+
+    Attributes:
+        cells (dict): Difference by (node name, knob name).
+        added_rows (list): Names of nodes only in the new snapshot.
+        removed_rows (list): Names of nodes only in the old snapshot.
+
+    """
+
+    def __init__(self, old, new):
+        """Compare two snapshots.
+
+        Args:
+            old (TableSnapshot): Snapshot before.
+            new (TableSnapshot): Snapshot after.
+
+        """
+        self.cells = {}  # type: dict
+        old_cells = old.cells
+        new_cells = new.cells
+        for key, value in new_cells.items():
+            old_value = old_cells.get(key, _MISSING)
+            if old_value is _MISSING:
+                self.cells[key] = Difference(key[0], key[1], ADDED, None,
+                                             value)
+            elif old_value != value:
+                self.cells[key] = Difference(key[0], key[1], CHANGED,
+                                             old_value, value)
+        for key, value in old_cells.items():
+            if key not in new_cells:
+                self.cells[key] = Difference(key[0], key[1], REMOVED, value,
+                                             None)
+
+        old_names = set(name for name, _ in old.rows)
+        new_names = set(name for name, _ in new.rows)
+        self.added_rows = [name for name, _ in new.rows
+                           if name not in old_names]
+        self.removed_rows = [name for name, _ in old.rows
+                             if name not in new_names]
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        """Yield the differences sorted by node name and knob name."""
+        for key in sorted(self.cells):
+            yield self.cells[key]
+
+    def status(self, name, knob_name):
+        """Return how a cell differs.
+
+        Args:
+            name (str): Full name of the node.
+            knob_name (str): Name of the knob.
+
+        Returns:
+            str: CHANGED, ADDED, REMOVED or None if the cell is unchanged.
+
+        """
+        difference = self.cells.get((name, knob_name))
+        return difference.status if difference else None
+
+    def count(self, status):
+        """Return the number of cells of a status.
+
+        Args:
+            status (str): CHANGED, ADDED or REMOVED.
+
+        Returns:
+            int: Number of cells.
+
+        """
+        return sum(1 for difference in self.cells.values()
+                   if difference.status == status)
+
+    def summary(self):
+        """Return a short description of the diff.
+
+        Returns:
+            str: ie. '3 changed, 1 added, 0 removed cells, 1 added node'.
+
+        """
+        summary = '{} changed, {} added, {} removed cells'.format(
+            self.count(CHANGED), self.count(ADDED), self.count(REMOVED))
+        if self.added_rows:
+            summary += ', {} added nodes'.format(len(self.added_rows))
+        if self.removed_rows:
+            summary += ', {} removed nodes'.format(len(self.removed_rows))
+        return summary
+
+    def iter_rows(self):
+        """Yield every difference as dict of DIFF_COLUMNS.
+
+        Yields:
+            dict: Values by column name.
+
+        """
+        for difference in self:
+            yield dict(zip(DIFF_COLUMNS, (
+                difference.name, difference.knob_name, difference.status,
+                difference.old, difference.new)))
+
+    def write(self, path, file_format=None):
+        """Write the differences to a file, see export.FORMATS.
+
+        Args:
+            path (str): File to write.
+            file_format (str, optional): One of export.FORMATS. Defaults to
+                the format of the path's extension.
+
+        """
+        file_format = file_format or export.get_format(path)
+        # pylint: disable=protected-access
+        with export._open(path) as stream:
+            if file_format == 'csv':
+                writer = csv.writer(stream)
+                writer.writerow(DIFF_COLUMNS)
+                for item in self.iter_rows():
+                    writer.writerow([export.to_text(item[name])
+                                     for name in DIFF_COLUMNS])
+            elif file_format == 'jsonl':
+                for item in self.iter_rows():
+                    stream.write(json.dumps(item))
+                    stream.write('\n')
+            else:
+                items = list(self.iter_rows())
+                stream.write('{')
+                for i, name in enumerate(DIFF_COLUMNS):
+                    if i:
+                        stream.write(',\n')
+                    stream.write('{}: {}'.format(
+                        json.dumps(name),
+                        json.dumps([item[name] for item in items])))
+                stream.write('}\n')
+
+
+def load(path_or_snapshot):
+    """Return a snapshot, reading it from a file if necessary.
+
+    Args:
+        path_or_snapshot (str or TableSnapshot): File written by
+            TableSnapshot.save() or a snapshot.
+
+    Returns:
+        TableSnapshot: The snapshot.
+
+    """
+    if isinstance(path_or_snapshot, TableSnapshot):
+        return path_or_snapshot
+    return TableSnapshot.load(path_or_snapshot)
+
+
+def node_names(table):
+    """Return the full names of all nodes of a table.
+
+    Args:
+        table (core.TableCore): The table.
+
+    Returns:
+        :obj:`list` of :obj:`str`: Full names in order of the rows.
+
+    """
+    return [export.get_node_name(table, row) for row in range(table.row_count)]
+
+
+def cache_key(state, names):
+    """Return the key of a script state and selection in the cache.
+
+    Args:
+        state (list): State of the script, see NodeAdapter.script_state().
+        names (list): Full names of the loaded nodes, in any order.
+
+    Returns:
+        str: Hash of the state and the names.
+
+    """
+    data = json.dumps([state, sorted(names)])
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def table_key(table, names=None):
+    """Return the cache key of the current rows of a table.
+
+    Args:
+        table (core.TableCore): The table.
+        names (list, optional): Full names of the rows, if known.
+
+    Returns:
+        str: The key or None if the table can not be cached.
+
+    """
+    if not table.row_count:
+        return None
+    try:
+        state = table.adapter.script_state()
+    except (IOError, OSError):
+        return None
+    if state is None:
+        return None
+    return cache_key(state, node_names(table) if names is None else names)
+
+
+def get_cache_dir():
+    """Return the directory of cached snapshots.
+
+    Returns:
+        str: $NODE_TABLE_CACHE_DIR or constants.SNAPSHOT_CACHE_DIR.
+
+    """
+    return os.path.expanduser(os.environ.get('NODE_TABLE_CACHE_DIR') or
+                              constants.SNAPSHOT_CACHE_DIR)
+
+
+def cache_path(key, cache_dir=None):
+    """Return the file of a cached snapshot.
+
+    Args:
+        key (str): Key returned by cache_key().
+        cache_dir (str, optional): Cache directory, see get_cache_dir().
+
+    Returns:
+        str: Path of the file.
+
+    """
+    return os.path.join(cache_dir or get_cache_dir(), key + CACHE_EXTENSION)
+
+
+def load_cached(key, cache_dir=None):
+    """Return a cached snapshot.
+
+    Args:
+        key (str): Key returned by cache_key().
+        cache_dir (str, optional): Cache directory, see get_cache_dir().
+
+    Returns:
+        TableSnapshot: The snapshot or None if not cached or unreadable.
+
+    """
+    path = cache_path(key, cache_dir)
+    try:
+        table_snapshot = TableSnapshot.load(path)
+        # Keep recently used snapshots when pruning.
+        os.utime(path, None)
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
+    return table_snapshot
+
+
+def save_cached(key, table_snapshot, cache_dir=None,
+                max_files=constants.SNAPSHOT_CACHE_MAX_FILES):
+    """Cache a snapshot and delete the least recently used ones.
+
+    Args:
+        key (str): Key returned by cache_key().
+        table_snapshot (TableSnapshot): Snapshot to cache.
+        cache_dir (str, optional): Cache directory, see get_cache_dir().
+        max_files (int, optional): Number of snapshots to keep.
+
+    Raises:
+        IOError: If the snapshot can not be written.
+
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    table_snapshot.save(cache_path(key, cache_dir))
+
+    paths = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+             if name.endswith(CACHE_EXTENSION)]
+    if len(paths) <= max_files:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            # Deleted by another session.
+            pass
+
+
+class Revalidator(object):
+    """Shows the cells of a snapshot in a table until they are read again.
+
+    The snapshot's values are put into the table's cell cache, where they
+    stay until run() read the knob again.
+
+    """
+
+    def __init__(self, table, table_snapshot, names=None):
+        """Seed the table's cache with the values of a snapshot.
+
+        Args:
+            table (core.TableCore): Table with the nodes of the snapshot.
+            table_snapshot (TableSnapshot): Values to show.
+            names (list, optional): Full names of the table's rows, if known.
+
+        """
+        self.table = table
+        if names is None:
+            names = node_names(table)
+        # (node, knob name, value of the snapshot) of cells to read again.
+        self._pending = collections.deque()
+
+        cells = table_snapshot.cells
+        seed = table.cache.seed
+        for node, name in zip(table.nodes, names):
+            for knob_name in table.records[node].knobs:
+                value = cells.get((name, knob_name), _MISSING)
+                if value is _MISSING:
+                    continue
+                seed(node, knob_name, value)
+                self._pending.append((node, knob_name, value))
+        self.total = len(self._pending)
+
+    @property
+    def complete(self):
+        """bool: True if all cells were read again."""
+        return not self._pending
+
+    @property
+    def progress(self):
+        """float: Fraction of cells read again so far."""
+        if not self.total:
+            return 1.0
+        return 1.0 - float(len(self._pending)) / self.total
+
+    def run(self, seconds=constants.SNAPSHOT_REVALIDATE_SLICE):
+        """Read cells again for a limited time.
+
+        Cells that differ from the snapshot are reported to the table as
+        changed knobs, so everything derived from them is updated.
+
+        Args:
+            seconds (float): Stop after this duration. At least one cell is
+                read per call.
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: (node, knob name) of every cell
+                whose value differs from the snapshot.
+
+        """
+        end = time.time() + seconds
+        table = self.table
+        cache = table.cache
+        adapter = table.adapter
+        pending = self._pending
+        changed = []
+        while pending:
+            node, knob_name, cached = pending.popleft()
+            record = table.records.get(node)
+            knob = record and record.knobs.get(knob_name)
+            if knob is None:
+                # Row was removed.
+                cache.invalidate(node, knob_name)
+            else:
+                try:
+                    value = adapter.get_value(knob)
+                    volatile = adapter.is_volatile(knob)
+                except ValueError:
+                    # Node was deleted.
+                    cache.invalidate(node, knob_name)
+                else:
+                    if export.to_json_value(value) != cached:
+                        table.knob_changed(node, knob_name)
+                        changed.append((node, knob_name))
+                    cache.put(node, knob_name,
+                              core.VOLATILE if volatile else value)
+            if time.time() >= end:
+                break
+        return changed
+
+    def cancel(self):
+        """Stop and forget the snapshot's values of cells not read again."""
+        invalidate = self.table.cache.invalidate
+        for node, knob_name, _ in self._pending:
+            invalidate(node, knob_name)
+        self._pending.clear()
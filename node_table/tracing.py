@@ -0,0 +1,197 @@
+"""Record spans of table activity and export them as Trace Event JSON.
+
+Spans are kept in a bounded ring buffer so tracing can stay enabled in
+production: when the buffer is full, the oldest spans are dropped. Exported
+files can be opened in chrome://tracing or https://ui.perfetto.dev.
+
+Tracing is enabled by setting the environment variable ``NODE_TABLE_TRACE``
+or by calling :func:`enable`.
+
+Examples:
+    >>> from node_table import tracing
+    >>> tracing.enable()
+    >>> with tracing.span('load', 'model', nodes=10):
+    ...     pass
+    >>> tracing.export('/tmp/node_table_trace.json')
+
+"""
+
+# Import built-in modules
+import collections
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Import local modules
+from node_table.constants import TRACE_BUFFER_SIZE
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class _State(object):
+    """Module state. Use the module functions to change it."""
+
+    enabled = bool(os.environ.get('NODE_TABLE_TRACE'))
+    # (name, category, start, duration, thread id, args)
+    events = collections.deque(maxlen=TRACE_BUFFER_SIZE)
+    # Trace timestamps are relative to this point in time.
+    origin = timer()
+
+
+class _Span(object):
+    """Context manager recording one complete event."""
+
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = timer()
+        return self
+
+    def __exit__(self, *args):
+        end = timer()
+        _State.events.append((self.name, self.category, self.start,
+                              end - self.start, threading.current_thread().ident,
+                              self.args))
+
+
+class _NoSpan(object):
+    """Shared context manager doing nothing while disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, category='table', **args):
+    """Return a context manager recording a span.
+
+    Args:
+        name (str): Name of the span.
+        category (str, optional): Category, ie. 'model', 'proxy' or 'view'.
+        **args: Additional values shown with the span.
+
+    Returns:
+        object: Context manager.
+
+    """
+    if not _State.enabled:
+        return _NO_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name, category='table'):
+    """Decorate a function to record each call as a span.
+
+    Args:
+        name (str): Name of the span.
+        category (str, optional): Category of the span.
+
+    Returns:
+        callable: Decorator.
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            with _Span(name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_enabled():
+    """bool: True if spans are recorded."""
+    return _State.enabled
+
+
+def enable(capacity=None):
+    """Start recording spans.
+
+    Args:
+        capacity (int, optional): Maximum number of spans to keep. Changing
+            the capacity drops all recorded spans.
+
+    """
+    if capacity and capacity != _State.events.maxlen:
+        _State.events = collections.deque(maxlen=capacity)
+    _State.enabled = True
+
+
+def disable():
+    """Stop recording spans. Recorded spans are kept until cleared."""
+    _State.enabled = False
+
+
+def clear():
+    """Drop all recorded spans."""
+    _State.events.clear()
+
+
+def get_events():
+    """Return the recorded spans as Trace Event dicts.
+
+    Returns:
+        :obj:`list` of :obj:`dict`: Complete ('X') events with timestamps
+            and durations in microseconds.
+
+    """
+    pid = os.getpid()
+    origin = _State.origin
+    events = [{
+        'name': 'process_name',
+        'ph': 'M',
+        'pid': pid,
+        'args': {'name': 'node_table'},
+    }]
+    for name, category, start, duration, tid, args in list(_State.events):
+        events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - origin) * 1e6,
+            'dur': duration * 1e6,
+            'pid': pid,
+            'tid': tid,
+            'args': args,
+        })
+    return events
+
+
+def export(path=None):
+    """Write the recorded spans to a Trace Event JSON file.
+
+    Args:
+        path (str, optional): File to write. Defaults to a new file in the
+            temp directory.
+
+    Returns:
+        str: Path of the written file.
+
+    """
+    if not path:
+        path = os.path.join(tempfile.gettempdir(),
+                            'node_table_trace_{}_{}.json'.format(
+                                os.getpid(), time.strftime('%Y%m%d_%H%M%S')))
+
+    with open(path, 'w') as trace_file:
+        json.dump({'traceEvents': get_events(), 'displayTimeUnit': 'ms'},
+                  trace_file)
+    return path
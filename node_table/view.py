@@ -1,5 +1,10 @@
 """Build the widget and stack the models."""
 
+# Import built-in modules
+import collections
+import functools
+import logging
+
 # Import third party modules
 # pylint: disable=import-error
 import nuke
@@ -23,10 +28,42 @@ else:
         QtGui.QShortcut = QtWidgets.QShortcut
 
 # Import internal modules
+from node_table import clipboard
 from node_table import constants
 from node_table import delegate
+from node_table import export
+from node_table import importer
+from node_table import instrumentation
+from node_table import nk_reader
 from node_table import nuke_utils
 from node_table import model
+from node_table import prefix_index
+from node_table import predicate
+from node_table import replace
+from node_table import search
+from node_table import snapshot
+from node_table import tracing
+
+LOG = logging.getLogger(__name__)
+
+
+def timed(name):
+    """Decorate a NodeTableWidget method to time it into the model counters.
+
+    Args:
+        name (str): One of 'load' or 'filter'.
+
+    Returns:
+        callable: Decorator.
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.table_model.counters.timer(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 # pylint: disable=invalid-name
@@ -186,6 +223,187 @@ class NodeTableView(QtWidgets.QTableView):
 
         return super(NodeTableView, self).selectionCommand(index, event)
 
+    def event(self, event):
+        """Keep Nuke's copy and paste shortcuts from taking Ctrl+C/Ctrl+V.
+
+        Args:
+            event (QtCore.QEvent): The event.
+
+        Returns:
+            bool: True if the event was handled.
+
+        """
+        if event.type() == QtCore.QEvent.ShortcutOverride and (
+                event.matches(QtGui.QKeySequence.Copy) or
+                event.matches(QtGui.QKeySequence.Paste)):
+            event.accept()
+            return True
+        return super(NodeTableView, self).event(event)
+
+    def keyPressEvent(self, event):
+        """Copy and paste the selected cells as tab separated values.
+
+        Args:
+            event (QtGui.QKeyEvent): The key event.
+
+        """
+        if event.matches(QtGui.QKeySequence.Copy):
+            self.copy_selection()
+            return
+        if event.matches(QtGui.QKeySequence.Paste):
+            self.paste()
+            return
+        super(NodeTableView, self).keyPressEvent(event)
+
+    def selected_range(self):
+        """Return the rows and columns containing selected cells.
+
+        Returns:
+            tuple: (rows, columns, selected) with sorted lists of rows and
+                columns of this view and a set of selected (row, column).
+
+        """
+        selected = set((index.row(), index.column()) for index
+                       in self.selectionModel().selectedIndexes())
+        rows = sorted(set(row for row, _ in selected))
+        columns = sorted(set(column for _, column in selected))
+        return rows, columns, selected
+
+    def source_cells(self, rows, columns):
+        """Map rows and columns of this view to the table's rows and knobs.
+
+        Args:
+            rows (list): Rows of this view.
+            columns (list): Columns of this view.
+
+        Returns:
+            tuple: (list of rows of the table core, list of knob names)
+
+        """
+        model_ = self.model()
+        table = model.get_source_model(model_).core
+        source_rows = [model.map_to_source(model_.index(row, 0)).row()
+                       for row in rows]
+        knob_names = [table.column_name(model.map_to_source(
+            model_.index(0, column)).column()) for column in columns]
+        return source_rows, knob_names
+
+    def copy_selection(self):
+        """Copy the selected cells to the clipboard as tab separated values.
+
+        Returns:
+            str: The copied text.
+
+        """
+        rows, columns, selected = self.selected_range()
+        if not selected:
+            return ''
+        table = model.get_source_model(self.model()).core
+        source_rows, knob_names = self.source_cells(rows, columns)
+        row_map = dict(zip(rows, source_rows))
+        knob_map = dict(zip(columns, knob_names))
+        source_selected = set((row_map[row], knob_map[column])
+                              for row, column in selected)
+        with tracing.span('copy', 'view', cells=len(selected)):
+            text = clipboard.to_tsv(clipboard.copy_values(
+                table, source_rows, knob_names, source_selected))
+        QtWidgets.QApplication.clipboard().setText(text)
+        return text
+
+    def paste(self, text=None):
+        """Paste tab separated values into the selected cells.
+
+        A selection of more than one cell is filled by repeating the pasted
+        block over its bounding rectangle, skipping cells that are not
+        selected. Otherwise the block is pasted starting at the current
+        cell. All cells are set in one batch and one undo step.
+
+        Args:
+            text (str, optional): Text to paste, defaults to the clipboard.
+
+        Returns:
+            int: Number of changed cells.
+
+        """
+        if text is None:
+            text = QtWidgets.QApplication.clipboard().text()
+        block = clipboard.parse_tsv(text)
+        if not block:
+            return 0
+
+        model_ = self.model()
+        rows, columns, selected = self.selected_range()
+        if len(selected) <= 1:
+            current = self.currentIndex()
+            if not current.isValid():
+                return 0
+            width = max(len(texts) for texts in block)
+            rows = list(range(current.row(), min(
+                current.row() + len(block), model_.rowCount())))
+            columns = list(range(current.column(), min(
+                current.column() + width, model_.columnCount())))
+
+        table_model = model.get_source_model(model_)
+        source_rows, knob_names = self.source_cells(rows, columns)
+        with tracing.span('paste', 'view', cells=len(rows) * len(columns)):
+            changes, errors = clipboard.paste_changes(
+                table_model.core, source_rows, knob_names, block)
+            if len(selected) > 1 and len(selected) < len(rows) * len(columns):
+                # Not rectangular, ie. cells picked with ctrl-click.
+                nodes = table_model.core.nodes
+                row_nodes = dict(zip(rows, (nodes[row] for row in source_rows)))
+                column_knobs = dict(zip(columns, knob_names))
+                targets = set((row_nodes[row], column_knobs[column])
+                              for row, column in selected)
+                changes = [change for change in changes
+                           if (change.node, change.knob_name) in targets]
+            if changes:
+                with table_model.adapter.undo_group('Paste'):
+                    table_model.set_values(
+                        (change.node, change.knob_name, change.new)
+                        for change in changes)
+        if errors:
+            LOG.warning('Skipped %s pasted values: %s', len(errors),
+                        errors[0])
+        return len(changes)
+
+    def paintEvent(self, event):
+        """Paint the visible cells, counted as `paint` operation.
+
+        Args:
+            event (QtGui.QPaintEvent): The paint event.
+
+        """
+        counters = model.get_source_model(self.model()).counters
+        with instrumentation.operation('paint'), \
+                tracing.span('paint', 'view'), counters.timer('paint'):
+            return super(NodeTableView, self).paintEvent(event)
+
+    def visible_cells(self):
+        """Return the number of cells currently visible in the viewport.
+
+        Returns:
+            int: Number of visible cells.
+
+        """
+        model_ = self.model()
+        if not model_ or not model_.rowCount() or not model_.columnCount():
+            return 0
+
+        rect = self.viewport().rect()
+        first_row = self.rowAt(rect.top())
+        last_row = self.rowAt(rect.bottom())
+        first_column = self.columnAt(rect.left())
+        last_column = self.columnAt(rect.right())
+        if first_row < 0 or first_column < 0:
+            return 0
+        if last_row < 0:
+            last_row = model_.rowCount() - 1
+        if last_column < 0:
+            last_column = model_.columnCount() - 1
+        return ((last_row - first_row + 1) *
+                (last_column - first_column + 1))
+
     def mouseReleaseEvent(self, event):
         """Enter edit mode after single click.
 
@@ -215,6 +433,8 @@ class NodeTableView(QtWidgets.QTableView):
 
         return super(NodeTableView, self).mouseReleaseEvent(event)
 
+    @instrumentation.counted('commit')
+    @tracing.traced('commit', 'view')
     def commitData(self, editor):
         """Set the current editor data to the model for the whole selection.
 
@@ -260,18 +480,71 @@ class NodeTableView(QtWidgets.QTableView):
 class MultiCompleter(QtWidgets.QCompleter):
     """Complete multiple words in a QLineEdit, separated by a delimiter.
 
+    Words are kept in a :class:`prefix_index.PrefixIndex`. Instead of
+    letting QCompleter filter all words, only the matches of the term after
+    the last delimiter are handed to the completer's model. Words can be
+    added and removed incrementally.
+
     Args:
-        model_list (QtCore.QStringListModel or list): Words to complete.
+        model_list (list, optional): Words to complete.
         delimiter (str, optional): Separate words by this string.
             (default: ",").
+        fallback_words (list, optional): Words to complete while no words
+            were added.
 
     """
-    def __init__(self, model_list=None, delimiter=","):
-        super(MultiCompleter, self).__init__(model_list)
+    def __init__(self, model_list=None, delimiter=",", fallback_words=None):
+        self.index = prefix_index.PrefixIndex(model_list)
+        self.fallback_index = prefix_index.PrefixIndex(fallback_words)
+        self._matches = []
+
+        super(MultiCompleter, self).__init__(QtCore.QStringListModel())
         self.setCompletionMode(QtWidgets.QCompleter.InlineCompletion)
         self.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.setModelSorting(QtWidgets.QCompleter.CaseInsensitivelySortedModel)
         self.delimiter = delimiter
 
+    def set_words(self, words):
+        """Replace all words to complete.
+
+        Args:
+            words (:obj:`list` of :obj:`str`): Words to complete.
+
+        """
+        self.index.clear()
+        self.index.update(words)
+
+    def add_word(self, word):
+        """Add a word to complete.
+
+        Args:
+            word (str): Word to add.
+
+        """
+        self.index.add(word)
+
+    def discard_word(self, word):
+        """Remove a word added before.
+
+        Args:
+            word (str): Word to remove.
+
+        """
+        self.index.discard(word)
+
+    def update_matches(self, term):
+        """Show only words starting with term in the completer's model.
+
+        Args:
+            term (str): Current term to complete.
+
+        """
+        index = self.index if len(self.index) else self.fallback_index
+        matches = index.complete(term, constants.COMPLETER_MAX_MATCHES)
+        if matches != self._matches:
+            self._matches = matches
+            self.model().setStringList(matches)
+
     def pathFromIndex(self, index):
         """Complete the input.
 
@@ -293,7 +566,7 @@ class MultiCompleter(QtWidgets.QCompleter):
         """Split and strip the input.
 
         Splits the given path into strings that are used to match at each level
-        in the model().
+        in the model(). The model is updated to the matches of the last term.
 
         Args:
             path (str): String to split.
@@ -303,6 +576,7 @@ class MultiCompleter(QtWidgets.QCompleter):
 
         """
         path = str(path.split(self.delimiter)[-1]).lstrip(' ')
+        self.update_matches(path)
         return [path]
 
 
@@ -358,6 +632,725 @@ class CheckAction(QtWidgets.QAction):
         self.setCheckable(True)
 
 
+class PerformanceHud(QtWidgets.QLabel):
+    """Status strip showing live performance counters of a NodeTableWidget.
+
+    Shows whether time is spent loading nodes from Nuke, filtering or
+    painting without attaching a profiler.
+
+    """
+
+    def __init__(self, table_widget, parent=None, interval=500):
+        """Create the strip.
+
+        Args:
+            table_widget (NodeTableWidget): Widget to show counters of.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+            interval (int, optional): Update interval in milliseconds.
+
+        """
+        super(PerformanceHud, self).__init__(parent)
+        self.table_widget = table_widget
+        self.setContentsMargins(8, 0, 8, 0)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.update_counters)
+
+    def showEvent(self, event):
+        """Start updating when shown."""
+        self.update_counters()
+        self.timer.start()
+        super(PerformanceHud, self).showEvent(event)
+
+    def hideEvent(self, event):
+        """Stop updating when hidden."""
+        self.timer.stop()
+        super(PerformanceHud, self).hideEvent(event)
+
+    def update_counters(self):
+        """Update the text with the current counters."""
+        table_model = self.table_widget.table_model
+        counters = table_model.counters
+        ratio = counters.cache_hit_ratio
+        self.setText(
+            'rows {rows}  cols {columns}  visible {visible}  '
+            'cache {ratio}  load {load:.0f}ms  filter {filter:.0f}ms  '
+            'paint {paint:.1f}ms  dirty {dirty}'.format(
+                rows=table_model.rowCount(),
+                columns=table_model.columnCount(QtCore.QModelIndex()),
+                visible=self.table_widget.table_view.visible_cells(),
+                ratio='-' if ratio is None else '{:.0%}'.format(ratio),
+                load=counters.last_load_seconds * 1000,
+                filter=counters.last_filter_seconds * 1000,
+                paint=counters.last_paint_seconds * 1000,
+                dirty=counters.dirty_cells))
+
+
+class AggregateFooter(QtWidgets.QHeaderView):
+    """Row pinned below a table view showing statistics of every column.
+
+    The footer follows the column widths and the horizontal scrolling of
+    the table. Statistics are computed by a model.AggregateModel for the
+    rows passing all filters.
+
+    """
+
+    def __init__(self, table_view, parent=None):
+        """Create the footer.
+
+        Args:
+            table_view (QtWidgets.QTableView): Table to show statistics of.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+
+        """
+        super(AggregateFooter, self).__init__(QtCore.Qt.Horizontal, parent)
+        self.table_view = table_view
+        if nuke.NUKE_VERSION_MAJOR >= 11:
+            self.setSectionsClickable(False)
+        else:
+            self.setClickable(False)
+
+        header = table_view.horizontalHeader()
+        header.sectionResized.connect(self.table_section_resized)
+        table_view.horizontalScrollBar().valueChanged.connect(
+            self.table_scrolled)
+        table_view.verticalHeader().geometriesChanged.connect(
+            self.update_margins)
+
+    def set_table_model(self, table_model):
+        """Aggregate the rows of the model shown in the table.
+
+        Args:
+            table_model (QtCore.QAbstractItemModel): The table view's model.
+
+        """
+        aggregate_model = model.AggregateModel(table_model, self)
+        aggregate_model.modelReset.connect(self.sync_sections)
+        self.setModel(aggregate_model)
+        self.sync_sections()
+
+    @QtCore.Slot()
+    def sync_sections(self):
+        """Match the widths of all sections with the table's columns."""
+        header = self.table_view.horizontalHeader()
+        for section in range(self.count()):
+            self.resizeSection(section, header.sectionSize(section))
+        self.update_margins()
+        self.table_scrolled()
+
+    def table_section_resized(self, section, old_size, new_size):
+        """Follow a resized column of the table.
+
+        Args:
+            section (int): Resized column.
+            old_size (int): Previous width.
+            new_size (int): New width.
+
+        """
+        if section < self.count():
+            self.resizeSection(section, new_size)
+
+    @QtCore.Slot()
+    def table_scrolled(self):
+        """Follow the horizontal scrolling of the table."""
+        self.setOffset(self.table_view.horizontalHeader().offset())
+
+    @QtCore.Slot()
+    def update_margins(self):
+        """Leave room for the table's vertical header."""
+        self.setViewportMargins(self.table_view.verticalHeader().width(),
+                                0, 0, 0)
+
+
+class ReplaceDialog(QtWidgets.QDialog):
+    """Find and replace text in the string knobs of a NodeTableWidget.
+
+    Changes are listed in a preview before they are applied. Applying runs
+    in chunks between events and is recorded as a single undo step. A modal
+    progress dialog blocks all other input meanwhile, so no other edit ends
+    up in the step, and hiding or closing ends the step.
+
+    """
+
+    SCOPE_SELECTED = 'Selected cells'
+    SCOPE_FILTERED = 'Filtered cells'
+
+    def __init__(self, table_widget, parent=None):
+        """Create the dialog.
+
+        Args:
+            table_widget (NodeTableWidget): Widget to replace values in.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+
+        """
+        super(ReplaceDialog, self).__init__(parent)
+        self.setWindowTitle('Replace')
+        self.table_widget = table_widget
+        # Changes of the preview, as core.Change.
+        self.changes = []  # type: list
+        self.pending = collections.deque()
+        self.applied = 0
+        # (node, knob name, message) of values the knobs rejected.
+        self.errors = []  # type: list
+        self.undo = None
+        self.progress_dialog = None
+
+        layout = QtWidgets.QVBoxLayout(self)
+        form = QtWidgets.QFormLayout()
+        layout.addLayout(form)
+
+        self.find_line_edit = QtWidgets.QLineEdit(self)
+        form.addRow('Find:', self.find_line_edit)
+        self.replace_line_edit = QtWidgets.QLineEdit(self)
+        form.addRow('Replace:', self.replace_line_edit)
+
+        options = QtWidgets.QHBoxLayout()
+        self.regex_check_box = QtWidgets.QCheckBox('Regular expression', self)
+        options.addWidget(self.regex_check_box)
+        self.case_check_box = QtWidgets.QCheckBox('Match case', self)
+        options.addWidget(self.case_check_box)
+        self.scope_combo_box = QtWidgets.QComboBox(self)
+        self.scope_combo_box.addItems([self.SCOPE_SELECTED,
+                                       self.SCOPE_FILTERED])
+        options.addWidget(self.scope_combo_box)
+        form.addRow('', options)
+
+        self.preview_tree = QtWidgets.QTreeWidget(self)
+        self.preview_tree.setHeaderLabels(['Node', 'Knob', 'Old', 'New'])
+        self.preview_tree.setRootIsDecorated(False)
+        self.preview_tree.setUniformRowHeights(True)
+        layout.addWidget(self.preview_tree)
+
+        self.summary_label = QtWidgets.QLabel(self)
+        layout.addWidget(self.summary_label)
+
+        self.button_box = QtWidgets.QDialogButtonBox(self)
+        self.preview_button = self.button_box.addButton(
+            'Preview', QtWidgets.QDialogButtonBox.ActionRole)
+        self.preview_button.clicked.connect(self.update_preview)
+        self.replace_button = self.button_box.addButton(
+            'Replace', QtWidgets.QDialogButtonBox.AcceptRole)
+        self.replace_button.clicked.connect(self.apply)
+        self.button_box.addButton(QtWidgets.QDialogButtonBox.Close)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+
+        for line_edit in (self.find_line_edit, self.replace_line_edit):
+            line_edit.textChanged.connect(self.clear_preview)
+        for check_box in (self.regex_check_box, self.case_check_box):
+            check_box.toggled.connect(self.clear_preview)
+        self.scope_combo_box.currentIndexChanged.connect(self.clear_preview)
+
+        # Applies the changes between events.
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.apply_chunk)
+
+    @property
+    def running(self):
+        """bool: True while changes are being applied."""
+        return self.undo is not None
+
+    def cells(self):
+        """Return the cells to search in, depending on the chosen scope.
+
+        Returns:
+            list: Cells as (node, knob name).
+
+        """
+        table_view = self.table_widget.table_view
+        view_model = table_view.model()
+        table = self.table_widget.table_model.core
+
+        if self.scope_combo_box.currentText() == self.SCOPE_SELECTED:
+            cells = []
+            for index in table_view.selectionModel().selectedIndexes():
+                while isinstance(index.model(), QtCore.QAbstractProxyModel):
+                    index = index.model().mapToSource(index)
+                cells.append((table.nodes[index.row()],
+                              table.column_name(index.column())))
+            return cells
+
+        knob_names = set(table.column_name(column)
+                         for column in model.get_source_columns(view_model))
+        cells = []
+        for row in model.get_source_rows(view_model):
+            node = table.nodes[row]
+            cells.extend((node, knob_name) for knob_name
+                         in table.records[node].knobs if knob_name in knob_names)
+        return cells
+
+    @QtCore.Slot()
+    def clear_preview(self, *args):
+        """Forget the preview after the search changed."""
+        if self.running:
+            return
+        self.changes = []
+        self.preview_tree.clear()
+        self.summary_label.setText('')
+
+    @QtCore.Slot()
+    def update_preview(self):
+        """List the changes of the current search.
+
+        Returns:
+            bool: False if the search is invalid.
+
+        """
+        self.clear_preview()
+        try:
+            replacer = replace.Replacer(
+                self.find_line_edit.text(), self.replace_line_edit.text(),
+                regex=self.regex_check_box.isChecked(),
+                case_sensitive=self.case_check_box.isChecked())
+            with tracing.span('replace preview', 'view'):
+                self.changes = list(replace.preview(
+                    self.table_widget.table_model.core, self.cells(),
+                    replacer))
+        except replace.ReplaceError as error:
+            self.summary_label.setText(str(error))
+            return False
+
+        items = []
+        for change in self.changes[:constants.REPLACE_PREVIEW_MAX_ROWS]:
+            record = self.table_widget.table_model.core.records[change.node]
+            items.append(QtWidgets.QTreeWidgetItem(
+                [record.name, change.knob_name, change.old, change.new]))
+        self.preview_tree.addTopLevelItems(items)
+
+        summary = '{} replacements'.format(len(self.changes))
+        if len(self.changes) > len(items):
+            summary += ', showing the first {}'.format(len(items))
+        self.summary_label.setText(summary)
+        return True
+
+    @QtCore.Slot()
+    def apply(self):
+        """Start applying the previewed changes as one undo step."""
+        if self.running:
+            return
+        if not self.changes and not self.update_preview():
+            return
+        if not self.changes:
+            return
+
+        self.pending = collections.deque(self.changes)
+        self.applied = 0
+        self.errors = []
+        # Block input to all other windows until the undo step is closed.
+        self.progress_dialog = QtWidgets.QProgressDialog(
+            'Replacing values...', '', 0, len(self.changes), self)
+        self.progress_dialog.setCancelButton(None)
+        self.progress_dialog.setWindowModality(QtCore.Qt.ApplicationModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.canceled.connect(self.finish)
+        self.progress_dialog.show()
+
+        self.undo = self.table_widget.table_model.adapter.undo_group(
+            'Replace {}'.format(self.find_line_edit.text()))
+        self.undo.begin()
+        self.timer.start()
+
+    def _set_values(self, changes):
+        self.applied += len(self.table_widget.table_model.set_values(
+            ((change.node, change.knob_name, change.new)
+             for change in changes), errors=self.errors))
+
+    @QtCore.Slot()
+    def apply_chunk(self):
+        """Apply the next chunk of changes."""
+        pending = self.pending
+        chunk = [pending.popleft() for _ in
+                 range(min(constants.REPLACE_CHUNK_SIZE, len(pending)))]
+        self._set_values(chunk)
+        if self.progress_dialog is not None:
+            self.progress_dialog.setValue(len(self.changes) - len(pending))
+        if not pending:
+            self.finish()
+
+    @QtCore.Slot()
+    def finish(self):
+        """Apply remaining changes and close the undo step."""
+        self.timer.stop()
+        if self.pending:
+            self._set_values(list(self.pending))
+            self.pending.clear()
+        if self.undo is not None:
+            self.undo.end()
+            self.undo = None
+        if self.progress_dialog is not None:
+            progress_dialog, self.progress_dialog = self.progress_dialog, None
+            progress_dialog.close()
+            progress_dialog.deleteLater()
+        self.changes = []
+        self.preview_tree.clear()
+        summary = 'Replaced {} values'.format(self.applied)
+        if self.errors:
+            summary += ', {} rejected: {}'.format(len(self.errors),
+                                                   self.errors[0][2])
+            LOG.warning('Knobs rejected %s replaced values: %s',
+                        len(self.errors), self.errors[0][2])
+        self.summary_label.setText(summary)
+
+    def reject(self):
+        """Finish applying before closing."""
+        if self.running:
+            self.finish()
+        super(ReplaceDialog, self).reject()
+
+    def hideEvent(self, event):
+        """Finish applying when hidden, so the undo step is closed."""
+        if self.running:
+            self.finish()
+        super(ReplaceDialog, self).hideEvent(event)
+
+    def closeEvent(self, event):
+        """Finish applying when closed, so the undo step is closed."""
+        if self.running:
+            self.finish()
+        super(ReplaceDialog, self).closeEvent(event)
+
+
+class ImportDialog(QtWidgets.QDialog):
+    """Show the changes and errors of an import before applying it."""
+
+    def __init__(self, plan, table_widget, parent=None):
+        """Create the dialog.
+
+        Args:
+            plan (importer.ImportPlan): Dry run of the import.
+            table_widget (NodeTableWidget): Widget to look up node names in.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+
+        """
+        super(ImportDialog, self).__init__(parent)
+        self.setWindowTitle('Import values')
+        self.plan = plan
+        adapter = table_widget.table_model.adapter
+        records = table_widget.table_model.core.records
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.preview_tree = QtWidgets.QTreeWidget(self)
+        self.preview_tree.setHeaderLabels(['Node', 'Knob', 'Old', 'New'])
+        self.preview_tree.setRootIsDecorated(False)
+        self.preview_tree.setUniformRowHeights(True)
+        items = []
+        for change in plan.changes[:constants.REPLACE_PREVIEW_MAX_ROWS]:
+            record = records.get(change.node)
+            name = record.name if record else adapter.full_name(change.node)
+            items.append(QtWidgets.QTreeWidgetItem(
+                [name, change.knob_name, export.to_text(change.old),
+                 export.to_text(change.new)]))
+        self.preview_tree.addTopLevelItems(items)
+        layout.addWidget(self.preview_tree)
+
+        summary = plan.summary()
+        if len(plan.changes) > len(items):
+            summary += ', showing the first {}'.format(len(items))
+        self.summary_label = QtWidgets.QLabel(summary, self)
+        layout.addWidget(self.summary_label)
+
+        self.errors_list = QtWidgets.QListWidget(self)
+        self.errors_list.addItems(
+            ['Line {}: {}'.format(line, message) for line, message
+             in plan.errors[:constants.REPLACE_PREVIEW_MAX_ROWS]])
+        self.errors_list.setVisible(bool(plan.errors))
+        layout.addWidget(self.errors_list)
+
+        self.button_box = QtWidgets.QDialogButtonBox(self)
+        self.apply_button = self.button_box.addButton(
+            'Apply', QtWidgets.QDialogButtonBox.AcceptRole)
+        self.apply_button.setEnabled(bool(plan.changes))
+        self.button_box.addButton(QtWidgets.QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+
+
+class DiffDialog(QtWidgets.QDialog):
+    """List the cells that differ between two snapshots."""
+
+    def __init__(self, snapshot_diff, table_widget, parent=None):
+        """Create the dialog.
+
+        Args:
+            snapshot_diff (snapshot.SnapshotDiff): Differences to list.
+            table_widget (NodeTableWidget): Widget to go to cells in.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+
+        """
+        super(DiffDialog, self).__init__(parent)
+        self.setWindowTitle('Compare')
+        self.snapshot_diff = snapshot_diff
+        self.table_widget = table_widget
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.diff_tree = QtWidgets.QTreeWidget(self)
+        self.diff_tree.setHeaderLabels(['Node', 'Knob', 'Status', 'Old',
+                                        'New'])
+        self.diff_tree.setRootIsDecorated(False)
+        self.diff_tree.setUniformRowHeights(True)
+        items = []
+        for difference in snapshot_diff:
+            if len(items) >= constants.REPLACE_PREVIEW_MAX_ROWS:
+                break
+            item = QtWidgets.QTreeWidgetItem(
+                [difference.name, difference.knob_name, difference.status,
+                 export.to_text(difference.old),
+                 export.to_text(difference.new)])
+            item.setBackground(2, QtGui.QBrush(QtGui.QColor().fromRgbF(
+                *model.DIFF_COLORS[difference.status])))
+            items.append(item)
+        self.diff_tree.addTopLevelItems(items)
+        self.diff_tree.itemActivated.connect(self.go_to_item)
+        layout.addWidget(self.diff_tree)
+
+        summary = snapshot_diff.summary()
+        if len(snapshot_diff) > len(items):
+            summary += ', showing the first {}'.format(len(items))
+        self.summary_label = QtWidgets.QLabel(summary, self)
+        layout.addWidget(self.summary_label)
+
+        self.button_box = QtWidgets.QDialogButtonBox(self)
+        self.export_button = self.button_box.addButton(
+            'Export...', QtWidgets.QDialogButtonBox.ActionRole)
+        self.export_button.setEnabled(bool(snapshot_diff))
+        self.export_button.clicked.connect(self.export_dialog)
+        self.button_box.addButton(QtWidgets.QDialogButtonBox.Close)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+
+    @QtCore.Slot()
+    def go_to_item(self, item, column=0):
+        """Select the cell of a difference in the table.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Item of the difference.
+            column (int, unused): Activated column.
+
+        """
+        self.table_widget.go_to_cell(item.text(0), item.text(1))
+
+    @QtCore.Slot()
+    def export_dialog(self):
+        """Ask for a file and write the differences to it."""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export differences', 'differences.csv',
+            'CSV (*.csv);;JSON Lines (*.jsonl);;Columnar JSON (*.json)')
+        if not path:
+            return
+        try:
+            self.snapshot_diff.write(path)
+        except (IOError, OSError, ValueError) as error:
+            QtWidgets.QMessageBox.warning(self, 'Export failed', str(error))
+
+
+class FindBar(QtWidgets.QWidget):
+    """Search the string knob values of a NodeTableWidget.
+
+    Matching cells are highlighted and can be stepped through. The search
+    index is built in time slices when the bar is shown for the first time
+    and kept current by the table's knob listeners.
+
+    """
+
+    def __init__(self, table_widget, parent=None):
+        """Create the bar.
+
+        Args:
+            table_widget (NodeTableWidget): Widget to search in.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+
+        """
+        super(FindBar, self).__init__(parent)
+        self.table_widget = table_widget
+        self.search_index = None  # type: search.SearchIndex
+        # Matches as (row, column) of the table model.
+        self.matches = []  # type: list
+        self._current = -1
+
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        layout.addWidget(QtWidgets.QLabel('Find:'))
+        self.line_edit = QtWidgets.QLineEdit(self)
+        self.line_edit.setPlaceholderText('text in string knobs')
+        self.line_edit.textChanged.connect(self.update_matches)
+        self.line_edit.returnPressed.connect(self.find_next)
+        layout.addWidget(self.line_edit)
+
+        self.count_label = QtWidgets.QLabel(self)
+        layout.addWidget(self.count_label)
+
+        self.previous_button = QtWidgets.QToolButton(self)
+        self.previous_button.setArrowType(QtCore.Qt.UpArrow)
+        self.previous_button.clicked.connect(self.find_previous)
+        layout.addWidget(self.previous_button)
+
+        self.next_button = QtWidgets.QToolButton(self)
+        self.next_button.setArrowType(QtCore.Qt.DownArrow)
+        self.next_button.clicked.connect(self.find_next)
+        layout.addWidget(self.next_button)
+
+        self.close_button = QtWidgets.QToolButton(self)
+        self.close_button.setText('x')
+        self.close_button.clicked.connect(self.hide)
+        layout.addWidget(self.close_button)
+
+        self.previous_shortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence('Shift+Return'), self.line_edit)
+        self.previous_shortcut.activated.connect(self.find_previous)
+        self.close_shortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence('Escape'), self)
+        self.close_shortcut.activated.connect(self.hide)
+
+        # Builds the index between events.
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.build_index)
+
+        table_model = table_widget.table_model
+        table_model.rowsInserted.connect(self.rows_changed)
+        table_model.rowsRemoved.connect(self.rows_changed)
+        table_model.modelReset.connect(self.rows_changed)
+        table_model.layoutChanged.connect(self.layout_changed)
+        table_model.columnsInserted.connect(self.layout_changed)
+        table_model.columnsRemoved.connect(self.layout_changed)
+        table_model.dataChanged.connect(self.data_changed)
+
+    def showEvent(self, event):
+        """Start indexing and focus the search field when shown."""
+        if self.search_index is None:
+            self.search_index = search.SearchIndex(
+                self.table_widget.table_model.core)
+        self.rows_changed()
+        self.line_edit.setFocus()
+        self.line_edit.selectAll()
+        super(FindBar, self).showEvent(event)
+
+    def hideEvent(self, event):
+        """Stop indexing and remove the highlights when hidden."""
+        self.timer.stop()
+        self.set_highlighted([])
+        super(FindBar, self).hideEvent(event)
+
+    @QtCore.Slot()
+    def rows_changed(self, *args):
+        """Index added rows and forget removed ones."""
+        if self.search_index is None or not self.isVisible():
+            return
+        self.search_index.sync()
+        if not self.search_index.complete:
+            self.timer.start()
+        self.update_matches()
+
+    @QtCore.Slot()
+    def layout_changed(self, *args):
+        """Map the matches to the new rows and columns."""
+        if self.isVisible():
+            self.update_matches()
+
+    @QtCore.Slot()
+    def data_changed(self, *args):
+        """Search again after cells changed, ie. were edited."""
+        if self.isVisible() and self.line_edit.text():
+            self.update_matches()
+
+    @QtCore.Slot()
+    def build_index(self):
+        """Index nodes for one time slice."""
+        with tracing.span('build search index', 'view'):
+            complete = self.search_index.build()
+        if complete:
+            self.timer.stop()
+            self.update_matches()
+        else:
+            self.count_label.setText('indexing {:.0%}'.format(
+                self.search_index.progress))
+
+    @QtCore.Slot()
+    def update_matches(self, *args):
+        """Search the current text and highlight all matches."""
+        if self.search_index is None:
+            return
+        query = self.line_edit.text()
+        self.matches = self.search_index.find(query) if query else []
+        self._current = -1
+
+        table_model = self.table_widget.table_model
+        table = table_model.core
+        self.set_highlighted([(table.nodes[row], table.column_name(column))
+                              for row, column in self.matches])
+        if not self.search_index.complete:
+            return
+        if query:
+            self.count_label.setText('{} matches'.format(len(self.matches)))
+        else:
+            self.count_label.setText('')
+
+    def set_highlighted(self, cells):
+        """Highlight cells of the table.
+
+        Args:
+            cells (list): Cells as (node, knob name).
+
+        """
+        table_model = self.table_widget.table_model
+        if not cells and not table_model.highlighted_cells:
+            return
+        table_model.highlighted_cells = set(cells)
+        self.table_widget.table_view.viewport().update()
+
+    def visible_matches(self):
+        """Return the matches passing the filters.
+
+        Returns:
+            :obj:`list` of :obj:`QtCore.QModelIndex`: Indexes of the table
+                view's model in order of rows and columns.
+
+        """
+        table_model = self.table_widget.table_model
+        view_model = self.table_widget.table_view.model()
+        indexes = (model.map_from_source(view_model,
+                                         table_model.index(row, column))
+                   for row, column in self.matches)
+        return sorted((index for index in indexes if index.isValid()),
+                      key=lambda index: (index.row(), index.column()))
+
+    @QtCore.Slot()
+    def find_next(self):
+        """Select the next visible match."""
+        self.go_to_match(1)
+
+    @QtCore.Slot()
+    def find_previous(self):
+        """Select the previous visible match."""
+        self.go_to_match(-1)
+
+    def go_to_match(self, step):
+        """Select and scroll to a match relative to the current one.
+
+        Args:
+            step (int): 1 for the next, -1 for the previous match.
+
+        """
+        # Filters may have changed since the last step.
+        matches = self.visible_matches()
+        if not matches:
+            return
+        if self._current < 0 and step < 0:
+            self._current = 0
+        self._current = (self._current + step) % len(matches)
+        index = matches[self._current]
+        table_view = self.table_widget.table_view
+        table_view.setCurrentIndex(index)
+        table_view.scrollTo(index)
+        self.count_label.setText('{} of {}'.format(self._current + 1,
+                                                   len(matches)))
+
+
 # pylint: disable=line-too-long, too-many-instance-attributes
 class NodeTableWidget(QtWidgets.QWidget):
     """The main GUI for the table view and filtering.
@@ -370,11 +1363,12 @@ class NodeTableWidget(QtWidgets.QWidget):
         >>> table = view.NodeTableWidget()
         >>> table.node_list = nuke.selectedNodes()
         >>> table.node_class_filter = 'Merge2, Blur'
+        >>> table.predicate_filter = 'size > 50 and not disable'
         >>> table.knob_name_filter = 'disabled, cached'
 
     """
 
-    def __init__(self, node_list=None, parent=None):
+    def __init__(self, node_list=None, parent=None, adapter=None):
         """    Args:
         node_list (list): list of nuke.Node nodes (optional).
         parent (QtGui.QWidget): parent widget (optional)
@@ -382,6 +1376,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         Args:
             node_list (:obj:`list` of :obj:`str`, optional): Nodes to display.
             parent (QtWidgets.QWidget, optional): Parent widget.
+            adapter (core.NodeAdapter, optional): Reads and writes the
+                nodes, defaults to the nodes of the running Nuke session.
 
         """
         super(NodeTableWidget, self).__init__(parent)
@@ -402,6 +1398,7 @@ class NodeTableWidget(QtWidgets.QWidget):
         self._node_name_filter = None
         self._node_class_filter = None
         self._node_class_filter = None
+        self._predicate_filter = None
 
         # Content
         # TODO: untangle this bad mix of ui and controller functions.
@@ -418,6 +1415,37 @@ class NodeTableWidget(QtWidgets.QWidget):
         self.menu_bar.addAction(self.load_selected_action)
         self.load_selected_action.triggered.connect(self.load_selected)
 
+        self.edit_menu = self.menu_bar.addMenu('Edit')
+        self.find_action = self.edit_menu.addAction('Find...')
+        self.find_action.triggered.connect(self.show_find_bar)
+        self.replace_action = self.edit_menu.addAction('Replace...')
+        self.replace_action.triggered.connect(self.show_replace_dialog)
+        self.edit_menu.addSeparator()
+        self.export_filtered_action = self.edit_menu.addAction('Export filtered rows...')
+        self.export_filtered_action.triggered.connect(
+            lambda: self.export_dialog(filtered=True))
+        self.export_all_action = self.edit_menu.addAction('Export all rows...')
+        self.export_all_action.triggered.connect(
+            lambda: self.export_dialog(filtered=False))
+        self.import_action = self.edit_menu.addAction('Import values...')
+        self.import_action.triggered.connect(self.import_dialog)
+
+        self.snapshot_menu = self.edit_menu.addMenu('Snapshot')
+        self.take_snapshot_action = self.snapshot_menu.addAction('Take snapshot')
+        self.take_snapshot_action.triggered.connect(
+            lambda: self.take_snapshot())
+        self.save_snapshot_action = self.snapshot_menu.addAction('Take snapshot to file...')
+        self.save_snapshot_action.triggered.connect(self.take_snapshot_dialog)
+        self.snapshot_menu.addSeparator()
+        self.compare_action = self.snapshot_menu.addAction('Compare with snapshot')
+        self.compare_action.triggered.connect(
+            lambda: self.compare_dialog(from_file=False))
+        self.compare_file_action = self.snapshot_menu.addAction('Compare with snapshot file...')
+        self.compare_file_action.triggered.connect(
+            lambda: self.compare_dialog(from_file=True))
+        self.clear_comparison_action = self.snapshot_menu.addAction('Clear comparison')
+        self.clear_comparison_action.triggered.connect(self.clear_comparison)
+
         self.show_menu = KeepOpenMenu('Show')  # type: QtWidgets.QMenu
         self.menu_bar.addMenu(self.show_menu)
         self.knobs_menu = KeepOpenMenu('Knobs')  # type: QtWidgets.QMenu
@@ -437,11 +1465,52 @@ class NodeTableWidget(QtWidgets.QWidget):
         self.knobs_menu.addAction(self.disabled_knobs_action)
         self.disabled_knobs_action.triggered[bool].connect(self.disabled_knobs_changed)
 
+        self.performance_hud_action = CheckAction('Performance HUD', self.show_menu)
+        self.show_menu.addAction(self.performance_hud_action)
+        self.performance_hud_action.triggered[bool].connect(self.performance_hud_changed)
+
+        self.aggregates_action = CheckAction('Column statistics', self.show_menu)
+        self.show_menu.addAction(self.aggregates_action)
+        self.aggregates_action.triggered[bool].connect(self.aggregates_changed)
+
+        self.outliers_action = CheckAction('Outliers', self.show_menu)
+        self.show_menu.addAction(self.outliers_action)
+        self.outliers_action.triggered[bool].connect(self.outliers_changed)
+
         self.nodes_menu = self.show_menu.addMenu('Nodes')
         self.grouped_nodes_action = CheckAction('grouped')
         self.nodes_menu.addAction(self.grouped_nodes_action)
         self.grouped_nodes_action.triggered[bool].connect(self.grouped_nodes_changed)
 
+        self.sort_menu = self.menu_bar.addMenu('Sort')
+        self.sort_by_name_action = self.sort_menu.addAction('by name')
+        self.sort_by_name_action.triggered.connect(
+            lambda: self.sort_rows(model.SORT_BY_NAME))
+        self.sort_by_class_action = self.sort_menu.addAction('by class')
+        self.sort_by_class_action.triggered.connect(
+            lambda: self.sort_rows(model.SORT_BY_CLASS))
+        self.sort_by_position_action = self.sort_menu.addAction('by DAG position')
+        self.sort_by_position_action.triggered.connect(
+            lambda: self.sort_rows(model.SORT_BY_POSITION))
+
+        self.debug_menu = self.menu_bar.addMenu('Debug')
+        self.count_api_calls_action = CheckAction('Count Nuke API calls',
+                                                  self.debug_menu)
+        self.count_api_calls_action.setChecked(instrumentation.is_enabled())
+        self.debug_menu.addAction(self.count_api_calls_action)
+        self.count_api_calls_action.triggered[bool].connect(self.count_api_calls_changed)
+        self.api_call_report_action = self.debug_menu.addAction('Print API call report')
+        self.api_call_report_action.triggered.connect(instrumentation.dump_report)
+        self.reset_api_calls_action = self.debug_menu.addAction('Reset API call counters')
+        self.reset_api_calls_action.triggered.connect(instrumentation.reset)
+        self.debug_menu.addSeparator()
+        self.record_trace_action = CheckAction('Record trace', self.debug_menu)
+        self.record_trace_action.setChecked(tracing.is_enabled())
+        self.debug_menu.addAction(self.record_trace_action)
+        self.record_trace_action.triggered[bool].connect(self.record_trace_changed)
+        self.export_trace_action = self.debug_menu.addAction('Export trace...')
+        self.export_trace_action.triggered.connect(self.export_trace)
+
         self.layout.addWidget(self.menu_bar)
 
         self.filter_separator_knobs = QtWidgets.QFrame(self)
@@ -459,7 +1528,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         self.filter_layout.addWidget(self.node_class_filter_label)
         self.node_class_filter_line_edit = QtWidgets.QLineEdit(self.filter_widget)
         self.node_class_filter_line_edit.setPlaceholderText("class")
-        self.node_class_completer = MultiCompleter(self.node_classes)
+        self.node_class_completer = MultiCompleter(
+            fallback_words=nuke_utils.get_node_classes(no_ext=True))
         self.node_class_model = self.node_class_completer.model()
         self.node_class_filter_line_edit.setCompleter(self.node_class_completer)
         self.node_class_filter_line_edit.textChanged.connect(self.node_class_filter_changed)
@@ -469,7 +1539,7 @@ class NodeTableWidget(QtWidgets.QWidget):
         self.node_name_filter_line_edit = QtWidgets.QLineEdit()
         self.node_name_filter_line_edit.setPlaceholderText("name")
         self.node_name_filter_line_edit.setAcceptDrops(True)
-        self.node_name_completer = MultiCompleter(self.node_names)
+        self.node_name_completer = MultiCompleter()
         self.node_name_model = self.node_name_completer.model()
         self.node_name_filter_line_edit.setCompleter(self.node_name_completer)
         self.node_name_filter_line_edit.textChanged.connect(self.node_name_filter_changed)
@@ -482,19 +1552,59 @@ class NodeTableWidget(QtWidgets.QWidget):
         self.knob_name_filter_line_edit = QtWidgets.QLineEdit()
         self.knob_name_filter_line_edit.setPlaceholderText("name")
         self.knob_name_filter_line_edit.setAcceptDrops(True)
-        self.knob_name_filter_completer = MultiCompleter(self.knob_names)
+        self.knob_name_filter_completer = MultiCompleter()
         self.knob_name_filter_model = self.knob_name_filter_completer.model()
         self.knob_name_filter_line_edit.setCompleter(self.knob_name_filter_completer)
         self.knob_name_filter_line_edit.textChanged.connect(self.knob_name_filter_changed)
         self.filter_layout.addWidget(self.knob_name_filter_line_edit)
 
+        # Filter by knob values:
+        self.predicate_filter_label = QtWidgets.QLabel('Where:')
+        self.filter_layout.addWidget(self.predicate_filter_label)
+
+        self.predicate_filter_line_edit = QtWidgets.QLineEdit()
+        self.predicate_filter_line_edit.setPlaceholderText(
+            "size > 50 and not disable")
+        self.predicate_filter_line_edit.textChanged.connect(self.predicate_filter_changed)
+        self.filter_layout.addWidget(self.predicate_filter_line_edit)
+
         self.layout.addWidget(self.filter_widget)
 
         self.table_view = NodeTableView(self)
 
-        self.table_model = model.NodeTableModel()
+        self.table_model = model.NodeTableModel(adapter=adapter)
+
+        self.find_bar = FindBar(self, self)
+        self.layout.addWidget(self.find_bar)
+        self.find_bar.hide()
+        self.find_shortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence(QtGui.QKeySequence.Find), self)
+        self.find_shortcut.activated.connect(self.show_find_bar)
+        self.replace_dialog = None
+        self.diff_dialog = None
+        # Snapshot to compare the table with, see take_snapshot().
+        self.last_snapshot = None  # type: snapshot.TableSnapshot
+        self.replace_shortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence('Ctrl+H'), self)
+        self.replace_shortcut.activated.connect(self.show_replace_dialog)
+
         self.layout.addWidget(self.table_view)
 
+        self.aggregate_footer = AggregateFooter(self.table_view, self)
+        self.layout.addWidget(self.aggregate_footer)
+        self.aggregate_footer.hide()
+
+        self.performance_hud = PerformanceHud(self, self.menu_bar)
+        self.menu_bar.setCornerWidget(self.performance_hud)
+        self.performance_hud.hide()
+
+        # Keep the completers up to date as rows and columns change.
+        self.table_model.rowsInserted.connect(self.rows_inserted)
+        self.table_model.rowsAboutToBeRemoved.connect(self.rows_about_to_be_removed)
+        self.table_model.columnsInserted.connect(self.columns_inserted)
+        self.table_model.columnsAboutToBeRemoved.connect(self.columns_about_to_be_removed)
+        self.table_model.core.record_listeners.append(self.record_changed)
+
         # Filter disabled or enabled knobs:
         self.knob_states_filter_model = model.KnobStatesFilterModel(self)
         self.knob_states_filter_model.setSourceModel(self.table_model)
@@ -510,9 +1620,13 @@ class NodeTableWidget(QtWidgets.QWidget):
         self.node_class_filter_model = model.NodeClassFilterModel(self)
         self.node_class_filter_model.setSourceModel(self.node_name_filter_model)
 
+        # Filter by knob values:
+        self.predicate_filter_model = model.PredicateFilterModel(self)
+        self.predicate_filter_model.setSourceModel(self.node_class_filter_model)
+
         # Filter by knob name:
         self.knob_name_filter_model = model.HeaderHorizontalFilterModel(self)
-        self.knob_name_filter_model.setSourceModel(self.node_class_filter_model)
+        self.knob_name_filter_model.setSourceModel(self.predicate_filter_model)
 
         # Filter empty columns
         self.empty_column_filter_model = model.EmptyColumnFilterModel(self)
@@ -521,18 +1635,593 @@ class NodeTableWidget(QtWidgets.QWidget):
         # Set model to view
         self.table_view.setModel(self.empty_column_filter_model)
 
+        # Show the cached snapshot of previous loads of the same nodes while
+        # reading them again, see load_snapshot().
+        self.warm_start = True
+        self.revalidate_timer = QtCore.QTimer(self)
+        self.revalidate_timer.setInterval(0)
+        self.revalidate_timer.timeout.connect(self.revalidate)
+        # Caches the snapshot some time after hiding, see save_snapshot().
+        self.save_snapshot_timer = QtCore.QTimer(self)
+        self.save_snapshot_timer.setSingleShot(True)
+        self.save_snapshot_timer.setInterval(constants.SNAPSHOT_SAVE_DELAY)
+        self.save_snapshot_timer.timeout.connect(self.save_snapshot)
+        # Key, cache generation and column widths of the last saved snapshot.
+        self._saved_snapshot_state = None
+
         # Load given node list
         self.node_list = node_list or []
 
+    @classmethod
+    def from_script(cls, path, parent=None):
+        """Show all nodes of a .nk script read-only, without opening it.
+
+        Args:
+            path (str): Path of the script.
+            parent (QtWidgets.QWidget, optional): Parent widget.
+
+        Returns:
+            NodeTableWidget: The widget.
+
+        """
+        script = nk_reader.NkScript(path)
+        widget = cls(parent=parent, adapter=nk_reader.NkScriptAdapter(script))
+        widget.setWindowTitle('{} - {}'.format(constants.PACKAGE_NICE_NAME,
+                                               path))
+        widget.node_list = script.nodes
+        return widget
+
+    def showEvent(self, event):
+        """Follow knob changes made in Nuke while shown."""
+        nuke.addKnobChanged(self.nuke_knob_changed)
+        self.save_snapshot_timer.stop()
+        if self.table_model.revalidator is not None:
+            self.revalidate_timer.start()
+        super(NodeTableWidget, self).showEvent(event)
+
+    def hideEvent(self, event):
+        """Stop following knob changes made in Nuke and cache the table
+            after a delay, so hiding does not wait for the file."""
+        nuke.removeKnobChanged(self.nuke_knob_changed)
+        self.revalidate_timer.stop()
+        if self.replace_dialog is not None and self.replace_dialog.running:
+            self.replace_dialog.finish()
+        if self.warm_start:
+            self.save_snapshot_timer.start()
+        super(NodeTableWidget, self).hideEvent(event)
+
+    def nuke_knob_changed(self):
+        """Update the cell of the knob that triggered Nuke's callback."""
+        try:
+            self.table_model.knob_changed(nuke.thisNode(),
+                                          nuke.thisKnob().name())
+        except (AttributeError, ValueError):
+            # No node or knob, or the node was deleted.
+            return
+
+    @QtCore.Slot()
+    def show_find_bar(self):
+        """Show the find bar and focus its search field."""
+        if self.find_bar.isVisible():
+            self.find_bar.line_edit.setFocus()
+            self.find_bar.line_edit.selectAll()
+        else:
+            self.find_bar.show()
+
+    @QtCore.Slot()
+    def show_replace_dialog(self):
+        """Show the dialog to replace text in string knobs."""
+        if self.replace_dialog is None:
+            self.replace_dialog = ReplaceDialog(self, self)
+        if self.find_bar.isVisible():
+            self.replace_dialog.find_line_edit.setText(
+                self.find_bar.line_edit.text())
+        self.replace_dialog.show()
+        self.replace_dialog.raise_()
+        self.replace_dialog.find_line_edit.setFocus()
+
+    def export(self, path, filtered=True, file_format=None):
+        """Write the table to a CSV, JSON Lines or columnar JSON file.
+
+        Args:
+            path (str): File to write, see export.FORMATS for extensions.
+            filtered (bool, optional): Only write rows and columns passing
+                the filters, in the order shown. Otherwise write all.
+            file_format (str, optional): One of export.FORMATS, defaults to
+                the format of the path's extension.
+
+        Returns:
+            int: Number of written rows.
+
+        """
+        rows = knob_names = None
+        if filtered:
+            view_model = self.table_view.model()
+            rows = model.get_source_rows(view_model)
+            knob_names = [self.table_model.core.column_name(column) for column
+                          in model.get_source_columns(view_model)]
+        with tracing.span('export', 'view', path=path):
+            return export.export(self.table_model.core, path, rows=rows,
+                                 knob_names=knob_names,
+                                 file_format=file_format)
+
+    def export_dialog(self, filtered=True):
+        """Ask for a file and export the table to it.
+
+        Args:
+            filtered (bool, optional): Only export rows and columns passing
+                the filters.
+
+        """
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export', 'nodes.csv',
+            'CSV (*.csv);;JSON Lines (*.jsonl);;Columnar JSON (*.json)')
+        if not path:
+            return
+        try:
+            self.export(path, filtered=filtered)
+        except (IOError, OSError, ValueError) as error:
+            QtWidgets.QMessageBox.warning(self, 'Export failed', str(error))
+
+    def import_values(self, path, dry_run=False, file_format=None):
+        """Apply knob values from a CSV, JSON Lines or JSON file.
+
+        Nodes are matched by full name against all nodes of the script.
+        Values of nodes in the table are written through the model, so the
+        table shows them. All changes are one undo step.
+
+        Args:
+            path (str): File to read, see importer.read_file() for layouts.
+            dry_run (bool, optional): Only return the plan.
+            file_format (str, optional): One of export.FORMATS, defaults to
+                the format of the path's extension.
+
+        Returns:
+            importer.ImportPlan: The changes that were, or would be, applied.
+
+        """
+        with tracing.span('import plan', 'view', path=path):
+            plan = importer.plan_import(
+                importer.read_file(path, file_format),
+                self.table_model.adapter,
+                records=self.table_model.core.records)
+        if not dry_run:
+            self.apply_import(plan)
+        return plan
+
+    def apply_import(self, plan):
+        """Apply the changes of an import plan as one undo step.
+
+        Args:
+            plan (importer.ImportPlan): Changes to apply.
+
+        Returns:
+            int: Number of applied changes.
+
+        """
+        with tracing.span('import apply', 'view', changes=len(plan)):
+            return importer.apply_plan(plan, self.table_model.adapter,
+                                       set_values=self.table_model.set_values)
+
+    def import_dialog(self):
+        """Ask for a file and show its changes before importing them."""
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, 'Import values', '',
+            'CSV (*.csv);;JSON Lines (*.jsonl);;Columnar JSON (*.json)')
+        if not path:
+            return
+        try:
+            plan = self.import_values(path, dry_run=True)
+        except (IOError, OSError, ValueError) as error:
+            QtWidgets.QMessageBox.warning(self, 'Import failed', str(error))
+            return
+        if ImportDialog(plan, self, self).exec_():
+            self.apply_import(plan)
+
+    def take_snapshot(self, path=None):
+        """Remember the values of all cells to compare them later.
+
+        Args:
+            path (str, optional): Also save the snapshot to this file, ie.
+                to compare another script with it.
+
+        Returns:
+            snapshot.TableSnapshot: The snapshot.
+
+        """
+        with tracing.span('take snapshot', 'view'):
+            self.last_snapshot = snapshot.TableSnapshot.capture(
+                self.table_model.core)
+        if path:
+            self.last_snapshot.save(path)
+        return self.last_snapshot
+
+    def take_snapshot_dialog(self):
+        """Ask for a file and take a snapshot to it."""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Take snapshot', 'snapshot.json', 'Snapshot (*.json)')
+        if not path:
+            return
+        try:
+            self.take_snapshot(path)
+        except (IOError, OSError) as error:
+            QtWidgets.QMessageBox.warning(self, 'Snapshot failed', str(error))
+
+    def compare(self, old=None, new=None):
+        """Compare two snapshots.
+
+        Differences to the current cells are highlighted in the table.
+
+        Args:
+            old (str or snapshot.TableSnapshot, optional): Snapshot or its
+                file, defaults to the last taken snapshot.
+            new (str or snapshot.TableSnapshot, optional): Snapshot or its
+                file, defaults to the current cells.
+
+        Returns:
+            snapshot.SnapshotDiff: The differences.
+
+        Raises:
+            ValueError: If no snapshot was given or taken.
+            IOError: If a snapshot file can not be read.
+
+        """
+        if old is None:
+            old = self.last_snapshot
+        if old is None:
+            raise ValueError('Take a snapshot first.')
+        with tracing.span('compare', 'view'):
+            old = snapshot.load(old)
+            if new is not None:
+                return snapshot.SnapshotDiff(old, snapshot.load(new))
+            current = snapshot.TableSnapshot.capture(self.table_model.core)
+            snapshot_diff = snapshot.SnapshotDiff(old, current)
+            self.table_model.set_diff(snapshot_diff,
+                                      [name for name, _ in current.rows])
+        self.table_view.viewport().update()
+        return snapshot_diff
+
+    def compare_dialog(self, from_file=False):
+        """Compare the current cells with a snapshot and list differences.
+
+        Args:
+            from_file (bool, optional): Ask for a snapshot file instead of
+                using the last taken snapshot.
+
+        """
+        old = None
+        if from_file:
+            old, _ = QtWidgets.QFileDialog.getOpenFileName(
+                self, 'Compare with snapshot', '', 'Snapshot (*.json)')
+            if not old:
+                return
+        try:
+            snapshot_diff = self.compare(old)
+        except (IOError, OSError, ValueError) as error:
+            QtWidgets.QMessageBox.warning(self, 'Compare failed', str(error))
+            return
+        self.show_diff(snapshot_diff)
+
+    def show_diff(self, snapshot_diff):
+        """List the differences of a diff in a dialog.
+
+        Args:
+            snapshot_diff (snapshot.SnapshotDiff): Differences to list.
+
+        """
+        if self.diff_dialog is not None:
+            self.diff_dialog.close()
+        self.diff_dialog = DiffDialog(snapshot_diff, self, self)
+        self.diff_dialog.show()
+
+    @QtCore.Slot()
+    def clear_comparison(self):
+        """Remove the highlights of the last comparison."""
+        self.table_model.set_diff(None)
+        self.table_view.viewport().update()
+        if self.diff_dialog is not None:
+            self.diff_dialog.close()
+            self.diff_dialog = None
+
+    def go_to_cell(self, name, knob_name):
+        """Select and scroll to a cell if it passes the filters.
+
+        Args:
+            name (str): Full name of the node.
+            knob_name (str): Name of the knob.
+
+        Returns:
+            bool: True if the cell is shown.
+
+        """
+        table = self.table_model.core
+        try:
+            row = snapshot.node_names(table).index(name)
+        except ValueError:
+            return False
+        column = table.column_of(knob_name)
+        if column < 0:
+            return False
+        index = model.map_from_source(self.table_view.model(),
+                                      self.table_model.index(row, column))
+        if not index.isValid():
+            return False
+        self.table_view.setCurrentIndex(index)
+        self.table_view.scrollTo(index)
+        return True
+
     def load_selected(self):
         """Sets the node list to current selection."""
         self.node_list = nuke_utils.get_selected_nodes(self.grouped_nodes)
 
+    def column_widths(self):
+        """Return the widths of the shown columns.
+
+        Returns:
+            dict: Width in pixels by knob name.
+
+        """
+        header = self.table_view.horizontalHeader()
+        table = self.table_model.core
+        return dict(
+            (table.column_name(column), header.sectionSize(view_column))
+            for view_column, column
+            in enumerate(model.get_source_columns(self.table_view.model())))
+
+    def apply_column_widths(self, widths):
+        """Resize the shown columns, fitting columns of unknown width.
+
+        Args:
+            widths (dict): Width in pixels by knob name.
+
+        """
+        header = self.table_view.horizontalHeader()
+        table = self.table_model.core
+        for view_column, column in enumerate(
+                model.get_source_columns(self.table_view.model())):
+            width = widths.get(table.column_name(column))
+            if width:
+                header.resizeSection(view_column, width)
+            else:
+                self.table_view.resizeColumnToContents(view_column)
+
+    def save_snapshot(self):
+        """Cache the cells read so far and the column widths.
+
+        Nothing is read from the nodes, only cells that were shown are
+        cached. They are shown at once when the same nodes of the same
+        script state are loaded again. Nothing is written if neither the
+        cells nor the column widths changed since the last save.
+
+        Returns:
+            bool: True if the snapshot was cached.
+
+        """
+        self.save_snapshot_timer.stop()
+        table = self.table_model.core
+        if table.row_count * table.column_count > \
+                constants.SNAPSHOT_CACHE_MAX_CELLS:
+            return False
+        key = snapshot.table_key(table)
+        if key is None:
+            return False
+        widths = self.column_widths()
+        state = (key, table.cache.generation, sorted(widths.items()))
+        if state == self._saved_snapshot_state:
+            return False
+        with tracing.span('save snapshot', 'view'):
+            table_snapshot = snapshot.TableSnapshot.capture(
+                table, widths=widths, read=False)
+            try:
+                snapshot.save_cached(key, table_snapshot)
+            except (IOError, OSError) as error:
+                LOG.warning('Could not cache the table: %s', error)
+                return False
+        self._saved_snapshot_state = state
+        return True
+
+    def load_snapshot(self):
+        """Show the cached snapshot of the loaded nodes, if any.
+
+        The cached cells are read again in time slices, patching the cells
+        that changed since.
+
+        Returns:
+            bool: True if a snapshot was found.
+
+        """
+        table = self.table_model.core
+        names = snapshot.node_names(table)
+        key = snapshot.table_key(table, names)
+        if key is None:
+            return False
+        table_snapshot = snapshot.load_cached(key)
+        if table_snapshot is None:
+            return False
+        self.table_model.warm_start(table_snapshot, names)
+        self.apply_column_widths(table_snapshot.widths)
+        self.revalidate_timer.start()
+        return True
+
+    @QtCore.Slot()
+    def revalidate(self):
+        """Read cells of the warm start snapshot again for one time slice."""
+        if self.table_model.revalidate():
+            self.revalidate_timer.stop()
+
+    @QtCore.Slot(bool)
+    def performance_hud_changed(self, checked=None):
+        """Show or hide the performance HUD.
+
+        Args:
+            checked (bool): If True, show the HUD.
+
+        """
+        # PySide doesn't pass checked state
+        if checked is None:
+            checked = self.performance_hud_action.isChecked()
+        self.performance_hud.setVisible(checked)
+
+    @QtCore.Slot(bool)
+    def aggregates_changed(self, checked=None):
+        """Show or hide the statistics of every column below the table.
+
+        Args:
+            checked (bool): If True, show the statistics.
+
+        """
+        # PySide doesn't pass checked state
+        if checked is None:
+            checked = self.aggregates_action.isChecked()
+        # Only compute statistics once they are shown.
+        if checked and self.aggregate_footer.model() is None:
+            self.aggregate_footer.set_table_model(self.table_view.model())
+        self.aggregate_footer.setVisible(checked)
+
+    @QtCore.Slot(bool)
+    def outliers_changed(self, checked=None):
+        """Highlight cells differing from the majority value of their column.
+
+        Args:
+            checked (bool): If True, highlight outliers.
+
+        """
+        # PySide doesn't pass checked state
+        if checked is None:
+            checked = self.outliers_action.isChecked()
+        self.table_model.highlight_outliers = checked
+        self.table_view.viewport().update()
+
+    @QtCore.Slot(bool)
+    def count_api_calls_changed(self, checked=None):
+        """Enable or disable counting calls to the Nuke API.
+
+        Args:
+            checked (bool): If True, count calls.
+
+        """
+        # PySide doesn't pass checked state
+        if checked is None:
+            checked = self.count_api_calls_action.isChecked()
+        if checked:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    @QtCore.Slot(bool)
+    def record_trace_changed(self, checked=None):
+        """Enable or disable recording a trace of the table's activity.
+
+        Args:
+            checked (bool): If True, record spans.
+
+        """
+        # PySide doesn't pass checked state
+        if checked is None:
+            checked = self.record_trace_action.isChecked()
+        if checked:
+            tracing.enable()
+        else:
+            tracing.disable()
+
+    def export_trace(self):
+        """Ask for a file and export the recorded trace to it."""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export trace', 'node_table_trace.json',
+            'Trace Event JSON (*.json)')
+        if path:
+            tracing.export(path)
+
+    def sort_rows(self, key, order=QtCore.Qt.AscendingOrder):
+        """Sort the nodes by name, class or position in the DAG.
+
+        Args:
+            key (str): One of model.SORT_BY_NAME, model.SORT_BY_CLASS or
+                model.SORT_BY_POSITION.
+            order (QtCore.Qt.SortOrder, optional): Sort order.
+
+        """
+        # Clear the sort indicator of the knob columns.
+        self.table_view.horizontalHeader().setSortIndicator(-1, order)
+        self.table_model.sort_rows(key, order)
+
+    # pylint: disable=unused-argument
+    def rows_inserted(self, parent, first, last):
+        """Add names and classes of inserted nodes to the completers.
+
+        Args:
+            parent (QtCore.QModelIndex): Parent index.
+            first (int): First inserted row.
+            last (int): Last inserted row.
+
+        """
+        for row in range(first, last + 1):
+            node_metadata = self.table_model.get_metadata(row)
+            self.node_name_completer.add_word(node_metadata.name)
+            self.node_class_completer.add_word(node_metadata.node_class)
+
+    # pylint: disable=unused-argument
+    def rows_about_to_be_removed(self, parent, first, last):
+        """Remove names and classes of removed nodes from the completers.
+
+        Uses the node's metadata as the nodes may be deleted.
+
+        Args:
+            parent (QtCore.QModelIndex): Parent index.
+            first (int): First removed row.
+            last (int): Last removed row.
+
+        """
+        for row in range(first, last + 1):
+            node_metadata = self.table_model.get_metadata(row)
+            if node_metadata:
+                self.node_name_completer.discard_word(node_metadata.name)
+                self.node_class_completer.discard_word(node_metadata.node_class)
+
+    def record_changed(self, old_record, record):
+        """Replace the name of a renamed node in the completers.
+
+        Args:
+            old_record (metadata.NodeMetadata): Metadata before the change.
+            record (metadata.NodeMetadata): Metadata read again.
+
+        """
+        if old_record.name != record.name:
+            self.node_name_completer.discard_word(old_record.name)
+            self.node_name_completer.add_word(record.name)
+
+    # pylint: disable=unused-argument
+    def columns_inserted(self, parent, first, last):
+        """Add inserted knob names to the knob name completer.
+
+        Args:
+            parent (QtCore.QModelIndex): Parent index.
+            first (int): First inserted column.
+            last (int): Last inserted column.
+
+        """
+        for column in range(first, last + 1):
+            self.knob_name_filter_completer.add_word(
+                self.table_model.core.column_name(column))
+
+    # pylint: disable=unused-argument
+    def columns_about_to_be_removed(self, parent, first, last):
+        """Remove knob names from the knob name completer.
+
+        Args:
+            parent (QtCore.QModelIndex): Parent index.
+            first (int): First removed column.
+            last (int): Last removed column.
+
+        """
+        for column in range(first, last + 1):
+            self.knob_name_filter_completer.discard_word(
+                self.table_model.core.column_name(column))
+
     @property
     def node_names(self):
         """:obj:`list` of :obj:`str`: Sorted list of current node's names."""
-        node_names = [node.name() for node in self.node_list]
-        return sorted(node_names, key=lambda n: n.lower())
+        return sorted(self.table_model.node_names, key=lambda n: n.lower())
 
     @property
     def node_classes(self):
@@ -542,10 +2231,9 @@ class NodeTableWidget(QtWidgets.QWidget):
         classes of current nodes else all possible node classes are returned.
 
         """
-        if self.node_list:
-            node_classes = set()
-            for node in self.node_list:
-                node_classes.add(node.Class())
+        if self.table_model.node_list:
+            node_classes = set(node_metadata.node_class for node_metadata
+                               in self.table_model.metadata)
         else:
             node_classes = nuke_utils.get_node_classes(no_ext=True)
         return sorted(list(node_classes), key=lambda s: s.lower())
@@ -553,11 +2241,8 @@ class NodeTableWidget(QtWidgets.QWidget):
     @property
     def knob_names(self):
         """:obj:`list` of :obj:`str`:: All knob names of current nodes."""
-        knob_names = set()
-        for node in self.node_list:
-            for knob in node.knobs():
-                knob_names.add(knob)
-        self._knob_names = sorted(list(knob_names), key=lambda s: s.lower())
+        self._knob_names = sorted(self.table_model.core.knob_names,
+                                  key=lambda s: s.lower())
         return self._knob_names
 
     @property
@@ -574,6 +2259,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         return self._node_list
 
     @node_list.setter
+    @instrumentation.counted('load')
+    @tracing.traced('load', 'view')
     def node_list(self, nodes):
         num_nodes = len(nodes)
 
@@ -587,17 +2274,18 @@ class NodeTableWidget(QtWidgets.QWidget):
             if not proceed:
                 return
 
-        self._node_list = nodes or []
-        self.table_model.node_list = self.node_list
+        if self.warm_start:
+            # Keep the cells of the previous load, ie. to reload them.
+            self.save_snapshot()
 
-        self.node_name_completer.setModel(
-            QtCore.QStringListModel(self.node_names))
-        self.node_class_completer.setModel(
-            QtCore.QStringListModel(self.node_classes))
-        self.knob_name_filter_completer.setModel(
-            QtCore.QStringListModel(self.knob_names))
+        # The model reads each node's metadata once and skips deleted nodes.
+        # The completers are updated through the model's signals.
+        self.table_model.node_list = nodes or []
+        self._node_list = list(self.table_model.node_list)
 
-        self.table_view.resizeColumnsToContents()
+        # Cached values and column widths need no reads from the nodes.
+        if not (self.warm_start and self.load_snapshot()):
+            self.table_view.resizeColumnsToContents()
 
     @QtCore.Slot(bool)
     def grouped_nodes_changed(self, checked=None):
@@ -644,6 +2332,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         return self._hidden_knobs
 
     @hidden_knobs.setter
+    @instrumentation.counted('filter')
+    @timed('filter')
     def hidden_knobs(self, checked):
         self._hidden_knobs = checked
         self.knob_states_filter_model.hidden_knobs = checked
@@ -670,6 +2360,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         return self._disabled_knobs
 
     @disabled_knobs.setter
+    @instrumentation.counted('filter')
+    @timed('filter')
     def disabled_knobs(self, checked=None):
         self._disabled_knobs = checked
         self.knob_states_filter_model.disabled_knobs = checked
@@ -727,6 +2419,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         return self._knob_name_filter
 
     @knob_name_filter.setter
+    @instrumentation.counted('filter')
+    @timed('filter')
     def knob_name_filter(self, filter_str=None):
         if filter_str is None:
             filter_str = self.knob_name_filter_line_edit.text()
@@ -741,6 +2435,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         return self._node_name_filter
 
     @node_name_filter.setter
+    @instrumentation.counted('filter')
+    @timed('filter')
     def node_name_filter(self, node_names=None):
         self._node_name_filter = node_names
         self.node_name_filter_model.set_filter_str(node_names)
@@ -765,6 +2461,8 @@ class NodeTableWidget(QtWidgets.QWidget):
         return self._node_class_filter
 
     @node_class_filter.setter
+    @instrumentation.counted('filter')
+    @timed('filter')
     def node_class_filter(self, node_classes=None):
         self._node_class_filter = node_classes
         self.node_class_filter_model.set_filter_str(node_classes)
@@ -782,3 +2480,39 @@ class NodeTableWidget(QtWidgets.QWidget):
             node_classes = self.node_class_filter_line_edit.text()
         self.node_class_filter = node_classes
         self.table_view.resizeColumnsToContents()
+
+    @property
+    def predicate_filter(self):
+        """str: Expression over knob values the rows must match."""
+        return self._predicate_filter
+
+    @predicate_filter.setter
+    @instrumentation.counted('filter')
+    @timed('filter')
+    def predicate_filter(self, expression=None):
+        self.predicate_filter_model.set_predicate(expression)
+        self._predicate_filter = expression
+        self.empty_column_filter_model.invalidateFilter()
+
+    @QtCore.Slot(str)
+    def predicate_filter_changed(self, expression=None):
+        """Update the knob value filter.
+
+        Invalid expressions, ie. while typing, keep the previous expression
+        and mark the line edit until the expression is valid again.
+
+        Args:
+            expression (str): Expression, see predicate module.
+
+        """
+        if expression is None:
+            expression = self.predicate_filter_line_edit.text()
+        try:
+            self.predicate_filter = expression
+        except predicate.PredicateError as error:
+            self.predicate_filter_line_edit.setToolTip(str(error))
+            self.predicate_filter_line_edit.setStyleSheet('color: #e06c60;')
+            return
+        self.predicate_filter_line_edit.setToolTip('')
+        self.predicate_filter_line_edit.setStyleSheet('')
+        self.table_view.resizeColumnsToContents()